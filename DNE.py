@@ -8,14 +8,18 @@ further details on method.
 @author: Julia M. Winchester
 '''
 
+import adjacency
 import implicitfair
 import normcore
 from copy import copy as pcopy
-from numpy import zeros, transpose, nonzero, sqrt, sum, trace, mat, array, dot, isnan, copy, array_equal
-from numpy.linalg import cond, LinAlgError
-from scipy.sparse import lil_matrix
+from numpy import sqrt, sum, array, isnan, copy, arange, flatnonzero, empty, concatenate, where, inf, errstate, atleast_1d, cross, spacing
+from numpy.linalg import LinAlgError
 from scipy.stats import scoreatpercentile
-from collections import defaultdict
+
+# Polygon index and G matrix condition number of high condition number polygons
+CONDITION_DTYPE = [('index', int), ('cond', float)]
+# Polygon index, energy (e or e * area, per outlier type) and area of outlier polygons
+OUTLIER_DTYPE = [('index', int), ('energy', float), ('area', float)]
 
 class MeshDNE(object):
     """Class for calculating and storing Dirichlet normal energy values for polygonal mesh data. 
@@ -39,9 +43,11 @@ class MeshDNE(object):
     
     Attributes:
         Mesh (TopoMesh object): Triangulated polygon mesh data. 
-        vert_tri_dict (dict): Associates vertex index keys with related
-            face index values. 
-        edgeverts (ndarray): Pairs of vertices that form surface boundary edges.
+        vert_tri_dict (VertTriCSR): Associates vertex index keys with related
+            face index values, see adjacency.VertTriCSR. 
+        edge_table (EdgeTable): Unique mesh edges and the polygons using them, 
+            see adjacency.EdgeTable.
+        edgeverts (ndarray): Pairs of vertices that form surface edges.
         fnormal (ndarray): Normalized unit normals of surface polygons. 
         vnormal (ndarray): Normalized approximated unit normals of surface
             vertices (approximated as average of normals of associated faces).
@@ -49,14 +55,19 @@ class MeshDNE(object):
         facearea (ndarray): Surface polygon areas. 
         equantity (ndarray): e * facearea for surface polygons. 
         DNE (float): Summation of equantity. 
-        high_condition_faces (list): Surface polygons with high matrix condition 
-            numbers. If condition number check is on, these are not counted 
+        high_condition_faces (ndarray): Surface polygons with high matrix condition 
+            numbers, as (index, cond) records. If condition number check is on, these 
+            are not counted toward DNE. 
+        outlier_faces (ndarray): Surfaces with outlier energy values, as (index, 
+            energy, area) records. If outlier removal is on, these are not counted 
             toward DNE. 
-        outlier_faces (list): Surfaces with outlier energy values. If outlier 
-            removal is on, these are not counted toward DNE. 
+        boundary_mask (ndarray): True for polygons forming mesh edges. Not 
+            counted toward DNE.
         boundary_faces (list): Polygons forming mesh edges. Not counted toward
             DNE.
         nan_faces (list): Any polygons resulting in NAN e values.
+        nan_vertices (ndarray): Vertices with NAN normals, i.e. vertices of polygons
+            with NAN normals.
         filename (string): Filename of current mesh. Unused for now.  
     """
     def __init__(self, TopoMesh, dosmooth, smoothit, smoothstep, docondition, dooutlier, outlierperc, outliertype, fname):
@@ -71,6 +82,7 @@ class MeshDNE(object):
         self.fname = fname
         
         self.vert_tri_dict = None
+        self.edge_table = None
         self.edgeverts = None
         self.fnormal = None
         self.vnormal = None
@@ -79,16 +91,18 @@ class MeshDNE(object):
         self.equantity = None
         self.DNE = None
         
-        self.high_condition_faces = list()
-        self.outlier_faces = list()
+        self.high_condition_faces = empty(0, CONDITION_DTYPE)
+        self.outlier_faces = empty(0, OUTLIER_DTYPE)
         self.boundary_faces = list()
+        self.boundary_mask = None
         self.nan_faces = list()
+        self.nan_vertices = empty(0, int)
         
         self.calcdne()
         
     def calcdne(self):
         """Method for calculating surface Dirichlet normal energy and populating instance variables."""
-        # creation of dictionary of vertex keys and face values     
+        # vertex to face adjacency, shared with mesh where cached
         self._get_vert_tri_dict()
         
         # optional implicit smooth of mesh
@@ -105,7 +119,8 @@ class MeshDNE(object):
         self._get_boundary_faces()
         
         # arrays of normalized face normals and vertex normals approximated from adjacent faces
-        self.vnormal, self.fnormal = normcore.computenormal(self.Mesh.vertices, self.Mesh.faces, self.Mesh.triverts, self.vert_tri_dict)
+        self.vnormal, self.fnormal = normcore.computenormal(self.Mesh.vertices, self.Mesh.faces)
+        self.nan_vertices = normcore.nanrows(self.vnormal)[1]
         # array of e(p) and face area for polygons across mesh
         
         self._energize_surface()
@@ -114,64 +129,120 @@ class MeshDNE(object):
 
     def _energize_surface(self):
         """Calculates energy values and polygon areas across a surface."""    
-        energy_and_facearea = array([self._energy(face, i) for i, face in enumerate(self.Mesh.faces)])
-        self.e = energy_and_facearea[:,0]
-        self.facearea = energy_and_facearea[:,1]
+        self.e, self.facearea = self._energy_arrays(self.Mesh.faces, arange(len(self.Mesh.faces)), normcore.mesh_facearea(self.Mesh))
 
     def _energy(self, face, i):
         """Returns energy value and polygon area for a provided polygon."""
-       
-        TV1 = array([self.Mesh.vertices[face[0]], self.Mesh.vertices[face[1]], self.Mesh.vertices[face[2]]])
-        TV2 = array([self.vnormal[face[0]],self.vnormal[face[1]],self.vnormal[face[2]]])
-        
-        if array_equal(TV1[0], TV1[1]) or array_equal(TV1[0], TV1[2]) or array_equal(TV1[1], TV1[2]):
-            print "Warning: Duplicate vertices in polygon %s." % i
-            print "Ignoring this polygon for energy calculation, but editing surface to remove duplicate vertices prior to DNE calculation is encouraged."
-            return [0,1]
+        e, facearea = self._energy_arrays(array([face]), array([i]))
+        return [e[0], facearea[0]]
+    
+    def _energy_arrays(self, faces, findex, facearea=None):
+        """Returns arrays of energy values and polygon areas for provided polygons.
+        
+        G (first fundamental form of polygon) and F* (from vertex normals) matrices are 
+        calculated for all polygons at once, and energy is trace(G^-1 * F*) with the 2x2 
+        inverse of G written out. Polygons with duplicate vertices, and with high condition 
+        number G matrices if condition number checking is on, are given energy 0 and area 1.
+        
+        Args:
+            faces (ndarray): Polygons with component vertex indices.
+            findex (ndarray): Mesh polygon index of each polygon, for reporting.
+            facearea (ndarray): Areas of provided polygons, if already known. Copied before 
+                ignored polygons are given area 1.
+        """
+        TV1 = self.Mesh.vertices[faces]
+        TV2 = self.vnormal[faces]
+        
+        ignored = (TV1[:,0] == TV1[:,1]).all(axis=1) | (TV1[:,0] == TV1[:,2]).all(axis=1) | (TV1[:,1] == TV1[:,2]).all(axis=1)
+        if ignored.any():
+            print "Warning: Duplicate vertices in polygons %s." % ", ".join(str(i) for i in findex[ignored])
+            print "Ignoring these polygons for energy calculation, but editing surface to remove duplicate vertices prior to DNE calculation is encouraged."
 
-        b1 = TV1[1] - TV1[0]
-        b2 = TV1[2] - TV1[0]
+        # polygon areas shared with surface area in RFI, see normcore.mesh_facearea
+        if facearea is None:
+            facearea = normcore.facearea(self.Mesh.vertices, faces)
+        else:
+            facearea = copy(facearea)
         
-        g = array(([dot(b1,b1), dot(b1,b2)],[dot(b2,b1), dot(b2,b2)]))
+        b1 = TV1[:,1] - TV1[:,0]
+        b2 = TV1[:,2] - TV1[:,0]
+        
+        g00 = sum(b1*b1, axis=1)
+        g01 = sum(b1*b2, axis=1)
+        g10 = sum(b2*b1, axis=1)
+        g11 = sum(b2*b2, axis=1)
+        gdet = sum(cross(b1, b2)**2, axis=1)
         
         if self.docondition:
-                if cond(g) > 10**5:
-                    self.high_condition_faces.append([i, cond(g)])
-                    return [0,1]
+            condition = self._condition(g00, g01, g11, gdet)
+            highcond = ~ignored & (condition > 10**5)
+            
+            highcondfaces = empty(highcond.sum(), CONDITION_DTYPE)
+            highcondfaces['index'] = findex[highcond]
+            highcondfaces['cond'] = condition[highcond]
+            self.high_condition_faces = concatenate((self.high_condition_faces, highcondfaces))
+            ignored |= highcond
         
-        c1 = TV2[1] - TV2[0]
-        c2 = TV2[2] - TV2[0]
-    
-        fstarh = array(([dot(c1,c1), dot(c1,c2)], [dot(c2,c1), dot(c2,c2)]))
-    
-        gm = mat(g)  
+        c1 = TV2[:,1] - TV2[:,0]
+        c2 = TV2[:,2] - TV2[:,0]
         
-        try:
-            gminv = gm.I
-        except LinAlgError as err:
-            condition = cond(g)
+        f00 = sum(c1*c1, axis=1)
+        f01 = sum(c1*c2, axis=1)
+        f10 = sum(c2*c1, axis=1)
+        f11 = sum(c2*c2, axis=1)
+        
+        det = g00*g11 - g01*g10
+        
+        singular = ~ignored & (det == 0)
+        if singular.any():
+            j = flatnonzero(singular)[0]
+            condition = self._condition(g00[j], g01[j], g11[j], gdet[j])
             if condition > 10**5:
-                err.args += ('G matrix for polygon %s is singular and an inverse cannot be determined. Condition number is %s, turning condition number checking on will cause this polygon to be ignored for energy calculation.' % (i, cond(g)),)
-                raise
+                raise LinAlgError('singular matrix', 'G matrix for polygon %s is singular and an inverse cannot be determined. Condition number is %s, turning condition number checking on will cause this polygon to be ignored for energy calculation.' % (findex[j], condition))
             else:
-                err.args += ('G matrix for polygon %s is singular and an inverse cannot be determined. Condition number is %s, turning condition number checking on will not cause this polygon to be ignored for energy calculation. Further mesh processing is advised.' % (i, cond(g)),)
-                raise
+                raise LinAlgError('singular matrix', 'G matrix for polygon %s is singular and an inverse cannot be determined. Condition number is %s, turning condition number checking on will not cause this polygon to be ignored for energy calculation. Further mesh processing is advised.' % (findex[j], condition))
         
-        e = trace((gminv*fstarh))
-        facearea = 0.5 * sqrt(g[0,0]*g[1,1]-g[0,1]*g[1,0])
-                        
-        if isnan(e):
-            self.nan_faces.append(i)
+        det[ignored] = 1
+        gminv00 = g11 / det
+        gminv01 = -g01 / det
+        gminv10 = -g10 / det
+        gminv11 = g00 / det
+        
+        e = (gminv00*f00 + gminv01*f10) + (gminv10*f01 + gminv11*f11)
+        
+        e[ignored] = 0
+        facearea[ignored] = 1
+        
+        self.nan_faces.extend(findex[isnan(e)].tolist())
             
-        return [e,facearea]
+        return e, facearea
+    
+    def _condition(self, g00, g01, g11, gdet=None):
+        """Returns condition numbers of symmetric 2x2 G matrices from their entries.
+        
+        Condition number is the ratio of the larger to smaller eigenvalue of G, with the 
+        smaller eigenvalue taken as det(G) / larger eigenvalue. As G = B'B for polygon edge 
+        vectors B, det(G) can be given as gdet, the squared magnitude of the cross product 
+        of edge vectors, which has no cancellation. Otherwise det(G) is found from entries 
+        of G, or where this is within rounding error of g00*g11, from the smaller eigenvalue 
+        found directly from trace and discriminant. Singular matrices have infinite 
+        condition numbers.
+        """
+        trace = g00 + g11
+        eigmax = 0.5 * (trace + sqrt((g00 - g11)**2 + 4*g01*g01))
+        if gdet is None:
+            gdet = g00*g11 - g01*g01
+            gdet = where(gdet > spacing(1) * eigmax*eigmax, gdet, (trace - eigmax) * eigmax)
+        with errstate(divide='ignore', invalid='ignore'):
+            return where(gdet > 0, eigmax*eigmax / gdet, inf)
     
     def _sumdne(self):
         """Sums energy values * face areas, ignoring certain kinds of polygons depending on parameters."""
         # ignore energy of boundary faces
-        self.e[self.boundary_faces] = 0
+        self.e[self.boundary_mask] = 0
         
         # energy density is e(p) * area of polygon        
-        self.equantity = array([x*y for x, y in zip(self.e, self.facearea)])
+        self.equantity = self.e * self.facearea
         
         # optional removal of top outliers, percentile for outliers is user settable
         if self.dooutlier: 
@@ -182,61 +253,67 @@ class MeshDNE(object):
     def _outlierremove(self):
         """Flags outlier faces based on parameters and removes associated energy values."""
         switcharoo = [self.e, self.equantity]
-        percentile = scoreatpercentile(switcharoo[self.outliertype], self.outlierperc)
-        for i, energy in enumerate(switcharoo[self.outliertype]):
-            if energy > percentile or isnan(energy):
-                self.outlier_faces.append([i, energy, self.facearea[i]])
-                self.equantity[i] = 0
-
-    def _get_vert_tri_dict(self):
-        """Generates dictionary associating vertex index keys with related polygon index values.""" 
-        self.vert_tri_dict = defaultdict(list)
+        values = switcharoo[self.outliertype]
+        percentile = scoreatpercentile(values, self.outlierperc)
+        outliers = self._outliers(values, percentile)
         
-        for findex, face in enumerate(self.Mesh.faces):
-            for vertex in face:
-                self.vert_tri_dict[vertex].append(findex)
-                        
-    def _get_edge_verts(self):
-        """Generates pairs of vertices comprising surface edges."""
-        M = lil_matrix((self.Mesh.nvert,self.Mesh.nvert))
+        outlierfaces = empty(outliers.sum(), OUTLIER_DTYPE)
+        outlierfaces['index'] = flatnonzero(outliers)
+        outlierfaces['energy'] = values[outliers]
+        outlierfaces['area'] = self.facearea[outliers]
+        self.outlier_faces = concatenate((self.outlier_faces, outlierfaces))
         
-        nedge = 0
+        self.equantity[outliers] = 0
     
-        for face in self.Mesh.faces:
-            v1, v2, v3 = face    
-            
-            if M[v1,v2] == 0:
-                nedge += 1
-                M[v1,v2] = nedge
-                M[v2,v1] = nedge
-                
-            if M[v3,v1] == 0:
-                nedge += 1
-                M[v1,v3] = nedge
-                M[v3,v1] = nedge
-                
-            if M[v2,v3] == 0:
-                nedge += 1
-                M[v3,v2] = nedge
-                M[v2,v3] = nedge
-            
-        self.edgeverts = zeros([nedge,2], int)
+    def _outliers(self, values, percentile):
+        """Returns mask of polygons with values above outlier percentile value, or nan values."""
+        return (values > percentile) | isnan(values)
+
+    def outlier_sweep(self, settings):
+        """Returns DNE with outlier removal at each of several settings, from already calculated polygon energies.
+        
+        Polygon energies and areas are not recalculated, and instance variables are not changed. 
+        Outlier thresholds for all percentiles of an outlier type come from one sort of values.
+        
+        Args:
+            settings (list): (outlierperc, outliertype) pairs, see MeshDNE class.
+        
+        Returns:
+            list: DNE of mesh with outliers removed for each setting.
+        """
+        if self.e is None:
+            return [self.DNE for setting in settings]
         
-        nonzeroarray = transpose(nonzero(M))
+        equantity = self.e * self.facearea
+        switcharoo = [self.e, equantity]
         
-        for entry in nonzeroarray:
-            self.edgeverts[M[entry[0],entry[1]]-1] = [entry[0],entry[1]]
+        thresholds = dict()
+        for outliertype in set(int(outliertype) for outlierperc, outliertype in settings):
+            percs = [float(outlierperc) for outlierperc, otype in settings if int(otype) == outliertype]
+            percentiles = atleast_1d(scoreatpercentile(switcharoo[outliertype], percs))
+            thresholds.update(((perc, outliertype), percentile) for perc, percentile in zip(percs, percentiles))
+        
+        dnes = list()
+        for outlierperc, outliertype in settings:
+            values = switcharoo[int(outliertype)]
+            outliers = self._outliers(values, thresholds[float(outlierperc), int(outliertype)])
+            dnes.append(round(sum(where(outliers, 0, equantity)),3))
+        return dnes
+
+    def _get_vert_tri_dict(self):
+        """Gets adjacency associating vertex index keys with related polygon index values.""" 
+        self.vert_tri_dict = adjacency.mesh_vert_tri(self.Mesh)
+                        
+    def _get_edge_verts(self):
+        """Generates pairs of vertices comprising surface edges, in order of first use by polygons, larger vertex index first."""
+        self.edge_table = adjacency.mesh_edge_table(self.Mesh)
+        self.edgeverts = self.edge_table.edgeverts
     
     def _get_boundary_faces(self):
-        """Generates list of polygons comprising surface edges."""        
-        self.boundary_faces = list()
+        """Generates mask and list of polygons comprising surface edges, i.e. polygons with an edge used by no other polygon."""        
+        edges = self.edge_table
+        self.boundary_mask = edges.boundary[edges.face_edges].any(axis=1)
         
-        for verts in self.edgeverts:
-            f1, f2 = [self.vert_tri_dict[vert] for vert in verts]
-            cf = [x for x in f2 for y in f1 if x == y]
-            
-            if len(cf) == 1:
-                self.boundary_faces.append(cf[0])
-            
-        self.boundary_faces = list(set(self.boundary_faces))
+        # listed as a set of polygons found in edge order, as before
+        self.boundary_faces = list(set(edges.faces[edges.offsets[:-1][edges.boundary]].tolist()))
     
\ No newline at end of file
@@ -17,9 +17,10 @@ import sip
 sip.setapi('QString', 2)
 
 import topomesh
+import plython
 
 from math import log
-from numpy import array, amax, amin, rint, empty, nan, isfinite
+from numpy import array, amax, amin, rint, empty, nan, isfinite, nanmin, nanmax, nansum
 from traits.api import HasTraits, Instance
 from traitsui.api import View, Item
 from mayavi.core.ui.api import MlabSceneModel
@@ -197,6 +198,16 @@ class MainWidget(QtGui.QWidget):
         self.openlabel.setText(".."+self.dirpath[-20:])
         self.mayaviview = MayaviView(0,1)
            
+    def CheckSettings(self):
+        """Returns True if options for selected topographic variables are valid, otherwise prints the problem and returns False."""
+        if self.dnecheck.isChecked():
+            try:
+                self.DNEOptionsWindow.sweep_settings()
+            except ValueError as err:
+                print err.args[0]
+                return False
+        return True
+        
     def ProcessSurface(self):
         """Method for processing surface mesh data to acquire topographic variables."""
         
@@ -205,10 +216,11 @@ class MainWidget(QtGui.QWidget):
                                       self.DNEOptionsWindow.dneiteration.text(), self.DNEOptionsWindow.dnestepsize.text(), 
                                       self.DNEOptionsWindow.dneconditioncontrolcheck.isChecked(), 
                                       self.DNEOptionsWindow.outliervgroup.isChecked(), self.DNEOptionsWindow.dneoutlierval.text(), 
-                                      self.DNEOptionsWindow.dneoutliertype1.isChecked(), self.filename)
+                                      self.DNEOptionsWindow.dneoutliertype1.isChecked(), self.filename,
+                                      self.DNEOptionsWindow.sweep_settings())
                         
         if self.rficheck.isChecked():
-            self.TopoMesh.GenerateRFI()
+            self.TopoMesh.GenerateRFI(trusted=True)
             
         if self.opcrcheck.isChecked():
             self.TopoMesh.GenerateOPCR(self.OPCROptionsWindow.opcrminpatch.text())
@@ -219,6 +231,8 @@ class MainWidget(QtGui.QWidget):
         Connected to Process File Button."""     
         if not self.dnecheck.isChecked() and not self.rficheck.isChecked() and not self.opcrcheck.isChecked():
             print "No topographic variables have been selected for analysis."    
+        if not self.CheckSettings():
+            return
         self.ProcessSurface()
         
         if self.dnecheck.isChecked():
@@ -227,14 +241,14 @@ class MainWidget(QtGui.QWidget):
                 print "\nDNE could not be calculated due to cholesky factorization error."
             else:
                 if self.DNEOptionsWindow.outliervgroup.isChecked():
-                    print "\nPolygons removed as outliers:"
-                    for face in self.TopoMesh.outlierfaces:
-                        print "Polygon: %s\tEnergy: %s\tArea %s" % (face[0], face[1], face[2])
+                    self.PrintOutlierSummary(self.TopoMesh.outlierfaces)
                 if self.DNEOptionsWindow.dneconditioncontrolcheck.isChecked():
                     print "\nPolygons removed for high matrix condition numbers:"
                     for face in self.TopoMesh.conditionfaces:
                         print "Polygon: %s\tMatrix condition number: %s" % (face[0], face[1])
                 print "\nNumber of edge polygons ignored: %s" % len(self.TopoMesh.boundaryfaces)
+                if len(self.TopoMesh.nanvertices):
+                    print "\nVertices with nan normals: %s" % len(self.TopoMesh.nanvertices)
         
         print "\n--------------------"   
         print "RESULTS"
@@ -245,6 +259,8 @@ class MainWidget(QtGui.QWidget):
                 print "\nError (Cholesky factorization error)"
             else:
                 print "\nDNE: %s" % self.TopoMesh.DNE
+                for setting, dne in zip(self.DNEOptionsWindow.sweep_settings(), self.TopoMesh.DNEsweep):
+                    print "%s: %s" % (self.DNEOptionsWindow.sweep_label(setting), dne)
                 if self.DNEOptionsWindow.visvgroup.isChecked():
                     MayaviView.VisualizeDNE(self.mayaviview, self.TopoMesh.DNEscalars, self.DNEOptionsWindow.dnerelvischeck.isChecked(),
                                             float(self.DNEOptionsWindow.dneabsminval.text()), 
@@ -262,29 +278,44 @@ class MainWidget(QtGui.QWidget):
         if self.OPCROptionsWindow.visualizeopcrcheck.isChecked() and self.DNEOptionsWindow.visvgroup.isChecked() and self.dnecheck.isChecked() and self.opcrcheck.isChecked():
             print "DNE and OPCR visualization both requested. Defaulting to OPCR visualization."
                 
+    def PrintOutlierSummary(self, outlierfaces):
+        """Prints summary table of polygons removed as DNE outliers, rather than one row per polygon."""
+        print "\nPolygons removed as outliers: %s" % len(outlierfaces)
+        if not len(outlierfaces):
+            return
+        print "\tMin\tMax\tTotal"
+        print "Energy\t%s\t%s\t%s" % (nanmin(outlierfaces['energy']), nanmax(outlierfaces['energy']), nansum(outlierfaces['energy']))
+        print "Area\t%s\t%s\t%s" % (nanmin(outlierfaces['area']), nanmax(outlierfaces['area']), nansum(outlierfaces['area']))
+        
     def CalcDir(self): 
-        """Method for batch processing a directory of .ply surface mesh files.
+        """Method for batch processing a directory of .ply, .ply.gz, .off and .stl surface mesh files.
         
         Connected to Process Directory button."""       
         if not self.dnecheck.isChecked() and not self.rficheck.isChecked() and not self.opcrcheck.isChecked():
             print "No topographic variables have been selected for analysis."
             return
+        if not self.CheckSettings():
+            return
+      
+        sweep = self.DNEOptionsWindow.sweep_settings() if self.dnecheck.isChecked() else []
       
         resultsfile = open(os.path.join(self.dirpath,'morphoresults.txt'),'w')
-        resultsfile.write("Filename\tMesh Face Number\tDNE\tRFI\tSurface Area\tOutline Area\tOPCR\n")
+        resultsfile.write("Filename\tMesh Face Number\tDNE\tRFI\tSurface Area\tOutline Area\tOPCR")
+        resultsfile.write("".join("\t%s" % self.DNEOptionsWindow.sweep_label(setting) for setting in sweep) + "\n")
            
         for filename in os.listdir(self.dirpath):
-            if filename[-3:] == "ply":
+            if plython.mesh_extension(filename):
                 self.filename = filename
                 print "Processing " + filename + "..."
                 self.TopoMesh = topomesh.TopoMesh(os.path.join(self.dirpath,filename))
                 self.ProcessSurface()
-                resultsfile.write("%s\t%s\t%s\t%s\t%s\t%s\t%s\n" % (filename, self.TopoMesh.nface, self.TopoMesh.DNE, 
-                                                                    self.TopoMesh.RFI, self.TopoMesh.surfarea, 
-                                                                    self.TopoMesh.projarea, self.TopoMesh.OPCR))
+                resultsfile.write("%s\t%s\t%s\t%s\t%s\t%s\t%s" % (filename, self.TopoMesh.nface, self.TopoMesh.DNE, 
+                                                                self.TopoMesh.RFI, self.TopoMesh.surfarea, 
+                                                                self.TopoMesh.projarea, self.TopoMesh.OPCR))
+                resultsfile.write("".join("\t%s" % dne for dne in (self.TopoMesh.DNEsweep or [None]*len(sweep))) + "\n")
                 print "\n--------------------\n"
             else:
-                print filename + "does not have a .ply extension, skipping to next file."
+                print filename + " does not have a .ply, .ply.gz, .off or .stl extension, skipping to next file."
         resultsfile.close()
         
     def fair_file(self):
@@ -294,7 +325,7 @@ class MainWidget(QtGui.QWidget):
         
     def fair_directory(self):
         for filename in os.listdir(self.dirpath):
-            if filename[-3:] == "ply":
+            if plython.mesh_extension(filename):
                 print "Implicit fairing " + filename + "..."
                 self.TopoMesh = topomesh.TopoMesh(os.path.join(self.dirpath,filename))
                 self.fair_mesh(os.path.join(self.dirpath,filename))
@@ -306,7 +337,7 @@ class MainWidget(QtGui.QWidget):
         fairdir = os.path.join(os.path.dirname(filepath), 'faired-mesh', '')
         if not os.path.exists(fairdir):
             os.mkdir(fairdir)
-        self.TopoMesh.SaveArray(os.path.join(fairdir, (filename[:-4] + "-faired.ply")))
+        self.TopoMesh.SaveArray(os.path.join(fairdir, (filename[:-len(plython.mesh_extension(filename))] + "-faired.ply")))
 
 class MayaviView(HasTraits):    
     """Class for 3D visualization of polygonal meshes and related 2D decorators.
@@ -484,6 +515,13 @@ class DNEOptionsWindow(QtGui.QDialog):
         self.dneoutlierbuttons.addButton(self.dneoutliertype2)
         self.outliervgroup = VGroupBoxWidget('Outlier removal', [self.dneoutliertype1, self.dneoutliertype2, self.outlierhbox])       
         
+        # Outlier percentile sweep controls, reported for both outlier types
+        self.dnesweeplabel = QtGui.QLabel("Percentiles")
+        self.dnesweepval = QtGui.QLineEdit("99, 99.5, 99.9")
+        self.sweephbox = HBoxWidget([self.dnesweeplabel, self.dnesweepval], spacing=6)
+        self.sweepvgroup = VGroupBoxWidget('Outlier percentile sweep', [self.sweephbox])
+        self.sweepvgroup.setChecked(0)
+        
         # Smoothing controls
         self.dneiterationlabel = QtGui.QLabel("Iterations")
         self.dneiteration = QtGui.QLineEdit("3")
@@ -522,6 +560,7 @@ class DNEOptionsWindow(QtGui.QDialog):
         self.layout.addWidget(self.dneconditioncontrolcheck)
         
         self.layout.addWidget(self.outliervgroup)
+        self.layout.addWidget(self.sweepvgroup)
         self.layout.addWidget(self.fairvgroup)
         self.layout.addWidget(self.visvgroup)
         
@@ -535,6 +574,32 @@ class DNEOptionsWindow(QtGui.QDialog):
     def OKClose(self):
         """Closes submenu on OK."""
         self.close()
+    
+    def sweep_settings(self):
+        """Returns (percentile, outlier type) pairs for outlier percentile sweep, each percentile with both outlier types.
+        
+        Raises ValueError naming any entries that are not percentiles from 0 to 100.
+        """
+        if not self.sweepvgroup.isChecked():
+            return []
+        percs = [perc.strip() for perc in str(self.dnesweepval.text()).split(',') if perc.strip()]
+        
+        invalid = list()
+        for perc in percs:
+            try:
+                if not 0 <= float(perc) <= 100:
+                    invalid.append(perc)
+            except ValueError:
+                invalid.append(perc)
+        if invalid:
+            raise ValueError("Outlier percentile sweep entries must be percentiles from 0 to 100, not %s." % ", ".join(invalid))
+        
+        return [(float(perc), outliertype) for perc in percs for outliertype in (1, 0)]
+    
+    def sweep_label(self, setting):
+        """Returns results label for an outlier percentile sweep setting."""
+        outlierperc, outliertype = setting
+        return "DNE %s%s" % (outlierperc, " Energy x area" if outliertype else " Energy")
         
 class OPCROptionsWindow(QtGui.QDialog):
     """Submenu for selecting optional parameters for OPCR calculation."""
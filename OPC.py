@@ -9,11 +9,12 @@ details on method.
 '''
 
 from copy import copy as pcopy
-from numpy import array, matrix, mat, transpose, average, subtract, row_stack
+from numpy import array, matrix, mat, transpose, average, subtract, row_stack, lexsort
 from numpy import mean as amean
 from collections import defaultdict
 
 import math
+import adjacency
 import normcore
 
 class MeshOPCR(object):
@@ -39,8 +40,9 @@ class MeshOPCR(object):
             rotation), each of which lists polygons sorted into colors
             based on XY aspect (direction that polygon faces) for that
             rotation. 
-        vert_tri_dict (dict): Associates vertex index keys with related
-            face index values. 
+        vert_tri_dict (VertTriCSR): Associates vertex index keys with related
+            face index values, see adjacency.VertTriCSR. 
+        adjacent_face_pairs (list): Pairs of polygons sharing an edge. 
         fnormal (ndarray): Normalized unit normals of surface polygons. 
         vnormal (ndarray): Normalized approximated unit normals of surface
             vertices (approximated as average of normals of associated faces).
@@ -56,6 +58,7 @@ class MeshOPCR(object):
         self.patches_list = [None, None, None, None, None, None, None, None]
         self.colormap_list = [None, None, None, None, None, None, None, None]
         self.vert_tri_dict = None
+        self.adjacent_face_pairs = None
         self.fnormal = None
         self.vnormal = None
         self.OPCR = None
@@ -69,22 +72,24 @@ class MeshOPCR(object):
         self.MeshRotated = pcopy(self.Mesh)
         
         self._get_vert_tri_dict()
+        self._get_adjacent_face_pairs()
         
         self.opc_list[0], self.patches_list[0], self.colormap_list[0] = self._get_opc(self.Mesh.vertices, 
-                                                                                      self.Mesh.faces, 
-                                                                                      self.Mesh.triverts)
+                                                                                      self.Mesh.faces)
         
         for i in range(1,self.n_rotations):
                 self._rotatemesh()
                 self.opc_list[i], self.patches_list[i], self.colormap_list[i] = self._get_opc(self.MeshRotated.vertices, 
-                                                                                              self.MeshRotated.faces, 
-                                                                                              self.MeshRotated.triverts)
+                                                                                              self.MeshRotated.faces)
         
         self.OPCR = average(self.opc_list)
         
-    def _get_opc(self, vertices, faces, triverts):
-        """Calculates and returns OPC, list of patches, and list of polygons sorted into color bins by XY aspect."""
-        self.vnormal, self.fnormal = normcore.computenormal(vertices, faces, triverts, self.vert_tri_dict)
+    def _get_opc(self, vertices, faces, triverts=None):
+        """Calculates and returns OPC, list of patches, and list of polygons sorted into color bins by XY aspect.
+        
+        Normals are computed from vertices and faces alone, so triverts is unused.
+        """
+        self.vnormal, self.fnormal = normcore.computenormal(vertices, faces)
         
         flatfaces = array([i for i, norm in enumerate(self.fnormal) if (norm[0:1] == 0).all()], dtype=int)
         orientation_map = array([self._xydegrees(norm[1],norm[0]) for norm in self.fnormal])
@@ -92,13 +97,10 @@ class MeshOPCR(object):
         color_map = array([self._sort_to_colors(aspect_theta) for aspect_theta in orientation_map])
         color_map[flatfaces] = '#000000'
             
-        pairdict = defaultdict(list) #lists per vertex all possible pairs of polygons that include that vertex 
-        for vertex, faces in self.vert_tri_dict.iteritems():
-            pairdict[vertex] = self._pair_faces(faces)
-            
-        adjacent_face_pairs = self._adjacent_face_pairs(pairdict)    
+        if self.adjacent_face_pairs is None:
+            self._get_adjacent_face_pairs()
         
-        same_color_pairs = [pair for pair in adjacent_face_pairs if color_map[pair[0]] == color_map[pair[1]]]
+        same_color_pairs = [pair for pair in self.adjacent_face_pairs if color_map[pair[0]] == color_map[pair[1]]]
         
         color_face_dict = defaultdict(list) # lists adjacent polygon pairs for each color bin
         for item in same_color_pairs:
@@ -120,13 +122,22 @@ class MeshOPCR(object):
         return array([subtract(vert,centroid) for vert in vert_sequence])
 
     def _get_vert_tri_dict(self):
-        """Generates dictionary associating vertex index keys with related polygon index values.""" 
-        self.vert_tri_dict = defaultdict(list)
-        
-        for findex, face in enumerate(self.Mesh.faces):
-            for vertex in face:
-                self.vert_tri_dict[vertex].append(findex)        
+        """Gets adjacency associating vertex index keys with related polygon index values.""" 
+        self.vert_tri_dict = adjacency.mesh_vert_tri(self.Mesh)
 
+    def _get_adjacent_face_pairs(self):
+        """Lists pairs of polygons sharing an edge from mesh edge table, sorted by first then second polygon index."""
+        pairs = adjacency.mesh_edge_table(self.Mesh).face_pairs()[0]
+        pairs = pairs[lexsort((pairs[:,1], pairs[:,0]))].tolist()
+        
+        self.adjacent_face_pairs = list()
+        for i, pair in enumerate(pairs):
+            if i and pair == pairs[i-1]:
+                # polygons sharing more than one edge share all three vertices
+                print "WARNING: POSSIBLE IDENTICAL TRIANGLES AT ", tuple(pair)
+            else:
+                self.adjacent_face_pairs.append(tuple(pair))
+    
     def _rotatemesh(self):
         """Rotates mesh theta radians around Z-axis."""
         zrotmat = matrix([[math.cos(self.theta),(-1*math.sin(self.theta)),0],[math.sin(self.theta),math.cos(self.theta),0],[0,0,1]])
@@ -150,27 +161,6 @@ class MeshOPCR(object):
         group = int(modtheta//45)
         return colorlist[group]
     
-    def _pair_faces(self, inputlist):
-        """Given a list of numbers, returns all possible pairs of numbers without replication or identical-number pairs."""
-        return [(x,y) for x in set(inputlist) for y in set(inputlist) if x < y]
-    
-    def _adjacent_face_pairs(self, pairdict):
-        """Given a list of polygon face pairs sharing vertices, returns the subset of polygon pairs where pair members share an edge.""" 
-        touching_list = list() 
-        seen = set() 
-        seentwice = set()
-        for item in pairdict:
-            for pair in pairdict[item]:
-                if pair in seen:
-                    touching_list.append(pair)
-                    if pair in seentwice:
-                        print "WARNING: POSSIBLE IDENTICAL TRIANGLES AT ", pair
-                    else:
-                        seentwice.add(pair)
-                else:
-                    seen.add(pair)
-        return touching_list    
-
     def _build_patches(self, face_pairs): 
         """Given a list of adjacent pairs of polygons on a surface, returns list of all contiguous patches of polygons involving provided pairs."""
         patcheslist = list()
@@ -2,25 +2,32 @@
 Created on Sep 2, 2011
 
 This module calculates relief index (3D surface area/2D area of surface
-projected on XY plane) for a provided 3D mesh using the MeshRFI class. 
+projected on XY plane) for a provided 3D mesh using the MeshRFI class. Projected
+area is measured either from a 2D render of the mesh (default), from a grid of
+cells of known area (see raster.projected_area), or exactly from the projected 
+mesh outline (see outline.projected_area).
 
 @author: Julia M. Winchester
 '''
 
-import matplotlib
-matplotlib.use('AGG')
-
-import warnings
-import matplotlib.pyplot as plt
 from StringIO import StringIO
-from numpy import sqrt, square, amin, amax, array, array_equal
-from numpy.linalg import det
+from numpy import square, amin, amax
+from plython import check_faces
+
+import adjacency
+import normcore
+import outline
+import raster
+import render
 
 try:
     import Image
 except ImportError:
     from PIL import Image
 
+# Projected area measurement modes accepted by MeshRFI
+PROJECTION_MODES = ('render', 'raster', 'exact')
+
 class MeshRFI(object):
     """Class for calculating and storing relief index values for polygonal mesh data. 
     
@@ -29,11 +36,23 @@ class MeshRFI(object):
     
     Args:
         TopoMesh (TopoMesh object): Triangulated polygon mesh data. 
+        trusted (bool): If true, skip mesh consistency check, e.g. for mesh data 
+            just read from a .ply file.
+        projmode (str): How projected area is measured. 'render' counts pixels of 
+            a 2D plot of the mesh, 'raster' counts covered cells of a grid with 
+            known cell area, 'exact' calculates the area of the union of polygons 
+            projected on the XY plane. In 'raster' mode bluepixie and pixelratio 
+            are the number of covered cells and cells per unit length, and other 
+            pixel attributes below are left as None, as are all pixel attributes 
+            in 'exact' mode.
+        resolution (int): Number of grid cells along the longer XY side of the 
+            mesh in 'raster' mode.
     
     Attributes:
         Mesh (TopoMesh object): Triangulated polygon mesh data. 
         RFI (float): Mesh surface relief index (surfarea/projarea).
         surfarea (float): 3D mesh surface area.
+        facearea (ndarray): 3D areas of mesh polygons, see normcore.facearea.
         projarea (float): 2D mesh surface area projected on XY plane.
         linelin (float): Reference line for building pixel/area unit ratio.
         bluepixie (float): Number of blue pixels (mesh) on projected area render.
@@ -43,10 +62,16 @@ class MeshRFI(object):
         imgbuffer (StringIO object): 2D plot of surface mesh with reference line for
                                     determining projected XY-plane surface area.
     """
-    def __init__(self, TopoMesh): 
+    def __init__(self, TopoMesh, trusted=False, projmode='render', resolution=raster.RESOLUTION): 
+        if projmode not in PROJECTION_MODES:
+            raise ValueError("Unknown projected area mode %s, expected one of %s." % (projmode, ", ".join(PROJECTION_MODES)))
+        
         self.Mesh = TopoMesh
+        self.projmode = projmode
+        self.resolution = resolution
         self.RFI = None
         self.surfarea = None
+        self.facearea = None
         self.projarea = None
         self.linelen = None
         self.bluepixie = None
@@ -54,55 +79,55 @@ class MeshRFI(object):
         self.pixelratio = None
         self.imgbuffer = None
         
-        self._check_mesh_consistency()
+        if not trusted:
+            self._check_mesh_consistency()
         
         self.calcrfi()
         
     def calcrfi(self):
         """Calls methods for calculating surface and projected areas, then derives relief index value."""
-        self.surfarea = round(sum(self._triangle_area(face) for face in self.Mesh.triverts),3)      
+        if self.Mesh.vertices.shape[-1] != 3:
+            raise IndexError("Mesh vertices have %s coordinates, XYZ points are needed for surface area." % self.Mesh.vertices.shape[-1])
+        self.facearea = normcore.mesh_facearea(self.Mesh)
+        self.surfarea = round(self.facearea.sum(), 3)
         self._get_projection_area()
         self.RFI = round(self.surfarea/self.projarea, 3)
     
     def _get_projection_area(self):
-        """Creates 2D plot of surface mesh and derives projection area from this plot."""
-        self._plot_surface()
-        self._get_2d_area()
+        """Derives projection area from a 2D plot of surface mesh, from a grid of cells in 'raster' mode, or from mesh outline in 'exact' mode."""
+        if self.projmode == 'exact':
+            self._get_outline_area()
+        elif self.projmode == 'raster':
+            self._get_raster_area()
+        else:
+            self._plot_surface()
+            self._get_2d_area()
+    
+    def _get_raster_area(self):
+        """Derives 2D surface area of polygonal mesh projected on XY plane from the number of covered cells of a grid."""
+        projarea, self.bluepixie, cellsize = raster.projected_area(self.Mesh.vertices, self.Mesh.faces, self.resolution)
+        self.pixelratio = 1.0/cellsize
+        self.projarea = round(projarea, 3)
+    
+    def _get_outline_area(self):
+        """Calculates 2D surface area of polygonal mesh projected on XY plane as the area of the union of projected polygons."""
+        self.projarea = round(outline.projected_area(self.Mesh.vertices, self.Mesh.faces, adjacency.mesh_edge_table(self.Mesh)), 3)
+        
+        if self.projarea == 0.0:
+            raise ValueError("Polygon mesh has a zero area projected in the XY plane.")
     
     def _plot_surface(self): # Returns pixel length of scalebar and image plot as StringIO file-like object
-        """Plots 3D polygonal mesh as 2D raster shape on the XY plane with reference line for area units."""
-        xarray = self.Mesh.vertices[:,0]
-        yarray = self.Mesh.vertices[:,1]
+        """Plots 3D polygonal mesh as 2D raster shape on the XY plane with reference line for area units.
         
-        xaxismin = amin(xarray) - 0.5
-        xaxismax = amax(xarray) + 0.5
-        yaxismin = amin(yarray) - 0.5
-        yaxismax = amax(yarray) + 0.5
+        The plot is drawn with the render context shared by all plots (see render.RenderContext).
+        """
+        yarray = self.Mesh.vertices[:,1]
         self.linelen = amax(yarray) - amin(yarray) + 1.0
         
         if self.linelen == 1.0:
             raise ValueError("Polygon mesh has a zero area projected in the XY plane.")
         
-        fig = plt.figure()
-        ax = fig.add_subplot(111)
-            
-        linesquare = matplotlib.patches.Polygon([[xaxismin,yaxismin],[xaxismin,yaxismax]], ec='r',fc='r')
-        plt.axis([xaxismin,xaxismax,yaxismin,yaxismax])
-        ax.add_patch(linesquare)
-    
-        ax.set_xscale('linear')
-        ax.set_yscale('linear')
-        ax.set_aspect(1)
-        ax.axis('off')
-        
-        vert = array([face[:,[0,1]] for face in self.Mesh.triverts]) # makes a copy of self.Mesh.triverts including only XY coordinate points for vertices comprising faces 
-           
-        polygons = matplotlib.collections.PolyCollection(vert,facecolor='b',edgecolor='b')
-            
-        ax.add_collection(polygons)
-        
-        self.imgbuffer = StringIO()
-        plt.savefig(self.imgbuffer,format='png')
+        self.imgbuffer = render.rendercontext().plot(self.Mesh.vertices, self.Mesh.triverts)[1]
     
     def _get_2d_area(self): # Receives image plot from StringIO object and returns absolute area covered by mesh as projected on XY plane   
         """Derives 2D surface area of polygonal mesh projected on XY plane given a 2D raster plot and area-unit reference line."""
@@ -110,11 +135,12 @@ class MeshRFI(object):
             raise TypeError("Non-StringIO object provided for imgbuffer.")
         
         self.imgbuffer.seek(0) # Rewind image buffer back to beginning to allow Image.open() to identify it
-        img = Image.open(self.imgbuffer).getdata()  
-
+        pixels = render.pixelvalues(Image.open(self.imgbuffer))
         
-        self.redpixie = self._count_pixels(img, (255,0,0,255), (255,127,127,255))
-        self.bluepixie = len(list(img)) - self._count_pixels(img, (255, 0, 0, 255), (255, 255, 255, 255), (255, 155, 155, 255), (255, 188, 188, 255), (255, 230, 230, 255), (255, 205, 205, 255))    
+        # reference line and background pixels counted in one pass, see render.colorcounts
+        counts = render.colorcounts(pixels, render.REFERENCE_COLORS + render.BACKGROUND_COLORS)
+        self.redpixie = int(counts[:len(render.REFERENCE_COLORS)].sum())
+        self.bluepixie = len(pixels) - int(counts[len(render.REFERENCE_COLORS):].sum())
             
         rope = float(self.linelen)
         redballoon = float(self.redpixie)   
@@ -122,38 +148,15 @@ class MeshRFI(object):
         
         self.projarea = round(float(self.bluepixie)*(square(rope)/square(redballoon)), 3)
 
-    def _count_pixels(self, image, *args): # Returns the number of pixels in a list of RGB+transparency values that match the colors (RGB+transparency) given in colorlist
-        """Returns the number of pixels in an image that match colors given as *args.
-        
-        Args:
-            image (StringIO object): Image string buffer object from which pixels are counted.
-            *args: Series of lists or tuples of RGB+transparency value color data. Pixels in 
-                    image that match these colors will be counted.
-        """
-        return sum([list(image).count(color) for color in set(args)])
-     
-    def _triangle_area(self, verts):
-        """Returns the area of a triangle defined by vertices.
+    def _check_mesh_consistency(self):
+        """Checks mesh vertex and face-vertex arrays to ensure identical vertices throughout.
         
-        Args:
-            verts(ndarray): A set of three XYZ point triplets forming a triangle. 
+        Face-vertex arrays built on demand from vertices and faces are consistent by 
+        construction, so are only compared if already present on mesh.
         """
-        fx = verts[:,0]
-        fy = verts[:,1]
-        fz = verts[:,2]
-        fc = [1,1,1]
-        
-        a = [fx, fy, fc]
-        b = [fy, fz, fc]
-        c = [fz, fx, fc]
-        
-        return 0.5*sqrt(square(det(a))+square(det(b))+square(det(c)))
-    
-    def _check_mesh_consistency(self):
-        """Checks mesh vertex and face-vertex arrays to ensure identical vertices throughout."""
-        for i, trivert in enumerate(self.Mesh.triverts):
-            if (trivert != self.Mesh.vertices[self.Mesh.faces[i]]).any():
-                raise ValueError("Mesh vertex and face arrays do not contain identical vertices.")
+        triverts = getattr(self.Mesh, '_triverts', None)
+        if triverts is not None:
+            check_faces(self.Mesh.vertices, self.Mesh.faces, triverts)
 
 
 
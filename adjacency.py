@@ -0,0 +1,182 @@
+'''
+Array-backed adjacency structures for triangulated polygon meshes. VertTriCSR associates each
+mesh vertex with the polygons that include it, storing polygon indices for all vertices in a
+single array grouped by vertex (compressed sparse row form) instead of a dictionary of lists.
+It is built with a stable argsort of polygon vertex indices and a bincount of vertex uses, and
+supports the dictionary-style access (vert_tri[vertex], iteritems()) previously used with
+defaultdict vertex to polygon dictionaries. EdgeTable lists unique mesh edges, the polygons using
+each edge, and boundary edges, built by sorting polygon half-edges.
+'''
+
+from numpy import asarray, argsort, bincount, concatenate, cumsum, flatnonzero, zeros, empty, unique, arange, column_stack, repeat, dtype, void
+
+# Corner pairs of each polygon forming its half-edges, in the order edges were numbered by MeshDNE._get_edge_verts
+HALFEDGE_CORNERS = [0, 1, 2, 0, 1, 2]
+
+class VertTriCSR(object):
+    """Vertex to polygon adjacency of a triangulated polygon mesh in compressed sparse row form.
+
+    Polygon indices of vertex i are indices[offsets[i]:offsets[i+1]], in ascending order, with
+    a polygon listed once per use of the vertex. Vertices not used by any polygon have no
+    polygons and are not keys.
+
+    Args:
+        faces (ndarray): Polygons with component vertex indices for mesh.
+        nvert (int): Number of vertices in mesh. Vertex indices above nvert in faces
+            extend the adjacency as needed.
+
+    Attributes:
+        offsets (ndarray): Start of polygon indices of each vertex within indices,
+            followed by total number of polygon vertex uses.
+        indices (ndarray): Polygon indices grouped by vertex.
+        corners (ndarray): Position (0, 1 or 2) of vertex within each polygon in indices.
+    """
+    def __init__(self, faces, nvert=0):
+        vertexuses = asarray(faces).ravel().astype(int)
+
+        # stable sort keeps polygons of each vertex in ascending order
+        order = argsort(vertexuses, kind='mergesort')
+        counts = bincount(vertexuses, minlength=nvert)
+
+        self.offsets = concatenate((zeros(1, int), cumsum(counts)))
+        self.indices = order // 3
+        self.corners = order % 3
+
+    def __getitem__(self, vertex):
+        """Returns polygon indices of vertex, empty for vertices not used by any polygon."""
+        if vertex < 0 or vertex >= len(self.offsets) - 1:
+            return self.indices[:0]
+        return self.indices[self.offsets[vertex]:self.offsets[vertex+1]]
+
+    def __contains__(self, vertex):
+        return 0 <= vertex < len(self.offsets) - 1 and self.offsets[vertex+1] > self.offsets[vertex]
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        """Returns list of vertices used by at least one polygon, in ascending order."""
+        return flatnonzero(self.offsets[1:] > self.offsets[:-1]).tolist()
+
+    def iteritems(self):
+        """Yields (vertex, polygon indices) pairs for vertices used by at least one polygon, in ascending vertex order."""
+        offsets = self.offsets.tolist()
+        for vertex in self.keys():
+            yield vertex, self.indices[offsets[vertex]:offsets[vertex+1]]
+
+    def items(self):
+        return list(self.iteritems())
+
+    def todict(self):
+        """Returns adjacency as a dictionary of vertex keys and lists of polygon index values."""
+        return dict((vertex, faces.tolist()) for vertex, faces in self.iteritems())
+
+def mesh_vert_tri(Mesh):
+    """Returns vertex to polygon adjacency of mesh, reusing adjacency cached on mesh (see topomesh.TopoMesh) if present.
+
+    Args:
+        Mesh (PlythonMesh or TopoMesh object): Triangulated polygon mesh data.
+    """
+    cached = getattr(Mesh, 'vert_tri_dict', None)
+    if isinstance(cached, VertTriCSR):
+        return cached
+    return VertTriCSR(Mesh.faces, Mesh.nvert)
+
+def mesh_edge_table(Mesh):
+    """Returns edge table of mesh, reusing edge table cached on mesh (see topomesh.TopoMesh) if present.
+
+    Args:
+        Mesh (PlythonMesh or TopoMesh object): Triangulated polygon mesh data.
+    """
+    cached = getattr(Mesh, 'edge_table', None)
+    if isinstance(cached, EdgeTable):
+        return cached
+    return EdgeTable(Mesh.faces)
+
+class EdgeTable(object):
+    """Unique edges of a triangulated polygon mesh with edge to polygon incidence.
+
+    Built from the 3*nface half-edges of polygons, taken as vertex pairs (0, 1), (2, 0) and
+    (1, 2) of each polygon, by sorting half-edges on their vertex pair and grouping equal
+    pairs. Edges are numbered in order of first use by a polygon.
+
+    Args:
+        faces (ndarray): Polygons with component vertex indices for mesh. Must be
+            nface x 3, or empty.
+
+    Attributes:
+        edgeverts (ndarray): Vertex pairs of edges, larger vertex index first.
+        face_edges (ndarray): Edge indices of the (0, 1), (2, 0) and (1, 2) vertex
+            pairs of each polygon.
+        counts (ndarray): Number of polygon uses of each edge.
+        boundary (ndarray): True for edges used by exactly one polygon.
+        offsets (ndarray): Start of polygon indices of each edge within faces, followed
+            by total number of half-edges.
+        faces (ndarray): Polygon indices grouped by edge, ascending within each edge.
+    """
+    def __init__(self, faces):
+        faces = asarray(faces)
+        if faces.size == 0 and faces.ndim == 1:
+            faces = faces.reshape(0, 3)
+        if faces.ndim != 2 or faces.shape[1] != 3:
+            raise ValueError('Polygons of shape %s are not triangles, edges cannot be built.' % (faces.shape,))
+        faces = faces.astype(int)
+
+        halfedges = faces[:,HALFEDGE_CORNERS].reshape(-1, 2)
+        larger = halfedges.max(axis=1)
+        smaller = halfedges.min(axis=1)
+
+        # edge keys are unique vertex pairs; ranking keys by first use gives edge numbers
+        keys = larger*(int(faces.max()) + 1 if faces.size else 1) + smaller
+        uniquekeys, first, inverse, counts = unique(keys, return_index=True, return_inverse=True, return_counts=True)
+        firstorder = argsort(first, kind='mergesort')
+        edgenumber = empty(len(first), int)
+        edgenumber[firstorder] = arange(len(first))
+
+        self.edgeverts = column_stack((larger[first[firstorder]], smaller[first[firstorder]]))
+        self.face_edges = edgenumber[inverse].reshape(-1, 3)
+        self.counts = counts[firstorder]
+        self.boundary = self.counts == 1
+
+        halfedge_edges = self.face_edges.ravel()
+        self.offsets = concatenate((zeros(1, int), cumsum(self.counts)))
+        self.faces = argsort(halfedge_edges, kind='mergesort') // 3
+
+    def __len__(self):
+        return len(self.edgeverts)
+
+    def face_pairs(self):
+        """Returns pairs of distinct polygons sharing an edge, and the edge they share.
+
+        Each pair of polygons sharing an edge is listed once per shared edge, smaller
+        polygon index first. Edges used by more than two polygons give every pair of
+        their polygons.
+
+        Returns:
+            tuple: Polygon pairs (npair x 2 ndarray) and shared edge of each pair (ndarray).
+        """
+        edges = repeat(arange(len(self.counts)), self.counts)
+        position = arange(len(self.faces)) - self.offsets[edges]
+
+        pairs = list()
+        pairedges = list()
+        for step in range(1, int(self.counts.max()) if len(self.counts) else 1):
+            first = flatnonzero(position + step < self.counts[edges])
+            pairs.append(column_stack((self.faces[first], self.faces[first+step])))
+            pairedges.append(edges[first])
+
+        if not pairs:
+            return zeros((0, 2), int), zeros(0, int)
+
+        pairs = concatenate(pairs)
+        pairedges = concatenate(pairedges)
+        distinct = pairs[:,0] != pairs[:,1]
+        pairs, pairedges = pairs[distinct], pairedges[distinct]
+
+        # a polygon using an edge twice (repeated vertex) would otherwise pair twice with each neighbour
+        uniquerows = unique(column_stack((pairedges, pairs)).view(dtype((void, 3*pairs.itemsize))).ravel(), return_index=True)[1]
+        uniquerows.sort()
+        return pairs[uniquerows], pairedges[uniquerows]
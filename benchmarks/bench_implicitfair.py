@@ -0,0 +1,81 @@
+'''
+Benchmarks cotangent Laplacian assembly in implicitfair.laplaciantension against the previous
+assembly, which walked the face ring of every vertex and updated a lil_matrix element by element,
+and times sparse factorization of the implicit fairing system. Timings are taken on synthetic
+height-field grid meshes of 10k to 1M polygons; the previous assembly is only timed on the smaller
+meshes. Run from the repository root:
+
+    python benchmarks/bench_implicitfair.py
+'''
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import adjacency
+import implicitfair
+from numpy import arange, meshgrid, column_stack, vstack, sin, cos, diag, absolute
+from scipy.sparse import identity, lil_matrix
+from math import tan
+
+def grid_mesh(nface):
+    """Returns vertices and polygons of a wavy grid mesh with about nface polygons."""
+    n = int((nface / 2) ** 0.5) + 1
+    x, y = meshgrid(arange(n, dtype=float), arange(n, dtype=float))
+    vertices = column_stack((x.ravel(), y.ravel(), (3 * sin(x / 7.0) * cos(y / 5.0)).ravel()))
+
+    index = arange(n * n).reshape(n, n)
+    a, b, c, d = index[:-1,:-1].ravel(), index[:-1,1:].ravel(), index[1:,:-1].ravel(), index[1:,1:].ravel()
+    faces = vstack((column_stack((a, b, c)), column_stack((b, d, c))))
+    return vertices, faces
+
+def legacy_laplaciantension(vertex, faceindex, vert_tri_dict):
+    """Previous Laplacian assembly, kept here as the reference for timing and output comparison."""
+    n = len(vertex)
+    L = lil_matrix((n,n))
+
+    for i in range(0,n):
+        for b in vert_tri_dict[i]:
+            bf = faceindex[b]
+            if bf[0] == i:
+                j, k = bf[1], bf[2]
+            elif bf[1] == i:
+                j, k = bf[0], bf[2]
+            else:
+                j, k = bf[0], bf[1]
+            vi, vj, vk = vertex[i], vertex[j], vertex[k]
+
+            alpha = implicitfair.My_Angle(vk-vi, vk-vj)
+            beta = implicitfair.My_Angle(vj-vi, vj-vk)
+
+            L[i,j] = L[i,j] + (0 if alpha == 0 else 1/tan(alpha))
+            L[i,k] = L[i,k] + (0 if beta == 0 else 1/tan(beta))
+
+    return L - diag([float(i) for i in L.sum(axis=1)])
+
+def bench_mesh(nface, legacy=False, repeat=3):
+    """Returns polygon count and best-of-repeat timings in seconds for Laplacian assembly (previous and current) and factorization."""
+    vertices, faces = grid_mesh(nface)
+    vert_tri_dict = adjacency.VertTriCSR(faces, len(vertices))
+
+    L = implicitfair.laplaciantension(vertices, faces, vert_tri_dict)
+    legacytime = None
+    if legacy:
+        if absolute(legacy_laplaciantension(vertices, faces, vert_tri_dict) - L.toarray()).max() > 0:
+            raise ValueError('Laplacians disagree for %s polygons.' % len(faces))
+        legacytime = min(timeit.repeat(lambda: legacy_laplaciantension(vertices, faces, vert_tri_dict), number=1, repeat=1))
+
+    currenttime = min(timeit.repeat(lambda: implicitfair.laplaciantension(vertices, faces, vert_tri_dict), number=1, repeat=repeat))
+    tochol = identity(len(vertices)) - 0.1 * L
+    factortime = min(timeit.repeat(lambda: implicitfair.factorize(tochol), number=1, repeat=1))
+    return len(faces), legacytime, currenttime, factortime
+
+def main():
+    print "%10s %12s %12s %12s" % ("Faces", "Legacy (s)", "Current (s)", "Factor (s)")
+    for nface in [10000, 20000, 100000, 300000, 1000000]:
+        nface, legacytime, currenttime, factortime = bench_mesh(nface, legacy=nface <= 20000)
+        print "%10d %12s %12.4f %12.4f" % (nface, "%.4f" % legacytime if legacytime else "-", currenttime, factortime)
+
+if __name__ == "__main__":
+    main()
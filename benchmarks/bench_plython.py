@@ -0,0 +1,63 @@
+'''
+Benchmarks the ASCII .ply reader in plython against the previous per-line reader, which split 
+every line of the file and built the vertex, face and face-vertex arrays with list comprehensions,
+and times header-only probing of .ply files with plython.probe. Timings are taken on the meshes 
+in Sample Data. Run from the repository root:
+
+    python benchmarks/bench_plython.py
+'''
+import os
+import sys
+import glob
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import plython
+from numpy import array
+
+def legacy_read_ascii(mesh, meshstring):
+    """Previous ASCII reader, kept here as the reference for timing and output comparison."""
+    meshdata = meshstring[meshstring.find('end_header'):].splitlines()[1:]
+    vlist = meshdata[0:mesh.nvert]
+    flist = meshdata[mesh.nvert:(mesh.nvert+mesh.nface)]
+    varray = array([vertices.split() for vertices in vlist], float)
+    farray = array([vertices.split()[1:4] for vertices in flist], int)
+    vfarray = array([[varray[vindex] for vindex in vertices] for vertices in farray], float)
+    return varray, farray, vfarray
+
+def bench_file(filepath, repeat=5):
+    """Returns best-of-repeat timings in seconds for the legacy and current ASCII readers on one file."""
+    mesh = plython.PlythonMesh()
+    with open(filepath, 'rb') as meshfile:
+        header = mesh._read_header(meshfile)
+        meshdata = meshfile.read()
+    meshstring = header + meshdata
+    
+    datamode, elements = mesh._parse_header(header)
+    
+    legacy = legacy_read_ascii(mesh, meshstring)
+    current = mesh._read_ascii(meshdata, elements)
+    if not all((old == new).all() for old, new in zip(legacy, current)):
+        raise ValueError('Readers disagree on %s.' % filepath)
+    
+    legacytime = min(timeit.repeat(lambda: legacy_read_ascii(mesh, meshstring), number=1, repeat=repeat))
+    currenttime = min(timeit.repeat(lambda: mesh._read_ascii(meshdata, elements), number=1, repeat=repeat))
+    return mesh.nface, legacytime, currenttime
+
+def bench_probe(filepaths, nfiles=5000):
+    """Returns seconds taken to probe nfiles .ply headers, cycling through filepaths."""
+    probepaths = [filepaths[i % len(filepaths)] for i in range(nfiles)]
+    return min(timeit.repeat(lambda: [plython.probe(filepath) for filepath in probepaths], number=1, repeat=3))
+
+def main():
+    sampledir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Sample Data')
+    print "%-36s %8s %12s %12s %8s" % ("File", "Faces", "Legacy (s)", "Current (s)", "Speedup")
+    for filepath in sorted(glob.glob(os.path.join(sampledir, '*.ply'))):
+        nface, legacytime, currenttime = bench_file(filepath)
+        print "%-36s %8d %12.4f %12.4f %7.1fx" % (os.path.basename(filepath), nface, legacytime, currenttime, legacytime/currenttime)
+    
+    print "\nProbed 5000 .ply headers in %.4f s" % bench_probe(sorted(glob.glob(os.path.join(sampledir, '*.ply'))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+'''
+Benchmarks projected area measurement in RFI.MeshRFI, comparing the default 'render' mode, which
+plots the mesh with matplotlib and counts pixels of the saved image, with the 'raster' mode, which
+fills polygons into a grid of cells (see raster.py), at two resolutions, and the 'exact' mode, which
+calculates the area of the union of polygons projected on the XY plane (see outline.py). Only the
+projected area step is timed, surface area being shared by all modes. Timings and projected areas
+are reported for the meshes in Sample Data. Run from the repository root:
+
+    python benchmarks/bench_rfi.py
+'''
+import os
+import sys
+import glob
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import topomesh
+import RFI
+import raster
+
+# Projected area modes and raster resolutions timed
+MODES = [('render', None), ('raster', 1000), ('raster', 4000), ('exact', None)]
+
+def bench_file(filepath, repeat=3):
+    """Returns polygon count, and best-of-repeat timing in seconds and projected area for each of MODES on one file."""
+    mesh = topomesh.TopoMesh(filepath)
+    
+    results = list()
+    for projmode, resolution in MODES:
+        MeshRFI = RFI.MeshRFI(mesh, True, projmode, resolution or raster.RESOLUTION)
+        seconds = min(timeit.repeat(MeshRFI._get_projection_area, number=1, repeat=repeat))
+        results.append((seconds, MeshRFI.projarea))
+    return mesh.nface, results
+
+def main():
+    sampledir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Sample Data')
+    print "%-36s %8s %-14s %10s %10s %8s" % ("File", "Faces", "Mode", "Time (s)", "Area", "Speedup")
+    for filepath in sorted(glob.glob(os.path.join(sampledir, '*.ply'))):
+        nface, results = bench_file(filepath)
+        rendertime = results[0][0]
+        for (projmode, resolution), (seconds, projarea) in zip(MODES, results):
+            mode = "%s %s" % (projmode, resolution) if resolution else projmode
+            print "%-36s %8d %-14s %10.4f %10.3f %7.1fx" % (os.path.basename(filepath), nface, mode, seconds, projarea, rendertime/seconds)
+
+if __name__ == "__main__":
+    main()
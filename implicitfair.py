@@ -6,10 +6,10 @@ Contains functions for executing an implicit fairing smooth on a 3D mesh.
 @author: Julia M. Winchester
 '''
 
-from math import acos, tan
-from numpy import sqrt, spacing, diag, mat 
-from numpy.linalg import cholesky, solve, LinAlgError
-from scipy.sparse import identity, lil_matrix
+from math import acos
+from numpy import sqrt, spacing, asarray, maximum, arccos, clip, tan, where, errstate, column_stack, repeat, ones
+from scipy.sparse import identity, coo_matrix, diags
+from scipy.sparse.linalg import splu
 
 def clamp(n, minn, maxn):
     return max(min(maxn, n), minn)
@@ -25,70 +25,84 @@ def My_Angle(u,v):
     angle = acos(x)
     return angle
 
+def angles(u, v):
+    """Returns angles between paired rows of u and v, as My_Angle does for single vectors."""
+    du = maximum(sqrt((u**2).sum(axis=1)), spacing(1))
+    dv = maximum(sqrt((v**2).sum(axis=1)), spacing(1))
+    
+    x = (u*v).sum(axis=1) / (du*dv)
+    return arccos(clip(x, -1.0, 1.0))
+
+def cotangents(angle):
+    """Returns cotangents of angles, with 0 for angles of 0."""
+    with errstate(divide='ignore'):
+        return where(angle == 0, 0, 1/tan(angle))
+
+# Polygon corners (i, j, k) as ordered when walking the face ring of vertex i: i's polygon 
+# position, then the other two positions in polygon order
+CORNER_ORDER = [0, 1, 2, 1, 0, 2, 2, 0, 1]
+
 def laplaciantension(vertex, faceindex, vert_tri_dict):
+    """Returns sparse cotangent Laplacian of mesh.
+    
+    For each polygon corner (i, j, k), L[i,j] gains the cotangent of the angle at k and L[i,k] 
+    the cotangent of the angle at j, calculated for all corners at once. Weights are summed 
+    when converting to CSR, and the diagonal is minus the row sums. Polygons are taken 
+    from faceindex, so vert_tri_dict is unused. Vertices are taken as double precision, 
+    e.g. for float32 vertices memory-mapped from a binary .ply file.
+    """
+    vertex = asarray(vertex, float)
     n = len(vertex)
-    L = lil_matrix((n,n))
-    ring = vert_tri_dict
+    corners = asarray(faceindex)[:,CORNER_ORDER].reshape(-1, 3)
+    i, j, k = corners[:,0], corners[:,1], corners[:,2]
+    vi = vertex[i]
+    vj = vertex[j]
+    vk = vertex[k]
+    
+    # angles
+    cot_alpha = cotangents(angles(vk-vi, vk-vj))
+    cot_beta = cotangents(angles(vj-vi, vj-vk))
     
-    for i in range(0,n): 
-        for b in ring[i]:
-            bf = faceindex[b]          
-            if bf[0] == i:
-                v = (bf[1],bf[2])
-            else:
-                if bf[1] == i:
-                    v = (bf[0],bf[2])
-                else:
-                    if bf[2] == i:
-                        v = (bf[0],bf[1])
-                    else:
-                        print "Problem in face ring."
-            j = v[0]
-            k = v[1]
-            vi = vertex[i]
-            vj = vertex[j]
-            vk = vertex[k]
-
-            # angles
-            alpha = My_Angle(vk-vi, vk-vj)
-            beta = My_Angle(vj-vi, vj-vk)
-            
-            # add weight
-            if alpha == 0:
-                cot_alpha = 0
-            else:
-                cot_alpha = 1/tan(alpha)
-            
-            if beta == 0:
-                cot_beta = 0
-            else:
-                cot_beta = 1/tan(beta)
-            
-            L[i,j] = L[i,j] + cot_alpha
-            L[i,k] = L[i,k] + cot_beta
-            
-    a = L.sum(axis=1)
-    b = [float(i) for i in a]
-    L = L - diag(b)
+    # add weights, L[i,j] then L[i,k] for each corner
+    weights = column_stack((cot_alpha, cot_beta)).ravel()
+    rows = repeat(i, 2)
+    cols = column_stack((j, k)).ravel()
+    L = coo_matrix((weights, (rows, cols)), shape=(n,n)).tocsr()
+    
+    L = L - diags(L.dot(ones(n)))
                 
     return L
 
+def factorize(A):
+    """Returns sparse factorization of symmetric matrix A, or None if A is not positive definite.
+    
+    A is factorized by SuperLU with a symmetric fill-reducing ordering and diagonal pivots only, 
+    i.e. as P*A*P.T = L*D*L.T, so A is positive definite if all pivots (diagonal of U) are positive.
+    """
+    try:
+        factor = splu(A.tocsc(), permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0, options=dict(SymmetricMode=True))
+    except RuntimeError: # exactly singular
+        return None
+    
+    if not (factor.perm_r == factor.perm_c).all() or not (factor.U.diagonal() > 0).all():
+        return None
+    return factor
+
 def smooth(vertex, faceindex, iternum, stepsize, vert_tri_dict):
+    vertex = asarray(vertex, float)
     L = laplaciantension(vertex, faceindex, vert_tri_dict)
     sparseidentity = identity(len(vertex))
 
     tochol = sparseidentity - (stepsize*L)
-    tochol = mat(tochol)
 
-    try:
-        R = cholesky(tochol).T # Upper-triangular matrix cholesky decomposition (.T makes it upper, normally it spits out lower)
-    except LinAlgError:
+    # one sparse factorization is reused for every iteration and all three coordinates
+    factor = factorize(tochol)
+    if factor is None:
         print "Cholesky decomposition cannot be computed, mesh matrix is not positive definite."
         return "!"
     
     for k in range(0,iternum):
-        Q = solve(R.H, vertex)
-        vertex = solve(R,Q)
+        vertex = factor.solve(vertex)
       
     return vertex
     
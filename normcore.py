@@ -6,7 +6,7 @@ Functions for the creation and manipulation of normal vectors.
 @author: Julia M. Winchester
 '''
 
-from numpy import cross, array, sqrt, column_stack, spacing, zeros, isnan, mean, sum
+from numpy import cross, sqrt, column_stack, spacing, isnan, mean, sum, where, flatnonzero, asarray, bincount, repeat
 
 def normal(plane):
     """Given triangle vertices, returns normal vector for triangle as XYZ coordinates."""
@@ -22,54 +22,68 @@ def normal(plane):
 
 def normalmap(varray,farray): 
     """Given a list of vertices and polygons, returns array of polygon normal vectors."""
-    return array([normal(varray[verts]) for verts in farray])
+    tri = varray[farray]
+    return cross(tri[:,1]-tri[:,0], tri[:,2]-tri[:,0]).reshape(-1, 3)
+
+def facearea(varray, farray):
+    """Given a list of vertices and polygons, returns array of polygon areas (half magnitudes of polygon normal vectors)."""
+    fnormal = normalmap(varray, asarray(farray, int).reshape(-1, 3))
+    return 0.5 * sqrt((fnormal**2).sum(axis=1))
+
+def mesh_facearea(Mesh):
+    """Returns polygon areas of mesh, reusing polygon areas cached on mesh (see topomesh.TopoMesh) if present.
+    
+    Args:
+        Mesh (PlythonMesh or TopoMesh object): Triangulated polygon mesh data.
+    """
+    cached = getattr(Mesh, 'facearea', None)
+    if cached is not None:
+        return cached
+    return facearea(Mesh.vertices, Mesh.faces)
 
 def normalize(vects):
     """Normalizes (sets magnitude to 1) given vectors."""
     d = sqrt((vects**2).sum(axis=1)) # Square roots of sums of squares of normal vectors, i.e. magnitudes of normal vectors
-    d = [1 if m < spacing(1) else m for m in d]
+    d = where(d < spacing(1), 1, d)
     return vects/column_stack((d,d,d)) # each face has its normal vector XYZ divided by that vector's magnitude. this normalizes the vector, i.e. gives it a magnitude of 1.   
 
-def computenormal(varray, faceindex, fvarray, vfarray):
-    """Given a polygonal mesh, returns unit normals for polygons and unit normals of vertices (approximated as average of associated polygon normals)."""
+def nanrows(vects):
+    """Returns number and indices of given vectors with any nan components."""
+    nanindex = flatnonzero(isnan(vects).any(axis=1))
+    return len(nanindex), nanindex
+
+def computenormal(varray, faceindex, fvarray=None, vfarray=None):
+    """Given a polygonal mesh, returns unit normals for polygons and unit normals of vertices (approximated as average of associated polygon normals).
+    
+    Vertex normals are sums of normals of associated polygons, accumulated per polygon vertex from 
+    faceindex, so fvarray and vfarray are unused and need not be given. Normals of polygons with nan vertex coordinates,
+    and of their vertices, are left as nan and can be found with nanrows().
+    """
     nvert = len(varray)
+    faceindex = asarray(faceindex).reshape(-1, 3)
     
     fnormal = normalmap(varray,faceindex)
     # normalize face normals
     fnormal4 = normalize(fnormal)
     
-    # unit normals of vertices    
-    vnormal = zeros([nvert,3],float)
-    for vindex, faces in vfarray.iteritems():
-        vnormal[vindex] = sum(fnormal4[faces], axis=0)
-        if isnan(fnormal4[faces]).any(): print "nan found during vertex normal creation at vertex #: " + str(vindex)    
+    # unit normals of vertices, summing normals of polygons in order for each vertex    
+    vertexuses = faceindex.ravel()
+    vnormal = column_stack([bincount(vertexuses, weights=repeat(fnormal4[:,i], 3), minlength=nvert) for i in range(3)])
      
     # normalize vertex normals
     vnormal4 = normalize(vnormal)
     
-    # check for nan values in vnormal4
-    for i, norm in enumerate(vnormal4):
-        if isnan(norm).any():
-            print "nan vnormal 4 entry found"
-            print "corresponding vnormal entry:"
-            print norm
-    
     # enforce that normals are outward
     mvertex = mean(varray,1)    
     repmvertex = column_stack((mvertex,mvertex,mvertex))            
     v = varray - repmvertex
     s = sum((v*vnormal4),0)
-    s2 = 0
-    s3 = 0
+    s2 = (s > 0).sum()
+    s3 = (s < 0).sum()
     
-    for i in s:
-        if i > 0:
-            s2 += 1
-        if i < 0:
-            s3 += 1
     if s2 < s3:
         print 'Outward normal flipping has occurred'
         vnormal4 = -vnormal4
         fnormal4 = -fnormal4
 
-    return [vnormal4, fnormal4]
\ No newline at end of file
+    return [vnormal4, fnormal4]
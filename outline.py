@@ -0,0 +1,183 @@
+'''
+Functions for calculating the outline area of a polygon mesh, i.e. the area of the union of its
+polygons projected on the XY plane, geometrically rather than from a rendered image.
+
+Along any line parallel to the Y axis, the number of projected polygons covering a point only
+changes where the line crosses a projected contour edge: a mesh boundary edge, or an edge whose
+two polygons project to the same side of it (a fold). How many polygons start or stop covering
+there is given by the polygons of the edge, so the covered length of each line can be found from
+contour edges alone. Between successive X coordinates of contour edge end points and crossings,
+contour edges keep their Y order and covered length changes linearly with X, so outline area is
+the sum of slab widths times covered length at slab middles.
+'''
+
+from numpy import asarray, bincount, sign, flatnonzero, concatenate, unique, searchsorted, repeat, arange, cumsum, lexsort, diff, empty, \
+    minimum, maximum, median, floor, clip, argsort, int64
+
+import adjacency
+
+# Polygon corner opposite each half-edge of adjacency.EdgeTable, i.e. opposite vertex pairs (0, 1), (2, 0) and (1, 2)
+OPPOSITE_CORNERS = [2, 1, 0]
+# Maximum mean number of grid cells overlapped by each segment when finding crossings
+CELL_ENTRIES = 16
+# Maximum number of segment pairs compared at once when finding crossings
+CROSSING_PAIRS = 2**20
+
+def contour_edges(xy, faces, edge_table=None):
+    """Returns projected contour edges of polygon mesh with change in polygon cover across each edge.
+
+    Args:
+        xy (ndarray): Vertex XY points for mesh.
+        faces (ndarray): Polygons with component vertex indices for mesh.
+        edge_table (EdgeTable): Edges of mesh, see adjacency.EdgeTable. Built from faces if not given.
+
+    Returns:
+        tuple: Start and end XY points of contour edges (ordered so that start X < end X), and change
+            in number of covering polygons when crossing each edge in the +Y direction. Edges parallel
+            to the Y axis are left out.
+    """
+    faces = asarray(faces, int).reshape(-1, 3)
+    if edge_table is None:
+        edge_table = adjacency.EdgeTable(faces)
+
+    start = xy[edge_table.edgeverts[:,0]]
+    end = xy[edge_table.edgeverts[:,1]]
+    flip = start[:,0] > end[:,0]
+    start[flip], end[flip] = end[flip], start[flip].copy()
+
+    # each polygon starts covering above an edge if its opposite vertex is above the edge, and stops otherwise
+    halfedges = edge_table.face_edges.ravel()
+    opposite = xy[faces[:,OPPOSITE_CORNERS].ravel()]
+    edgevector = end[halfedges] - start[halfedges]
+    tovertex = opposite - start[halfedges]
+    side = sign(edgevector[:,0]*tovertex[:,1] - edgevector[:,1]*tovertex[:,0])
+    cover = bincount(halfedges, weights=side, minlength=len(start))
+
+    contour = flatnonzero((cover != 0) & (start[:,0] < end[:,0]))
+    return start[contour], end[contour], cover[contour]
+
+def cells(start, end):
+    """Returns square grid cells overlapped by bounding boxes of segments.
+
+    Cell side length is the median longer side of segment bounding boxes, so that most segments
+    overlap few cells and segments share cells only with segments near them. It is doubled until
+    segments overlap at most CELL_ENTRIES cells on average, which limits the cells of long segments.
+
+    Args:
+        start (ndarray): Start XY points of segments.
+        end (ndarray): End XY points of segments.
+
+    Returns:
+        tuple: Segment and cell key of each overlapped cell, sorted by cell key, first and last
+            cell column and row of each segment, and grid origin and cell side length.
+    """
+    lower = minimum(start, end)
+    upper = maximum(start, end)
+    origin = lower.min(axis=0)
+    cellsize = median((upper - lower).max(axis=1))
+
+    while True:
+        first = floor((lower - origin) / cellsize).astype(int)
+        last = floor((upper - origin) / cellsize).astype(int)
+        spans = last - first + 1
+        count = spans[:,0].astype(int64) * spans[:,1]
+        if count.sum() <= CELL_ENTRIES * len(start):
+            break
+        cellsize *= 2
+    nrows = int(last[:,1].max()) + 1
+
+    # cells of each segment bounding box, column by column
+    segment = repeat(arange(len(start)), count)
+    k = arange(len(segment)) - repeat(cumsum(count) - count, count)
+    col = first[segment,0] + k // spans[segment,1]
+    row = first[segment,1] + k % spans[segment,1]
+    key = col.astype(int64) * nrows + row
+
+    order = argsort(key, kind='mergesort')
+    return segment[order], key[order], first, last, origin, cellsize, nrows
+
+def crossings(start, end):
+    """Returns X coordinates where segments cross in their interiors.
+
+    Segments are only compared with segments overlapping the same cells of a grid (see cells()),
+    and each crossing is kept in the one cell containing it, so that the number of segment pairs
+    compared grows with the number of segments close together rather than with all pairs.
+
+    Args:
+        start (ndarray): Start XY points of segments, with start X < end X.
+        end (ndarray): End XY points of segments.
+    """
+    if len(start) < 2:
+        return empty(0)
+    segment, key, first, last, origin, cellsize, nrows = cells(start, end)
+
+    # pairs of later cell entries with the same key, for each cell entry
+    groupstart = flatnonzero(concatenate(([True], key[1:] != key[:-1])))
+    groupsize = diff(concatenate((groupstart, [len(key)])))
+    position = arange(len(key)) - repeat(groupstart, groupsize)
+    npair = repeat(groupsize, groupsize) - position - 1
+    pairends = cumsum(npair)
+
+    xs = [empty(0)]
+    entry = 0
+    while entry < len(key):
+        stop = max(int(searchsorted(pairends, pairends[entry] - npair[entry] + CROSSING_PAIRS, 'right')), entry + 1)
+        count = npair[entry:stop]
+        a = repeat(arange(entry, stop), count)
+        b = a + 1 + arange(len(a)) - repeat(cumsum(count) - count, count)
+        entry = stop
+
+        i, j = segment[a], segment[b]
+        overlap = (start[j,0] < end[i,0]) & (start[i,0] < end[j,0])
+        a, i, j = a[overlap], i[overlap], j[overlap]
+
+        p, r = start[i], end[i] - start[i]
+        q, s = start[j], end[j] - start[j]
+        rxs = r[:,0]*s[:,1] - r[:,1]*s[:,0]
+        parallel = rxs == 0
+        rxs[parallel] = 1
+        t = ((q[:,0] - p[:,0])*s[:,1] - (q[:,1] - p[:,1])*s[:,0]) / rxs
+        u = ((q[:,0] - p[:,0])*r[:,1] - (q[:,1] - p[:,1])*r[:,0]) / rxs
+        cross = ~parallel & (t > 0) & (t < 1) & (u > 0) & (u < 1)
+        a, i, j = a[cross], i[cross], j[cross]
+        x = p[cross] + t[cross,None]*r[cross]
+
+        # cell of crossing, within cells of both segments
+        cell = floor((x - origin) / cellsize).astype(int)
+        cell = clip(cell, maximum(first[i], first[j]), minimum(last[i], last[j]))
+        own = cell[:,0].astype(int64) * nrows + cell[:,1] == key[a]
+        xs.append(x[own,0])
+    return concatenate(xs)
+
+def projected_area(vertices, faces, edge_table=None):
+    """Returns area of the union of mesh polygons projected on the XY plane.
+
+    Args:
+        vertices (ndarray): Vertex XYZ points for mesh.
+        faces (ndarray): Polygons with component vertex indices for mesh.
+        edge_table (EdgeTable): Edges of mesh, see adjacency.EdgeTable. Built from faces if not given.
+    """
+    start, end, cover = contour_edges(asarray(vertices, float)[:,:2], faces, edge_table)
+    if not len(cover):
+        return 0.0
+
+    events = unique(concatenate((start[:,0], end[:,0], crossings(start, end))))
+    middles = 0.5 * (events[:-1] + events[1:])
+    widths = diff(events)
+
+    # slabs between events spanned by each contour edge
+    firstslab = searchsorted(events, start[:,0])
+    nslab = searchsorted(events, end[:,0]) - firstslab
+    edges = repeat(arange(len(cover)), nslab)
+    slabs = arange(len(edges)) - repeat(cumsum(nslab) - nslab, nslab) + firstslab[edges]
+
+    # Y of contour edges at slab middles, ordered within slabs
+    x = middles[slabs]
+    y = start[edges,1] + (end[edges,1] - start[edges,1]) * (x - start[edges,0]) / (end[edges,0] - start[edges,0])
+    order = lexsort((y, slabs))
+    slabs, y, edges = slabs[order], y[order], edges[order]
+
+    # cover returns to 0 above the top edge of each slab, so running totals restart in every slab
+    covering = cumsum(cover[edges])[:-1]
+    covered = (covering > 0) & (slabs[:-1] == slabs[1:])
+    return float((widths[slabs[:-1]] * diff(y))[covered].sum())
@@ -2,7 +2,7 @@
 Created on Sep 1, 2011
 
 Plython opens .ply files and produces simple numpy arrays with polygon vertex and face data. Using 
-the createarray() function, this module reads ASCII-format .ply (binary is not supported to date) 
+the createarray() function, this module reads ASCII or binary (little or big endian) format .ply 
 and returns numpy arrays representing position of mesh vertices and connections between vertices
 to produce interconnected triangular polygon faces. A savearray() function is also provided to save
 arrays of mesh data (formatted similarly to arrays returned by the createarray() function). 
@@ -20,9 +20,94 @@ three arrays as a list in the order described.
 
 @author: Julia M. Winchester
 '''
-from numpy import array
-from struct import unpack
+import gzip
+import re
+from itertools import islice
+from os.path import getsize
+from numpy import dtype, empty, frombuffer, fromstring, memmap, column_stack, flatnonzero, zeros, unique, argsort, arange, ascontiguousarray, void
+from numpy.lib.stride_tricks import as_strided
+
+# Numpy type codes of .ply property types, under both original and sized type names
+PLY_TYPES = {'char': 'i1', 'int8': 'i1', 'uchar': 'u1', 'uint8': 'u1', 
+             'short': 'i2', 'int16': 'i2', 'ushort': 'u2', 'uint16': 'u2', 
+             'int': 'i4', 'int32': 'i4', 'uint': 'u4', 'uint32': 'u4', 
+             'float': 'f4', 'float32': 'f4', 'double': 'f8', 'float64': 'f8'}
+
+# Property names used for the list of vertex indices of each face
+FACE_LISTS = ('vertex_indices', 'vertex_index')
+
+# Number of vertex or face rows formatted per write when saving ASCII .ply files
+WRITE_CHUNK = 65536
+
+# Default number of element rows per block yielded by PlythonMesh.ReadChunks
+READ_CHUNK = 65536
+
+# EOFError messages for .ply data ending within vertex and face elements
+EOF_MESSAGES = {'vertex': 'Unexpected end of .PLY file in list of vertices.',
+                'face': 'Unexpected end of .PLY in list of polygon vertex indices.'}
+
+# Mesh file extensions read by PlythonMesh.CreateArray
+MESH_EXTENSIONS = ('.ply', '.ply.gz', '.off', '.stl')
+
+# Record layout of triangles in binary .stl files, following an 80 byte header and uint32 triangle number
+STL_DTYPE = dtype([('normal', '<f4', (3,)), ('triverts', '<f4', (3, 3)), ('attributes', '<u2')])
+
+def mesh_extension(filepath):
+    """Returns extension of filepath if it is a mesh file read by PlythonMesh.CreateArray, otherwise an empty string."""
+    for extension in MESH_EXTENSIONS:
+        if filepath.lower().endswith(extension):
+            return extension
+    return ''
+
+def open_ply(filepath):
+    """Opens .ply file for reading in binary mode, decompressing it if filepath ends with .gz (in any case)."""
+    if filepath.lower().endswith('.gz'):
+        return gzip.open(filepath, 'rb')
+    return open(filepath, 'rb')
+
+def inconsistent_faces(vertices, faces, triverts):
+    """Returns indices of polygons whose face-vertex XYZ points differ from the vertices they index.
     
+    All polygons are compared at once. Raises ValueError if triverts does not have 
+    one XYZ point per polygon vertex index.
+    
+    Args:
+        vertices (ndarray): Vertex XYZ points for mesh.
+        faces (ndarray): Polygons with component vertex indices for mesh.
+        triverts (ndarray): Polygons with component vertex XYZ points for mesh.
+    """
+    indexed = vertices[faces]
+    if indexed.shape != triverts.shape:
+        raise ValueError('Face-vertex array of shape %s does not match vertices indexed by faces of shape %s, mesh is inconsistent.' % (triverts.shape, indexed.shape))
+    
+    return flatnonzero((indexed != triverts).reshape(len(indexed), -1).any(axis=1))
+
+def check_faces(vertices, faces, triverts):
+    """Raises ValueError listing every polygon whose face-vertex XYZ points differ from the vertices they index."""
+    badfaces = inconsistent_faces(vertices, faces, triverts)
+    if len(badfaces):
+        raise ValueError("Mesh vertex and face arrays do not contain identical vertices for %s polygons (indices %s), mesh is inconsistent." % (len(badfaces), badfaces.tolist()))
+
+def probe(filepath):
+    """Reads only the header of a .ply file and returns its format and layout without loading mesh data.
+    
+    Args:
+        filepath (str): Path to a .ply or gzip-compressed .ply.gz polygon mesh file.
+    
+    Returns:
+        dict: .ply file layout, with keys 'format' (data format string, e.g. 'ascii' 
+            or 'binary_little_endian'), 'nvert' and 'nface' (vertex and polygon numbers), 
+            'elements' (list of (name, count, properties) tuples in file order, see 
+            PlythonMesh._parse_header), and 'offset' (byte offset of mesh data, i.e. 
+            header length, within uncompressed data).
+    """
+    mesh = PlythonMesh()
+    with open_ply(filepath) as meshfile:
+        header = mesh._read_header(meshfile)
+    datamode, elements = mesh._parse_header(header)
+    
+    return {'format': datamode, 'nvert': mesh.nvert, 'nface': mesh.nface, 'elements': elements, 'offset': len(header)}
+
 class PlythonMesh(object):
     """A class for creating and interacting with triangulated polygon meshes.
     
@@ -31,6 +116,9 @@ class PlythonMesh(object):
     
     Args:
         filepath (str): Path to a .ply polygon mesh file. 
+        memmap (bool): If true, vertex and face data of binary .ply files are 
+            exposed as read-only numpy.memmap views of the file instead of 
+            being read into memory. See CreateArray.
         
     Attributes:
         mesh (list): Triangulated polygon mesh data. Contains three ndarrays:
@@ -38,142 +126,526 @@ class PlythonMesh(object):
             and polygons with component vertex indices. 
         vertices (ndarray): Vertex XYZ points for mesh.
         faces (ndarray): Polygons with component vertex indices for mesh.
-        triverts (ndarray): Polygons with component vertex XYZ points for mesh.
+        triverts (ndarray): Polygons with component vertex XYZ points for mesh, 
+            built from vertices and faces when first used.
         nvert (int): Number of vertices in mesh. 
         nface (int): Number of polygons in mesh.  
     
     """
-    def __init__(self, filepath=""):
-        self.mesh = None
-        self.vertices = None
-        self.faces = None
-        self.triverts = None
+    def __init__(self, filepath="", memmap=False):
+        self._vertices = None
+        self._faces = None
+        self._triverts = None
         self.nvert = 0
         self.nface = 0
         
         if filepath is not "":
-            self.CreateArray(filepath)
+            self.CreateArray(filepath, memmap)
+    
+    def __setstate__(self, state):
+        """Restores pickled mesh data, including meshes pickled before triverts and mesh became properties."""
+        state = dict(state)
+        for name in ('vertices', 'faces', 'triverts'):
+            if name in state:
+                state['_'+name] = state.pop(name)
+            state.setdefault('_'+name, None)
+        state.pop('mesh', None)
+        self.__dict__.update(state)
+    
+    @property
+    def vertices(self):
+        """ndarray: Vertex XYZ points for mesh. Assigning vertices discards cached triverts."""
+        return self._vertices
+    
+    @vertices.setter
+    def vertices(self, vertices):
+        self._vertices = vertices
+        self._vertices_changed()
+    
+    @property
+    def faces(self):
+        """ndarray: Polygons with component vertex indices for mesh. Assigning faces discards cached triverts."""
+        return self._faces
+    
+    @faces.setter
+    def faces(self, faces):
+        self._faces = faces
+        self._faces_changed()
+    
+    def _vertices_changed(self):
+        """Discards data cached from vertices when vertices is assigned."""
+        self._triverts = None
+    
+    def _faces_changed(self):
+        """Discards data cached from faces when faces is assigned."""
+        self._triverts = None
+    
+    @property
+    def triverts(self):
+        """ndarray: Polygons with component vertex XYZ points for mesh.
+        
+        Built from vertices and faces when first used and cached until either is 
+        assigned again. Changes made to vertices in place are not reflected in 
+        cached triverts. Assigning triverts replaces the cached array.
+        """
+        if self._triverts is None and self._vertices is not None and self._faces is not None:
+            self._triverts = self._vertices[self._faces]
+        return self._triverts
+    
+    @triverts.setter
+    def triverts(self, triverts):
+        self._triverts = triverts
+    
+    @property
+    def mesh(self):
+        """list: Vertices, triverts, and faces of mesh, or None if no mesh has been created."""
+        if self._vertices is None:
+            return None
+        return [self.vertices, self.triverts, self.faces]
     
-    def CreateArray(self, filepath): 
+    def CreateArray(self, filepath, memmap=False): 
         """Creates triangulated polygon mesh data objects from .ply file.
         
+        With memmap set, vertices and faces of a binary .ply file are views onto 
+        the file at the offsets given by its header, keeping their on-disk data 
+        types. No mesh data is copied into memory until it is used, except that 
+        polygon vertex indices are read once to check they are in range of mesh 
+        vertices. ASCII files are always read into memory.
+        
+        Gzip-compressed .ply.gz files are decompressed and read block by block 
+        with ReadChunks, and are never memory-mapped. Object File Format .off files 
+        and binary .stl files are also read, see _read_off and _read_stl.
+        
         Args:
-            filepath (str): Path to a .ply polygon mesh file.
+            filepath (str): Path to a .ply, .ply.gz, .off or .stl polygon mesh file.
+            memmap (bool): If true, memory-map binary vertex and face data.
         
         """
-        meshfile = open(filepath, 'r') 
-        meshstring = meshfile.read()
-        meshfile.close()
+        extension = mesh_extension(filepath)
+        
+        if extension == '.off':
+            with open(filepath, 'rb') as meshfile:
+                self.vertices, self.faces = self._read_off(meshfile.read())
+        elif extension == '.stl':
+            with open(filepath, 'rb') as meshfile:
+                self.vertices, self.faces = self._read_stl(meshfile.read())
+        elif extension == '.ply.gz':
+            with open_ply(filepath) as meshfile:
+                self.vertices, self.faces = self._read_stream(meshfile)
+        else:
+            with open(filepath, 'rb') as meshfile:
+                header = self._read_header(meshfile)
+                datamode, elements = self._parse_header(header)
+                
+                if datamode == "ascii" or datamode == "ASCII":
+                    self.vertices, self.faces = self._read_ascii(meshfile.read(), elements)
+                elif memmap:
+                    self.vertices, self.faces = self._map_bin(filepath, len(header), datamode, elements)
+                else:
+                    self.vertices, self.faces = self._read_bin(meshfile.read(), datamode, elements)
+        
+        self.check_mesh_consistency(trusted=True)
+    
+    def ReadChunks(self, meshfile, chunksize=READ_CHUNK):
+        """Reads .ply header from an open file and returns a generator of vertex and polygon data blocks.
+        
+        The header is read, and nvert and nface set, when ReadChunks is called. The 
+        generator then reads mesh data as it is consumed and yields (element name, first 
+        row, block) tuples in file order, where element name is 'vertex' or 'face' and 
+        block holds up to chunksize rows of vertex XYZ points (float) or polygon vertex 
+        indices (int). Only one block of mesh data is held in memory at a time, so each 
+        block can be processed, e.g. accumulating vertex-polygon adjacency, before the 
+        next is read. Vertices, faces and triverts of the mesh are not changed.
         
+        Args:
+            meshfile (file): Open .ply file positioned at its start, e.g. from open_ply.
+            chunksize (int): Maximum number of vertex or polygon rows per block.
         
-        datamode = self._StringAfter(meshstring, 'format')
-        self.nvert = int(self._StringAfter(meshstring,'element vertex'))
-        self.nface = int(self._StringAfter(meshstring,'element face'))
+        """
+        header = self._read_header(meshfile)
+        datamode, elements = self._parse_header(header)
         
         if datamode == "ascii" or datamode == "ASCII":
-            self.vertices, self.faces, self.triverts = self._read_ascii(meshstring)
-        else:
-            self.vertices, self.faces, self.triverts = self._read_bin(meshstring, datamode)
+            return self._iter_chunks(meshfile, self._element_dtypes(elements, text=True), chunksize, True)
+        return self._iter_chunks(meshfile, self._element_dtypes(elements, self._byteorder(datamode)), chunksize, False)
+    
+    def _iter_chunks(self, meshfile, layout, chunksize, text):
+        """Generator reading blocks of element records from meshfile, yielding vertex XYZ points and polygon vertex indices."""
+        for name, count, recorddtype in layout:
+            for start in xrange(0, count, chunksize):
+                nrows = min(chunksize, count - start)
+                
+                if text:
+                    records = self._read_text_records(meshfile, name, nrows, recorddtype)
+                else:
+                    data = meshfile.read(nrows*recorddtype.itemsize)
+                    if len(data) < nrows*recorddtype.itemsize:
+                        raise EOFError(EOF_MESSAGES.get(name, 'Unexpected end of .PLY file in %s element.' % name))
+                    records = frombuffer(data, recorddtype)
+                
+                if name == 'vertex':
+                    yield name, start, self._vertex_xyz(records).astype(float)
+                elif name == 'face':
+                    yield name, start, self._face_indices(records).astype(int)
+    
+    def _read_text_records(self, meshfile, name, nrows, recorddtype):
+        """Reads nrows lines of ASCII element data from meshfile as records of float64 tokens."""
+        lines = list(islice(meshfile, nrows))
+        if len(lines) < nrows:
+            raise EOFError(EOF_MESSAGES.get(name, 'Unexpected end of .PLY file in %s element.' % name))
+        
+        tokens = fromstring(''.join(lines), float, sep=' ')
+        if len(tokens)*tokens.itemsize != nrows*recorddtype.itemsize:
+            # file ending within last line of element data
+            if len(tokens)*tokens.itemsize < nrows*recorddtype.itemsize and not lines[-1].endswith('\n'):
+                raise EOFError(EOF_MESSAGES.get(name, 'Unexpected end of .PLY file in %s element.' % name))
+            if name == 'face':
+                raise ValueError('Non-triangular polygons found within .PLY file.')
+            raise ValueError('Unexpected number of values in %s element of ASCII .PLY file.' % name)
+        
+        return frombuffer(tokens, recorddtype)
+    
+    def _read_stream(self, meshfile):
+        """Reads vertex and face data block by block from an open .ply file into preallocated arrays."""
+        blocks = self.ReadChunks(meshfile)
+        vert_array = empty((self.nvert, 3), float)
+        face_array = empty((self.nface, 3), int)
+        
+        for name, start, block in blocks:
+            if name == 'vertex':
+                vert_array[start:start+len(block)] = block
+            else:
+                face_array[start:start+len(block)] = block
+        
+        return vert_array, face_array
+    
+    def _read_off(self, meshdata):
+        """Reads ASCII .off mesh data, setting vertex and face numbers.
         
-        self.mesh = [self.vertices, self.triverts, self.faces]
+        Vertex lines may carry texture coordinates, colors or normals after XYZ points 
+        (e.g. STOFF, COFF, NOFF files), as long as every vertex line has as many values 
+        as the first, and face lines may carry colors after vertex indices. All values 
+        after the header are tokenized in a single pass, as for ASCII .ply data.
+        """
+        if '#' in meshdata:
+            meshdata = re.sub(r'#[^\n]*', '', meshdata)
         
-        self.check_mesh_consistency()
-    
-    def _read_ascii(self, meshstring):
-        """Reads ASCII mesh data."""
-        meshdata = meshstring[meshstring.find('end_header'):].splitlines()[1:]
+        # OFF keyword followed by vertex, face, and edge numbers, on one or more lines
+        headerwords, datastart = self._off_words(meshdata, 0, 4)
+        if not re.match(r'(ST)?C?N?OFF$', headerwords[0]):
+            raise ValueError('Unsupported .OFF file type %s.' % headerwords[0])
+        self.nvert, self.nface = int(headerwords[1]), int(headerwords[2])
         
-        if len(meshdata) < self.nvert:
-            raise EOFError('Unexpected end of .PLY file in list of vertices.')
+        nvalues = len(self._off_words(meshdata, datastart, 1)[0]) if self.nvert else 3
         
-        vlist = meshdata[0:self.nvert]
+        tokens = fromstring(meshdata[datastart:], float, sep=' ')
+        if len(tokens) < self.nvert*nvalues:
+            raise EOFError(EOF_MESSAGES['vertex'])
         
-        if len(meshdata[self.nvert:]) < self.nface:
-            raise EOFError('Unexpected end of .PLY in list of polygon vertex indices.')
+        vert_array = tokens[:self.nvert*nvalues].reshape(self.nvert, nvalues)[:,:3].copy()
+        facetokens = tokens[self.nvert*nvalues:]
         
-        flist = meshdata[self.nvert:(self.nvert+self.nface)]
+        if len(facetokens) < self.nface*4:
+            raise EOFError(EOF_MESSAGES['face'])
+        if self.nface and len(facetokens) % self.nface:
+            raise ValueError('Non-triangular polygons found within .OFF file.')
         
-        if flist[0][0] != '3':
-            raise ValueError('Non-triangular polygons found within .PLY file.')
+        facerows = facetokens.reshape(self.nface, -1) if self.nface else facetokens.reshape(0, 4)
+        if (facerows[:,0] != 3).any():
+            raise ValueError('Non-triangular polygons found within .OFF file.')
+        
+        return vert_array, facerows[:,1:4].astype(int)
+    
+    def _off_words(self, meshdata, position, nwords):
+        """Returns words of whole .off file lines from position until at least nwords are read, and position of next line."""
+        words = list()
+        while len(words) < nwords:
+            lineend = meshdata.find('\n', position)
+            if lineend < 0:
+                lineend = len(meshdata)
+                if position >= lineend:
+                    raise EOFError('Unexpected end of .OFF file in header.')
+            words += meshdata[position:lineend].split()
+            position = lineend + 1
+        
+        return words, position
+    
+    def _read_stl(self, meshdata):
+        """Reads binary .stl mesh data, welding triangle corners with identical XYZ points into shared vertices.
+        
+        Corners are welded by sorting their packed float32 XYZ points with numpy.unique. 
+        Vertices are numbered in order of first use by a triangle, and negative zero 
+        coordinates are treated as zero. Sets vertex and face numbers.
+        """
+        if len(meshdata) < 84:
+            raise EOFError('Unexpected end of .STL file in header.')
+        
+        self.nface = int(frombuffer(meshdata, '<u4', 1, 80)[0])
+        if len(meshdata) != 84 + self.nface*STL_DTYPE.itemsize:
+            if meshdata.startswith('solid'):
+                raise ValueError('ASCII .STL files are not supported, .STL file must be binary.')
+            raise EOFError('Unexpected end of .STL file in list of triangles.')
+        
+        corners = frombuffer(meshdata, STL_DTYPE, self.nface, 84)['triverts'].reshape(-1, 3) + 0.0
+        cornerkeys = ascontiguousarray(corners).view(dtype((void, corners.itemsize*3))).ravel()
+        
+        keys, first, inverse = unique(cornerkeys, return_index=True, return_inverse=True)
+        firstorder = argsort(first)
+        vertexnumber = empty(len(first), int)
+        vertexnumber[firstorder] = arange(len(first))
         
-        varray = array([vertices.split() for vertices in vlist], float)
-        farray = array([vertices.split()[1:4] for vertices in flist], int)
-        vfarray = array([[varray[vindex] for vindex in vertices] for vertices in farray], float)
+        self.nvert = len(first)
         
-        return varray, farray, vfarray 
+        return corners[first[firstorder]].astype(float), vertexnumber[inverse].reshape(-1, 3)
     
-    def _read_bin(self, meshstring, mode):
-        """Reads binary mesh data."""
-        if mode == "binary_little_endian":
-            byteorder = "<"
-        elif mode == "binary_big_endian":
-            byteorder = ">"
+    def _read_header(self, meshfile):
+        """Reads .ply header lines up to and including end_header, leaving meshfile positioned at the start of mesh data."""
+        headerlines = list()
+        line = meshfile.readline()
+        while not line.startswith('end_header'):
+            if not line:
+                raise EOFError('Unexpected end of .PLY file in header.')
+            headerlines.append(line)
+            line = meshfile.readline()
+        headerlines.append(line)
+        
+        return ''.join(headerlines)
+    
+    def _parse_header(self, header):
+        """Parses .ply header text into data format and elements, and sets vertex and face numbers.
         
-        meshdata = meshstring[meshstring.find('end_header')+11:]
+        Elements are returned in file order as (name, count, properties) tuples. Properties
+        are (name, type) pairs, where the type of a list property is a (count type, item type) 
+        pair.
+        """
+        datamode = None
+        elements = list()
+        
+        for line in header.splitlines():
+            words = line.split()
+            if not words:
+                continue
+            if words[0] == 'format':
+                datamode = words[1]
+            elif words[0] == 'element':
+                elements.append((words[1], int(words[2]), list()))
+            elif words[0] == 'property':
+                if not elements:
+                    raise ValueError('Property defined before any element in .PLY header: %s' % line)
+                if words[1] == 'list':
+                    propname, proptype = words[4], (words[2], words[3])
+                    types = proptype
+                else:
+                    propname, proptype = words[2], words[1]
+                    types = (proptype,)
+                if not all(t in PLY_TYPES for t in types):
+                    raise ValueError('Unknown property type in .PLY header: %s' % line)
+                elements[-1][2].append((propname, proptype))
+        
+        if datamode is None:
+            raise ValueError('Data format is not defined in .PLY header.')
+        
+        counts = dict((name, count) for name, count, properties in elements)
+        if 'vertex' not in counts or 'face' not in counts:
+            raise ValueError('Vertex or face element is not defined in .PLY header.')
+        self.nvert = counts['vertex']
+        self.nface = counts['face']
+        
+        return datamode, elements
+    
+    def _element_dtypes(self, elements, byteorder='=', text=False):
+        """Returns (name, count, record dtype) for each element up to the last of the vertex and face elements.
+        
+        Polygons are assumed to be triangles, so the vertex index list of a face is 
+        described as a count field followed by a three-item index field. Other list 
+        properties have no fixed size and raise ValueError. If text is true, every 
+        property is described as a float64 token, matching ASCII data tokenized by 
+        _read_ascii.
+        """
+        names = [name for name, count, properties in elements]
+        lastelement = max(names.index('vertex'), names.index('face'))
+        
+        layout = list()
+        for name, count, properties in elements[:lastelement+1]:
+            fields = list()
+            for propname, proptype in properties:
+                if isinstance(proptype, tuple):
+                    if name != 'face' or propname not in FACE_LISTS:
+                        raise ValueError('List property %s of .PLY element %s is not supported.' % (propname, name))
+                    counttype, itemtype = proptype
+                    fields.append((propname+'_count', 'f8' if text else byteorder+PLY_TYPES[counttype]))
+                    fields.append((propname, 'f8' if text else byteorder+PLY_TYPES[itemtype], (3,)))
+                else:
+                    fields.append((propname, 'f8' if text else byteorder+PLY_TYPES[proptype]))
+            layout.append((name, count, dtype(fields)))
+        
+        return layout
+    
+    def _record_offsets(self, layout, databytes):
+        """Returns byte offsets of vertex and face records given element layout, raises EOFError if data is too short."""
+        offsets = dict()
+        position = 0
+        for name, count, recorddtype in layout:
+            offsets[name] = position
+            position += count*recorddtype.itemsize
         
-        # Expected number of bytes for vertex data, assumes 3 XYZ coordinate float values
-        vertbytes = self.nvert*3*4
-        # Expected number of bytes for face data, assumes unsigned char (= 3) and 3 integer vertex index values 
-        facebytes = self.nface*(3*4+1)
+        vertlayout = [recorddtype for name, count, recorddtype in layout if name == 'vertex'][0]
+        facelayout = [recorddtype for name, count, recorddtype in layout if name == 'face'][0]
         
-        if len(meshdata) < vertbytes:
-            raise EOFError('Unexpected end of .PLY file in list of vertices.')
+        if databytes < offsets['vertex'] + self.nvert*vertlayout.itemsize:
+            raise EOFError(EOF_MESSAGES['vertex'])
         
-        vertdata = meshdata[0:vertbytes]
+        if databytes < offsets['face'] + self.nface*facelayout.itemsize:
+            raise EOFError(EOF_MESSAGES['face'])
         
-        if len(meshdata[vertbytes:]) < facebytes:
-            raise EOFError('Unexpected end of .PLY in list of polygon vertex indices.')
+        return (vertlayout, offsets['vertex']), (facelayout, offsets['face'])
+    
+    def _mesh_fields(self, vertdata, facedata):
+        """Returns views of vertex XYZ points and polygon vertex indices from vertex and face records."""
+        return self._vertex_xyz(vertdata), self._face_indices(facedata)
+    
+    def _vertex_xyz(self, vertdata):
+        """Returns view of vertex XYZ points from vertex records."""
+        if not all(name in vertdata.dtype.names for name in 'xyz'):
+            raise ValueError('Vertex element of .PLY file does not have x, y and z properties.')
         
-        facedata = meshdata[vertbytes:vertbytes+facebytes]
+        return self._xyz_view(vertdata)
+    
+    def _face_indices(self, facedata):
+        """Returns view of polygon vertex indices from face records, raises ValueError for non-triangular polygons."""
+        facelist = [name for name in FACE_LISTS if name in facedata.dtype.names]
+        if not facelist:
+            raise ValueError('Face element of .PLY file does not have a vertex index list property.')
         
-        if unpack(byteorder+'B', facedata[0])[0] != 3:
+        if (facedata[facelist[0]+'_count'] != 3).any():
             raise ValueError('Non-triangular polygons found within .PLY file.')
         
-        vert_xyz_split = [vertdata[i:i+4] for i in range(0, vertbytes, 4)]
-        vert_xyz_points = map(lambda x: unpack(byteorder+'f', x)[0], vert_xyz_split)
-        vert_array = array(vert_xyz_points)
-        vert_array = vert_array.reshape([self.nvert,3])
+        return facedata[facelist[0]]
+    
+    def _xyz_view(self, vertdata):
+        """Returns vertex XYZ points as an nvert x 3 strided view of vertex records, skipping other vertex properties.
         
-        face_split = [facedata[i:i+13] for i in range(0, facebytes, 13)]
-        face_index_split = [[face[i:i+4] for i in range(1, len(face), 4)] for face in face_split]
-        face_index_value = [[unpack(byteorder+'i', index)[0] for index in face] for face in face_index_split]
-        face_array = array(face_index_value)
-        face_array = face_array.reshape([self.nface,3])
+        A copy is returned instead if x, y and z differ in type or are not evenly spaced
+        within vertex records.
+        """
+        (xtype, xstart), (ytype, ystart), (ztype, zstart) = [vertdata.dtype.fields[name][:2] for name in 'xyz']
+        
+        if xtype == ytype == ztype and ystart - xstart == zstart - ystart > 0:
+            return as_strided(vertdata['x'], (len(vertdata), 3), (vertdata.strides[0], ystart - xstart), subok=True)
+        
+        return column_stack([vertdata[name] for name in 'xyz'])
+    
+    def _read_records(self, meshdata, databytes, layout):
+        """Reads vertex and face records from a buffer of mesh data."""
+        (vertdtype, vertstart), (facedtype, facestart) = self._record_offsets(layout, databytes)
+        
+        vertdata = frombuffer(meshdata, vertdtype, self.nvert, vertstart)
+        facedata = frombuffer(meshdata, facedtype, self.nface, facestart)
+        
+        vertxyz, faceindices = self._mesh_fields(vertdata, facedata)
+        
+        return vertxyz.astype(float), faceindices.astype(int)
+    
+    def _read_ascii(self, meshdata, elements):
+        """Reads ASCII mesh data."""
+        # Tokenizes every whitespace-separated number after the header in a single pass, 
+        # each line of an element then forms one record of float64 tokens
+        tokens = fromstring(meshdata, float, sep=' ')
+        
+        return self._read_records(tokens, tokens.nbytes, self._element_dtypes(elements, text=True))
+    
+    def _byteorder(self, mode):
+        """Returns numpy byte order character for binary .ply data format."""
+        if mode == "binary_little_endian":
+            return "<"
+        elif mode == "binary_big_endian":
+            return ">"
+        raise ValueError('Unknown .PLY data format %s.' % mode)
+    
+    def _read_bin(self, meshdata, mode, elements):
+        """Reads binary mesh data."""
+        return self._read_records(meshdata, len(meshdata), self._element_dtypes(elements, self._byteorder(mode)))
+    
+    def _map_bin(self, filepath, datastart, mode, elements):
+        """Memory-maps binary mesh data, returning read-only vertex and face views."""
+        layout = self._element_dtypes(elements, self._byteorder(mode))
+        (vertdtype, vertstart), (facedtype, facestart) = self._record_offsets(layout, getsize(filepath) - datastart)
         
-        vert_face_array = array([[vert_array[vertex] for vertex in face] for face in face_array], float)
+        vertdata = memmap(filepath, vertdtype, 'r', datastart+vertstart, (self.nvert,))
+        facedata = memmap(filepath, facedtype, 'r', datastart+facestart, (self.nface,))
         
-        return vert_array, face_array, vert_face_array
+        return self._mesh_fields(vertdata, facedata)
     
-    def check_mesh_consistency(self):
-        """Checks mesh data produced by CreateArray for consistency, raises exceptions if mesh is inconsistent or nonexistent."""
-        if self.vertices is None or self.faces is None or self.triverts is None:
+    def check_mesh_consistency(self, trusted=False):
+        """Checks mesh data produced by CreateArray for consistency, raises exceptions if mesh is inconsistent or nonexistent.
+        
+        Args:
+            trusted (bool): If true, skip comparing triverts with vertices indexed by 
+                faces, e.g. for mesh data just read by CreateArray. Array lengths and 
+                vertex index ranges are always checked.
+        
+        """
+        if self.vertices is None or self.faces is None:
             raise ValueError('Mesh data is missing.')
-        if len(self.vertices) != self.nvert or len(self.faces) != self.nface or len(self.triverts) != self.nface:
+        if len(self.vertices) != self.nvert or len(self.faces) != self.nface:
+            raise ValueError('Unexpected vertex, face, or face-vertex index length, mesh is inconsistent.')
+        if (self.faces < 0).any() or (self.faces >= self.nvert).any():
+            raise ValueError('Polygon vertex indices out of range of mesh vertices, mesh is inconsistent.')
+        # triverts built on demand from vertices and faces are consistent by construction
+        if trusted or self._triverts is None:
+            return
+        if len(self._triverts) != self.nface:
             raise ValueError('Unexpected vertex, face, or face-vertex index length, mesh is inconsistent.')
-        for i, trivert in enumerate(self.triverts):
-            if (trivert != self.vertices[self.faces[i]]).any():
-                raise ValueError("Mesh vertex and face arrays do not contain identical vertices, mesh is inconsistent.")
+        check_faces(self.vertices, self.faces, self._triverts)
         
-    def SaveArray(self, filepath): 
-        """Saves mesh as an ASCII .ply format triangulated surface file.
+    def SaveArray(self, filepath, binary=False): 
+        """Saves mesh as an ASCII or binary little endian .ply format triangulated surface file.
+        
+        Binary files store vertices as float if mesh vertices are float32 and as double 
+        otherwise, so that CreateArray reads back identical vertex values. ASCII files 
+        write the shortest decimal representation of each vertex coordinate that reads 
+        back as the same value.
         
         Args:
             filepath (str): Path to a .ply polygon mesh file to be created.
+            binary (bool): If true, save as binary little endian .ply file.
         
         """
         self.check_mesh_consistency()
         
-        arrayfile = open(filepath,'w')
+        with open(filepath, 'wb') as arrayfile:
+            if binary:
+                self._write_bin(arrayfile)
+            else:
+                self._write_ascii(arrayfile)
+    
+    def _write_ascii(self, arrayfile):
+        """Writes mesh header and data to ASCII .ply file, formatting WRITE_CHUNK rows of data at a time."""
         arrayfile.write("ply\nformat ascii 1.0\nelement vertex %s\n" % self.nvert)
         arrayfile.write("property float32 x\nproperty float32 y\nproperty float32 z\nelement face %s\nproperty list uint8 int32 vertex_indices\nend_header\n" % self.nface)
         
-        for xyz in self.Vertices():
-            arrayfile.write(str(xyz[0])+" "+str(xyz[1])+" "+str(xyz[2])+"\n")
+        # vertex values are formatted with str() of their numpy scalars, as written by previous versions
+        for start in xrange(0, self.nvert, WRITE_CHUNK):
+            xyz = self.vertices[start:start+WRITE_CHUNK]
+            arrayfile.write("%s %s %s\n" * len(xyz) % tuple(str(value) for value in xyz.ravel()))
         
-        for vertexindices in self.Triangles():
-            arrayfile.write("3 " + str(int(vertexindices[0]))+" "+str(int(vertexindices[1]))+" "+str(int(vertexindices[2]))+"\n")
-            
-        arrayfile.close()
+        for start in xrange(0, self.nface, WRITE_CHUNK):
+            vertexindices = self.faces[start:start+WRITE_CHUNK]
+            arrayfile.write("3 %d %d %d\n" * len(vertexindices) % tuple(vertexindices.ravel().tolist()))
+    
+    def _write_bin(self, arrayfile):
+        """Writes mesh header and data to binary little endian .ply file as packed vertex and face records."""
+        vertextype = 'float' if self.vertices.dtype == 'float32' else 'double'
+        arrayfile.write("ply\nformat binary_little_endian 1.0\nelement vertex %s\n" % self.nvert)
+        arrayfile.write("property %s x\nproperty %s y\nproperty %s z\n" % ((vertextype,)*3))
+        arrayfile.write("element face %s\nproperty list uchar int vertex_indices\nend_header\n" % self.nface)
+        
+        self.vertices.astype('<'+PLY_TYPES[vertextype]).tofile(arrayfile)
+        
+        facedata = zeros(self.nface, [('count', 'u1'), ('vertex_indices', '<i4', (3,))])
+        facedata['count'] = 3
+        facedata['vertex_indices'] = self.faces
+        facedata.tofile(arrayfile)
         
     def Vertices(self):
         """Returns vertex XYZ data points."""
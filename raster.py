@@ -0,0 +1,126 @@
+'''
+Functions for measuring the outline area of a polygon mesh, i.e. the area of its polygons projected
+on the XY plane, by rasterizing projected polygons into a boolean grid of square cells. A cell is
+covered when its centre lies inside or on the edge of any polygon, and outline area is the number of
+covered cells times cell area. Polygons are filled as horizontal spans of cells, one span per
+polygon per cell row, and the grid is built in tiles of whole rows so that memory use stays within
+a fixed number of cells regardless of grid resolution.
+'''
+
+from numpy import asarray, ceil, floor, minimum, maximum, clip, repeat, arange, cumsum, bincount, flatnonzero, full, inf, isinf, errstate
+
+# Default number of cells along the longer XY side of the grid
+RESOLUTION = 1000
+# Default maximum number of cells in one tile of the grid
+TILE_CELLS = 2**20
+
+def grid(xy, resolution=RESOLUTION):
+    """Returns a grid of square cells covering XY points.
+
+    Args:
+        xy (ndarray): XY points to cover.
+        resolution (int): Number of cells along the longer XY side of the grid.
+
+    Returns:
+        tuple: XY origin (lower left corner) of grid, cell side length, and number of cell rows
+            (along Y) and columns (along X).
+    """
+    if resolution < 1:
+        raise ValueError("Raster resolution must be at least one cell.")
+    origin = xy.min(axis=0)
+    extent = xy.max(axis=0) - origin
+    cellsize = extent.max() / float(resolution)
+    if cellsize == 0.0:
+        raise ValueError("Polygon mesh has a zero area projected in the XY plane.")
+
+    ncols, nrows = maximum(minimum(ceil(extent / cellsize), resolution), 1).astype(int)
+    return origin, cellsize, nrows, ncols
+
+def spans(triangles, rows, origin, cellsize, ncols):
+    """Returns cell spans covered by triangles along cell rows.
+
+    Args:
+        triangles (ndarray): XY points of triangle corners (ntriangle x 3 x 2).
+        rows (ndarray): Cell row crossed by each triangle.
+        origin (ndarray): XY origin of grid, see grid().
+        cellsize (float): Cell side length of grid.
+        ncols (int): Number of cell columns in grid.
+
+    Returns:
+        tuple: Row, first column and last column of each non-empty span.
+    """
+    y = origin[1] + (rows + 0.5) * cellsize
+    left = full(len(rows), inf)
+    right = full(len(rows), -inf)
+
+    for corner, nextcorner in ((0, 1), (1, 2), (2, 0)):
+        x0, y0 = triangles[:,corner,0], triangles[:,corner,1]
+        x1, y1 = triangles[:,nextcorner,0], triangles[:,nextcorner,1]
+        crossed = (minimum(y0, y1) <= y) & (y <= maximum(y0, y1)) & (y0 != y1)
+        with errstate(divide='ignore', invalid='ignore'):
+            x = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+        left[crossed] = minimum(left[crossed], x[crossed])
+        right[crossed] = maximum(right[crossed], x[crossed])
+
+    # cell centres within [left, right]
+    crossed = ~isinf(left)
+    first = ceil((left[crossed] - origin[0]) / cellsize - 0.5)
+    last = floor((right[crossed] - origin[0]) / cellsize - 0.5)
+    first, last = clip(first, 0, ncols - 1).astype(int), clip(last, -1, ncols - 1).astype(int)
+    nonempty = first <= last
+    return rows[crossed][nonempty], first[nonempty], last[nonempty]
+
+def tiles(vertices, faces, resolution=RESOLUTION, maxcells=TILE_CELLS):
+    """Yields rasterized mesh polygons projected on the XY plane, one tile of cell rows at a time.
+
+    Args:
+        vertices (ndarray): Vertex XYZ points for mesh.
+        faces (ndarray): Polygons with component vertex indices for mesh.
+        resolution (int): Number of cells along the longer XY side of the grid.
+        maxcells (int): Maximum number of cells in one tile. Tiles always hold at least one row.
+
+    Yields:
+        tuple: First cell row of tile, and boolean array of covered cells (rows x columns) of tile.
+            Cell side length and origin of the grid are given by grid().
+    """
+    xy = asarray(vertices, float)[:,:2]
+    origin, cellsize, nrows, ncols = grid(xy, resolution)
+    triangles = xy[asarray(faces, int).reshape(-1, 3)]
+
+    # cell rows with centres between lowest and highest corner of each triangle
+    firstrow = ceil((triangles[:,:,1].min(axis=1) - origin[1]) / cellsize - 0.5)
+    lastrow = floor((triangles[:,:,1].max(axis=1) - origin[1]) / cellsize - 0.5)
+    firstrow, lastrow = clip(firstrow, 0, nrows).astype(int), clip(lastrow, -1, nrows - 1).astype(int)
+
+    tilerows = max(1, maxcells // ncols)
+    for start in range(0, nrows, tilerows):
+        stop = min(start + tilerows, nrows)
+        crossing = flatnonzero((firstrow < stop) & (lastrow >= start) & (firstrow <= lastrow))
+        first = maximum(firstrow[crossing], start)
+        count = minimum(lastrow[crossing], stop - 1) - first + 1
+
+        triangle = repeat(crossing, count)
+        rows = arange(len(triangle)) - repeat(cumsum(count) - count, count) + repeat(first, count)
+        row, firstcol, lastcol = spans(triangles[triangle], rows, origin, cellsize, ncols)
+
+        # +1 at first and -1 after last cell of each span, summed along rows
+        offset = (row - start) * (ncols + 1)
+        size = (stop - start) * (ncols + 1)
+        edges = bincount(offset + firstcol, minlength=size) - bincount(offset + lastcol + 1, minlength=size)
+        yield start, cumsum(edges.reshape(stop - start, ncols + 1), axis=1)[:,:ncols] > 0
+
+def projected_area(vertices, faces, resolution=RESOLUTION, maxcells=TILE_CELLS):
+    """Returns rasterized area of mesh polygons projected on the XY plane.
+
+    Args:
+        vertices (ndarray): Vertex XYZ points for mesh.
+        faces (ndarray): Polygons with component vertex indices for mesh.
+        resolution (int): Number of cells along the longer XY side of the grid.
+        maxcells (int): Maximum number of cells held in memory at once, see tiles().
+
+    Returns:
+        tuple: Projected area, number of covered cells, and cell side length.
+    """
+    cellsize = grid(asarray(vertices, float)[:,:2], resolution)[1]
+    ncell = sum(int(tile.sum()) for start, tile in tiles(vertices, faces, resolution, maxcells))
+    return ncell * cellsize**2, ncell, cellsize
@@ -9,39 +9,88 @@ produces a "flat" 2D projection of the 3D mesh input on the XY plane. The plot
 is then returned as a StringIO file-like object and the scalebar pixel length 
 is returned as a float. The function areafromrender() uses the image buffer and
 the scalebar pixel length to derive the absolute projection area ("outline
-area") of the 3D mesh in the XY plane.
+area") of the 3D mesh in the XY plane. Pixels are counted by packing RGBA
+pixel values into 32-bit integers (pixelvalues()) and counting all colors of
+interest in one histogram pass (colorcounts()), also used by RFI.MeshRFI.
+
+Plots are drawn by a RenderContext, an off-screen figure that is cleared and 
+redrawn for each plot rather than a new pyplot figure per plot, so that memory 
+use stays flat over any number of plots. RFI.MeshRFI shares the same context 
+(see rendercontext()).
 
 @author: Julia M. Winchester
 '''
 import matplotlib
 matplotlib.use('AGG')
 
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.patches import Polygon
+from matplotlib.collections import PolyCollection
 from StringIO import StringIO
-from numpy import array,amax,amin,square
+from numpy import array,amax,amin,square,asarray,ascontiguousarray,uint8,uint32,argsort,searchsorted,bincount,zeros
 
 try:
 	import Image
 except ImportError:
 	from PIL import Image
 
+# Reference line colors, counted as red pixels
+REFERENCE_COLORS = [(255, 0, 0, 255), (255, 127, 127, 255)]
+# Background and reference line colors, pixels of all other colors are counted as blue (mesh) pixels
+BACKGROUND_COLORS = [(255, 0, 0, 255), (255, 255, 255, 255), (255, 155, 155, 255), (255, 188, 188, 255), (255, 230, 230, 255), (255, 205, 205, 255)]
+
+def packcolors(colors):
+    """Returns RGBA colors packed as 32-bit integers, as pixel values from pixelvalues()."""
+    return ascontiguousarray(colors, uint8).reshape(-1, 4).view(uint32).ravel()
+
+def pixelvalues(image):
+    """Returns RGBA pixel values of image packed as 32-bit integers.
+    
+    Args:
+        image: PIL Image, viewed as an array without copying pixels when in RGBA mode, 
+            or sequence of RGBA tuples such as Image.getdata(), read once. 
+    """
+    if isinstance(image, Image.Image):
+        rgba = asarray(image if image.mode == 'RGBA' else image.convert('RGBA'))
+    else:
+        rgba = array(list(image), uint8)
+    return packcolors(rgba)
+
+def colorcounts(pixels, colors):
+    """Returns number of pixels of each color in colors, from one histogram of packed pixel values.
+    
+    Args:
+        pixels (ndarray): Packed pixel values, see pixelvalues().
+        colors (list): RGBA colors to count. Repeated colors get the same count.
+    """
+    if not len(colors):
+        return zeros(0, int)
+    keys = packcolors(colors)
+    order = argsort(keys)
+    sortedkeys = keys[order]
+    
+    # pixels matching a color fall into that color's bin, others are dropped
+    bins = searchsorted(sortedkeys, pixels).clip(max=len(keys)-1)
+    matched = sortedkeys[bins] == pixels
+    counts = bincount(bins[matched], minlength=len(keys))
+    return counts[searchsorted(sortedkeys, keys)]
+
 def countpixels(image, colorlist): # Returns the number of pixels in a list of RGB+transparency values that match the colors (RGB+transparency) given in colorlist
-    return sum(list(image).count(color) for color in colorlist)
+    return int(colorcounts(pixelvalues(image), colorlist).sum())
 
 def areafromrender(linelength, strbuffer): # Receives image plot from StringIO object and returns absolute area covered by mesh as projected on XY plane   
     strbuffer.seek(0) # Rewind image buffer back to beginning to allow Image.open() to identify it
-    img = Image.open(strbuffer).getdata()  
+    pixels = pixelvalues(Image.open(strbuffer))
     strbuffer.close()
-    redpixie = countpixels(img, [(255,0,0,255),(255,127,127,255)])
+    counts = colorcounts(pixels, REFERENCE_COLORS + BACKGROUND_COLORS)
+    redpixie = int(counts[:len(REFERENCE_COLORS)].sum())
     
-    bluepixie = len(list(img)) - countpixels(img, [(255, 0, 0, 255), (255, 255, 255, 255), (255, 155, 155, 255), (255, 188, 188, 255), (255, 230, 230, 255), (255, 205, 205, 255)])  
-    print "blue pixels = " + str(bluepixie)    
+    bluepixie = len(pixels) - int(counts[len(REFERENCE_COLORS):].sum())
         
     rope = float(linelength)
-    print "line = " + str(rope)
 
     redballoon = float(redpixie)
-    print "red pixels = " + str(redballoon)    
     
     # This is a very verbose explanation of the returned value
     #pixel_length_ratio = float(red_balloons/line)
@@ -54,37 +103,73 @@ def areafromrender(linelength, strbuffer): # Receives image plot from StringIO o
     
     return float(bluepixie)*(square(rope)/square(redballoon))
 
-def plotmeshoutline(mesh): # Returns pixel length of scalebar and image plot as StringIO file-like object
-    xarray = mesh[0][:,0]
-    yarray = mesh[0][:,1]
+class RenderContext(object):
+    """Off-screen figure for plotting 2D mesh projections, cleared and redrawn for each plot.
     
-    xaxismin = amin(xarray) - 0.5
-    xaxismax = amax(xarray) + 0.5
-    yaxismin = amin(yarray) - 0.5
-    yaxismax = amax(yarray) + 0.5
-    linelength = amax(yarray) - amin(yarray) + 1
+    The figure has default size and resolution and is drawn on its own Agg canvas. It is 
+    not registered with pyplot, so plots never accumulate as open pyplot figures, and the 
+    canvas keeps one pixel buffer for all plots. Plotted polygons are released as soon as 
+    each plot is saved.
     
-    fig = plt.figure()
-    ax = fig.add_subplot(111)
-        
-    linesquare = matplotlib.patches.Polygon([[xaxismin,yaxismin],[xaxismin,yaxismax]], ec='r',fc='r')
-    plt.axis([xaxismin,xaxismax,yaxismin,yaxismax])
-    ax.add_patch(linesquare)
-
-    ax.set_xscale('linear')
-    ax.set_yscale('linear')
-    ax.set_aspect(1)
-    ax.axis('off')
+    Attributes:
+        figure (Figure): Matplotlib figure plots are drawn on.
+    """
+    def __init__(self):
+        self.figure = Figure()
+        FigureCanvasAgg(self.figure)
     
-    vert = array([face[:,[0,1]] for face in mesh[1]]) # makes a copy of mesh[1] including only XY coordinate points for vertices comprising faces 
-       
-    polygons = matplotlib.collections.PolyCollection(vert,facecolor='b',edgecolor='b')
+    def plot(self, vertices, triverts):
+        """Plots mesh polygons on the XY plane in blue with a red scalebar and returns scalebar length and PNG image of plot.
         
-    ax.add_collection(polygons)
+        Args:
+            vertices (ndarray): Vertex XYZ points for mesh, setting plot extent.
+            triverts (ndarray): Polygons with component vertex XYZ points for mesh.
+        
+        Returns:
+            tuple: Scalebar length in coordinate units, and plot as StringIO file-like object.
+        """
+        xarray = vertices[:,0]
+        yarray = vertices[:,1]
+        
+        xaxismin = amin(xarray) - 0.5
+        xaxismax = amax(xarray) + 0.5
+        yaxismin = amin(yarray) - 0.5
+        yaxismax = amax(yarray) + 0.5
+        linelength = amax(yarray) - amin(yarray) + 1
+        
+        self.figure.clf()
+        ax = self.figure.add_subplot(111)
+            
+        linesquare = Polygon([[xaxismin,yaxismin],[xaxismin,yaxismax]], ec='r',fc='r')
+        ax.axis([xaxismin,xaxismax,yaxismin,yaxismax])
+        ax.add_patch(linesquare)
     
-    imgbuffer = StringIO()
-    plt.savefig(imgbuffer,format='png')
-    return linelength, imgbuffer
+        ax.set_xscale('linear')
+        ax.set_yscale('linear')
+        ax.set_aspect(1)
+        ax.axis('off')
+        
+        polygons = PolyCollection(triverts[:,:,:2],facecolor='b',edgecolor='b')
+        ax.add_collection(polygons)
+        
+        imgbuffer = StringIO()
+        try:
+            self.figure.savefig(imgbuffer,format='png')
+        finally:
+            self.figure.clf()
+        return linelength, imgbuffer
+
+_context = None
+
+def rendercontext():
+    """Returns the render context shared by plots in this process, created when first used."""
+    global _context
+    if _context is None:
+        _context = RenderContext()
+    return _context
+
+def plotmeshoutline(mesh): # Returns pixel length of scalebar and image plot as StringIO file-like object
+    return rendercontext().plot(mesh[0], mesh[1])
 
 def meshprojectionarea(mesh):
     linelength, imgbuffer = plotmeshoutline(mesh)
@@ -8,8 +8,8 @@ import DNE
 import cPickle as pickle
 
 from copy import deepcopy
-from numpy import array
-from numpy.linalg import LinAlgError
+from numpy import array, arange, allclose, inf, nan
+from numpy.linalg import LinAlgError, cond
 
 class Test(unittest.TestCase):
 
@@ -19,29 +19,51 @@ class Test(unittest.TestCase):
             cls._Mesh = pickle.load(input)
         with open('./tests/testmeshThege58dne.pkl', 'rb') as input:
             cls._RefMeshDNE = pickle.load(input)
-        cls._MeshDNE = DNE.MeshDNE(cls._Mesh, 0, 3, 0.1, 1, 1, 99.9, 1)
+        cls._MeshDNE = DNE.MeshDNE(cls._Mesh, 0, 3, 0.1, 1, 1, 99.9, 1, '')
 
-    def test_dne_calculation(self):
-        self.assertEqual(self.__class__._MeshDNE.DNE, 247.938, msg = "DNE not calculated as expected.")
-    
     def test_polygon_values(self):
-        self.assertTrue((self.__class__._MeshDNE.e == self.__class__._RefMeshDNE.e).all(), msg = "Polygon energy densities not calculated as expected.")
-        self.assertTrue((self.__class__._MeshDNE.facearea == self.__class__._RefMeshDNE.facearea).all(), msg = "Polygon face areas not calculated as expected.")
-        self.assertTrue((self.__class__._MeshDNE.equantity == self.__class__._RefMeshDNE.equantity).all(), msg = "Polygon energy quantities not calculated as expected.")
-        
-    def test_alternate_outlier_removal(self):
-        MeshDNE = DNE.MeshDNE(self.__class__._Mesh, 0, 3, 0.1, 1, 1, 99.9, 0)
-        self.assertEqual(MeshDNE.DNE, 249.806)
-                
+        self.assertTrue(allclose(self.__class__._MeshDNE.e, self.__class__._RefMeshDNE.e, rtol=1e-12, atol=0, equal_nan=True), msg = "Polygon energy densities not calculated as expected.")
+        self.assertTrue(allclose(self.__class__._MeshDNE.facearea, self.__class__._RefMeshDNE.facearea, rtol=1e-12, atol=0, equal_nan=True), msg = "Polygon face areas not calculated as expected.")
+        self.assertTrue(allclose(self.__class__._MeshDNE.equantity, self.__class__._RefMeshDNE.equantity, rtol=1e-12, atol=0, equal_nan=True), msg = "Polygon energy quantities not calculated as expected.")
+
     def test_secondary_lists(self):
-        self.assertListEqual(self.__class__._MeshDNE.high_condition_faces, self.__class__._RefMeshDNE.high_condition_faces, msg = "List of high condition number faces not built as expected.")
-        self.assertListEqual(self.__class__._MeshDNE.outlier_faces, self.__class__._RefMeshDNE.outlier_faces, msg = "List of outlier faces not built as expected.")
+        self.assertListEqual(self.__class__._MeshDNE.high_condition_faces['index'].tolist(), [face[0] for face in self.__class__._RefMeshDNE.high_condition_faces], msg = "List of high condition number faces not built as expected.")
+        self.assertListEqual(self.__class__._MeshDNE.outlier_faces['index'].tolist(), [face[0] for face in self.__class__._RefMeshDNE.outlier_faces], msg = "List of outlier faces not built as expected.")
+        self.assertTrue(allclose(self.__class__._MeshDNE.outlier_faces['energy'], [face[1] for face in self.__class__._RefMeshDNE.outlier_faces], rtol=1e-12), msg = "Energy values of outlier faces not calculated as expected.")
+        self.assertTrue(allclose(self.__class__._MeshDNE.outlier_faces['area'], [face[2] for face in self.__class__._RefMeshDNE.outlier_faces], rtol=1e-12), msg = "Areas of outlier faces not calculated as expected.")
         self.assertListEqual(self.__class__._MeshDNE.boundary_faces, self.__class__._RefMeshDNE.boundary_faces, msg = "List of boundary faces not built as expected.")
         self.assertListEqual(self.__class__._MeshDNE.nan_faces, self.__class__._RefMeshDNE.nan_faces, msg = "List of polygon faces with Nan energy values not built as expected.")
 
     def test_normals(self):
-        self.assertTrue((self.__class__._MeshDNE.fnormal == self.__class__._RefMeshDNE.fnormal).all(), msg = "Array of face normal vectors not created as expected.")
-        self.assertTrue((self.__class__._MeshDNE.vnormal == self.__class__._RefMeshDNE.vnormal).all(), msg = "Array of approximated vertex normal vectors not created as expected.")
+        self.assertTrue(allclose(self.__class__._MeshDNE.fnormal, self.__class__._RefMeshDNE.fnormal, rtol=1e-12, atol=0, equal_nan=True), msg = "Array of face normal vectors not created as expected.")
+        self.assertTrue(allclose(self.__class__._MeshDNE.vnormal, self.__class__._RefMeshDNE.vnormal, rtol=1e-12, atol=0, equal_nan=True), msg = "Array of approximated vertex normal vectors not created as expected.")
+
+    def test_vert_tri_dict_from_mesh(self):
+        self.assertDictEqual(self.__class__._MeshDNE.vert_tri_dict.todict(), self.__class__._RefMeshDNE.vert_tri_dict, msg = "Vertex to polygon index dictionary not built as expected from reference mesh.")
+
+    def test_get_edge_verts_from_mesh(self):
+        self.assertTrue((self.__class__._MeshDNE.edgeverts == self.__class__._RefMeshDNE.edgeverts).all(), msg = "Array of vertex pairs forming polygon edges not built as expected from reference mesh.")
+
+    def test_get_boundary_faces_from_mesh(self):
+        self.assertListEqual(self.__class__._MeshDNE.boundary_faces, self.__class__._RefMeshDNE.boundary_faces, msg = "List of boundary faces not built as expected from reference mesh.")
+
+class Test_MeshDNE(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open('./tests/testmeshThege58.pkl', 'rb') as input:
+            cls._Mesh = pickle.load(input)
+        cls._MeshDNE = DNE.MeshDNE(cls._Mesh, 0, 3, 0.1, 1, 1, 99.9, 1, '')
+
+    def test_dne_calculation(self):
+        self.assertEqual(self.__class__._MeshDNE.DNE, 247.938, msg = "DNE not calculated as expected.")
+
+    def test_nan_vertices(self):
+        self.assertEqual(len(self.__class__._MeshDNE.nan_vertices), 0, msg = "Vertices with nan normals unexpectedly found for test mesh.")
+
+    def test_alternate_outlier_removal(self):
+        MeshDNE = DNE.MeshDNE(self.__class__._Mesh, 0, 3, 0.1, 1, 1, 99.9, 0, '')
+        self.assertEqual(MeshDNE.DNE, 249.806)
 
     def test_get_vert_tri_dict_method(self):
         MeshDNE = deepcopy(self.__class__._MeshDNE)
@@ -51,21 +73,15 @@ class Test(unittest.TestCase):
         
         MeshDNE._get_vert_tri_dict()
         
-        self.assertDictEqual(MeshDNE.vert_tri_dict, solution_dict, msg = "Vertex to polygon index dictionary not built as expected.")
-
-    def test_vert_tri_dict_from_mesh(self):
-        self.assertDictEqual(self.__class__._MeshDNE.vert_tri_dict, self.__class__._RefMeshDNE.vert_tri_dict, msg = "Vertex to polygon index dictionary not built as expected from reference mesh.")
+        self.assertDictEqual(MeshDNE.vert_tri_dict.todict(), solution_dict, msg = "Vertex to polygon index dictionary not built as expected.")
 
-    def test_get_edge_verts_from_mesh(self):
-        self.assertTrue((self.__class__._MeshDNE.edgeverts == self.__class__._RefMeshDNE.edgeverts).all(), msg = "Array of vertex pairs forming polygon edges not built as expected from reference mesh.")
-    
     def test_get_edge_verts_non_triangle_error(self):
         MeshDNE = deepcopy(self.__class__._MeshDNE)
         test_cases = [array([[]]), array([[0, 1, 2, 3]]), array([[0, 1]])]
         for test_case in test_cases:
             MeshDNE.Mesh.faces = test_case
             self.assertRaises(ValueError, MeshDNE._get_edge_verts)
-            
+
     def test_get_boundary_faces_method(self):
         MeshDNE = deepcopy(self.__class__._MeshDNE)
         MeshDNE.Mesh.faces = array([[0, 1, 3], [1, 3, 4], [1, 2, 4], [3, 4, 5]])
@@ -76,10 +92,8 @@ class Test(unittest.TestCase):
         MeshDNE._get_boundary_faces()
                 
         self.assertListEqual(MeshDNE.boundary_faces, [0, 2, 3], msg = "List of boundary faces not built as expected.")
+        self.assertListEqual(MeshDNE.boundary_mask.tolist(), [True, False, True, True], msg = "Mask of boundary faces not built as expected.")
 
-    def test_get_boundary_faces_from_mesh(self):
-        self.assertListEqual(self.__class__._MeshDNE.boundary_faces, self.__class__._RefMeshDNE.boundary_faces, msg = "List of boundary faces not built as expected from reference mesh.")
-    
     def test_get_boundary_faces_no_polygons(self):
         MeshDNE = deepcopy(self.__class__._MeshDNE)
         MeshDNE.Mesh.faces = array([])
@@ -88,33 +102,58 @@ class Test(unittest.TestCase):
         MeshDNE._get_boundary_faces()
         
         self.assertListEqual(MeshDNE.boundary_faces, [], msg = "List of boundary faces not built as expected from empty mesh.")
-    
+
     def test_energize_surface(self):
         pass
 
     def test_energy_function_method(self):
         MeshDNE = self.__class__._MeshDNE
-        self.assertEqual(MeshDNE._energy(MeshDNE.Mesh.faces[1], 1), [6.276453180651151, 0.024020901165739069], msg = "Energy from polygon not calculated as expected.")
-        
+        self.assertEqual(MeshDNE._energy(MeshDNE.Mesh.faces[1], 1), [6.276453180651151, 0.024020901165739073], msg = "Energy from polygon not calculated as expected.")
+
     def test_energy_function_high_cond_with_checking(self):
         MeshDNE = deepcopy(self.__class__._MeshDNE)
         MeshDNE.docondition = 1
         
         self.assertEqual(MeshDNE._energy(MeshDNE.Mesh.faces[5930], 5930), [0, 1], msg = "Calculation of energy from high condition-number polygon (with condition number checking) did not operate as expected.")
-    
+
     def test_energy_function_high_cond_no_checking_error(self):
         MeshDNE = deepcopy(self.__class__._MeshDNE)
         MeshDNE.docondition = 0
         
         self.assertRaises(LinAlgError, MeshDNE._energy, MeshDNE.Mesh.faces[5930], 5930)
-    
+
+    def test_energy_function_duplicate_vertices(self):
+        MeshDNE = deepcopy(self.__class__._MeshDNE)
+        
+        self.assertEqual(MeshDNE._energy(array([1, 2, 1]), 0), [0, 1], msg = "Calculation of energy from polygon with duplicate vertices did not operate as expected.")
+
+    def test_energy_arrays_method(self):
+        MeshDNE = deepcopy(self.__class__._MeshDNE)
+        e, facearea = MeshDNE._energy_arrays(MeshDNE.Mesh.faces[:100], arange(100))
+        
+        self.assertListEqual(zip(e, facearea), [tuple(MeshDNE._energy(face, i)) for i, face in enumerate(MeshDNE.Mesh.faces[:100])], msg = "Energy from polygon arrays not calculated as for single polygons.")
+
+    def test_condition_method(self):
+        MeshDNE = self.__class__._MeshDNE
+        g = array([[[2.0, 1.0], [1.0, 3.0]], [[1.0, 0.0], [0.0, 1.0]], [[1.0, 2.0], [2.0, 4.0]], [[4.0, 1.9999], [1.9999, 1.0]]])
+        condition = MeshDNE._condition(g[:,0,0], g[:,0,1], g[:,1,1])
+        
+        self.assertTrue(allclose(condition[[0, 1, 3]], cond(g[[0, 1, 3]]), rtol=1e-10), msg = "Condition numbers of G matrices not calculated as expected.")
+        self.assertEqual(condition[2], inf, msg = "Condition number of singular G matrix not infinite.")
+        
+        # nearly parallel edge vectors, with g00*g11 - g01*g01 lost to rounding
+        b1, b2 = array([1.0, 1e-9, 0.0]), array([2.0, 0.0, 0.0])
+        g00, g01, g11 = b1.dot(b1), b1.dot(b2), b2.dot(b2)
+        self.assertEqual(MeshDNE._condition(g00, g01, g11), inf, msg = "Condition number of numerically singular G matrix not infinite.")
+        self.assertTrue(allclose(MeshDNE._condition(g00, g01, g11, 4e-18), 25.0 / 4e-18, rtol=1e-10), msg = "Condition number of nearly singular G matrix not calculated as expected from cross product.")
+
     def test_sum_dne_method(self):
         MeshDNE = deepcopy(self.__class__._MeshDNE)
         
         MeshDNE.dooutlier = 0
         MeshDNE.e = array(range(1,8))
         MeshDNE.facearea = array(range(2, 9))
-        MeshDNE.boundary_faces = [1, 3, 4]
+        MeshDNE.boundary_mask = array([0, 1, 0, 1, 1, 0, 0], bool)
         
         MeshDNE._sumdne()
         
@@ -122,6 +161,29 @@ class Test(unittest.TestCase):
         
         self.assertTrue((MeshDNE.equantity == array([2, 0, 12, 0, 0, 42, 56])).all(), msg = "Sum DNE method not calculating energy quantities as expected.")
 
+    def test_outlier_remove_method(self):
+        MeshDNE = deepcopy(self.__class__._MeshDNE)
+        
+        MeshDNE.outliertype = 0
+        MeshDNE.outlierperc = 25.0
+        MeshDNE.outlier_faces = MeshDNE.outlier_faces[:0]
+        MeshDNE.e = array([1.0, 5.0, nan, 2.0, 4.0])
+        MeshDNE.facearea = array([2.0, 2.0, 2.0, 1.0, 1.0])
+        MeshDNE.equantity = MeshDNE.e * MeshDNE.facearea
+        
+        MeshDNE._outlierremove()
+        
+        self.assertListEqual(MeshDNE.outlier_faces['index'].tolist(), [1, 2, 4], msg = "Outlier faces not found as expected.")
+        self.assertListEqual(MeshDNE.outlier_faces['area'].tolist(), [2.0, 2.0, 1.0], msg = "Outlier face areas not recorded as expected.")
+        self.assertListEqual(MeshDNE.equantity.tolist(), [2.0, 0.0, 0.0, 2.0, 0.0], msg = "Outlier energy quantities not removed as expected.")
+
+    def test_outlier_sweep(self):
+        MeshDNE = deepcopy(self.__class__._MeshDNE)
+        
+        self.assertListEqual(MeshDNE.outlier_sweep([(99.9, 1), (99.9, 0), (99.0, 1), (100, 1)]), [247.938, 249.806, 225.669, 253.579], msg = "DNE at outlier removal settings not calculated as expected.")
+        self.assertEqual(MeshDNE.DNE, 247.938, msg = "Outlier sweep unexpectedly changed DNE.")
+        self.assertListEqual(MeshDNE.outlier_sweep([]), [], msg = "Outlier sweep with no settings not empty.")
+
     def test_bad_outlier_percentage_error(self):
         MeshDNE = deepcopy(self.__class__._MeshDNE)
         MeshDNE.outlierperc = 101.0
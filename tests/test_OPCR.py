@@ -6,6 +6,7 @@ Created on Dec 21, 2015
 import unittest
 import cPickle as pickle
 import OPC
+import adjacency
 import math
 
 from copy import copy
@@ -29,7 +30,10 @@ class Test(unittest.TestCase):
         self.assertEqual(79, self.__class__._MeshOPCR._get_opc(Mesh.vertices, Mesh.faces, Mesh.triverts)[0], msg = "Initial OPC value (mesh unrotated) not calculated as expected from test mesh.")
 
     def test_mesh_patches_list(self): # Might need extra data files to test this
-        self.assertListEqual(self.__class__._RefMeshOPCR.patches_list, self.__class__._MeshOPCR.patches_list, msg = "Polygons not sorted into patches as expected during OPCR calculation.")
+        # patches are compared regardless of the order in which they are built
+        a = [[sorted(sorted(patch) for patch in patches) for patches in rotation] for rotation in self.__class__._RefMeshOPCR.patches_list]
+        b = [[sorted(sorted(patch) for patch in patches) for patches in rotation] for rotation in self.__class__._MeshOPCR.patches_list]
+        self.assertListEqual(a, b, msg = "Polygons not sorted into patches as expected during OPCR calculation.")
     
     def test_mesh_color_map_list(self): # Might need extra data files to test this
         a = self.__class__._RefMeshOPCR.colormap_list
@@ -47,7 +51,7 @@ class Test(unittest.TestCase):
         self.assertTrue((centered_vertices == self.__class__._MeshOPCR._centermesh(shifted_vertices)).all(), msg = "Mesh centering not performing as expected.")
 
     def test_vert_tri_dict(self):
-        self.assertDictEqual(self.__class__._RefMeshOPCR.vert_tri_dict, self.__class__._MeshOPCR.vert_tri_dict, msg = "Vertex to polygon dictionary not generated as expected during OPCR calculation.")
+        self.assertDictEqual(self.__class__._RefMeshOPCR.vert_tri_dict, self.__class__._MeshOPCR.vert_tri_dict.todict(), msg = "Vertex to polygon dictionary not generated as expected during OPCR calculation.")
 
     def test_mesh_rotation(self):
         MeshOPCR = copy(self.__class__._MeshOPCR)
@@ -77,20 +81,11 @@ class Test(unittest.TestCase):
             self.assertEqual(self.__class__._MeshOPCR._sort_to_colors(middle), colorlist[i], msg = "Sorting of degrees to color groups not behaving as expected for %s degrees (middle of color group), color group should be %s." % (middle, colorlist[i]))
         self.assertEqual(self.__class__._MeshOPCR._sort_to_colors(360.0), colorlist[0], msg = "Sorting of degrees to color groups not behaving as expected for 360 degrees (middle of color group), color group should be #FF0000.")
         
-    def test_pair_faces(self):
-        test_cases = [[0,1,2], [0,0], [0,0,1]]
-        solutions = [[(0, 1), (0, 2), (1, 2)], [], [(0,1)]]
-        for test_case, solution in zip(test_cases, solutions):
-            self.assertListEqual(self.__class__._MeshOPCR._pair_faces(test_case), solution, msg = "Pairing of values not behaving as expected.")
-
-    def test_adjacent_face_pairing(self):
-        no_shared_vertex_case = {}
-        one_shared_vertex_case = {0: [(1,2)]}
-        one_shared_edge_case = {0: [(1, 2)], 1: [(1, 2), (2, 3), (1, 3)], 2: [(2, 3)]}
-        test_cases = [no_shared_vertex_case, one_shared_vertex_case, one_shared_edge_case]
-        solutions = [[], [], [(1, 2), (2, 3)]]
-        for test_case, solution in zip(test_cases, solutions):
-            self.assertListEqual(self.__class__._MeshOPCR._adjacent_face_pairs(test_case), solution, msg = "Pairing of adjacent polygons not operating as expected." ) 
+    def test_adjacent_face_pairs(self):
+        pairs = self.__class__._MeshOPCR.adjacent_face_pairs
+        edgepairs = set(tuple(pair) for pair in adjacency.EdgeTable(self.__class__._Mesh.faces).face_pairs()[0].tolist())
+        self.assertListEqual(pairs, sorted(edgepairs), msg = "Adjacent polygon pairs not listed once each in order of polygon indices.")
+        self.assertTrue(all(x < y for x, y in pairs), msg = "Adjacent polygon pairs not listed smaller polygon index first.")
 
     def test_patch_building(self):
         no_polygons_case = []
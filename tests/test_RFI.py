@@ -5,8 +5,16 @@ Created on Nov 26, 2015
 """
 import unittest
 import RFI
-from numpy import array
+import DNE
+import render
+import gc
+import normcore
+from numpy import array, ones
 from copy import copy
+from matplotlib.figure import Figure
+from matplotlib.axes import Axes
+from matplotlib.collections import PolyCollection
+from matplotlib.patches import Polygon
 import cPickle as pickle
 
 try:
@@ -44,6 +52,13 @@ class Test_MeshRFI(unittest.TestCase):
         Mesh.triverts = array([[[0.0,1.0,0.0],[0.0,0.0, 0.0],[1.0,1.0, 0.0]]])
         self.assertRaises(ValueError, RFI.MeshRFI, Mesh)
         
+    def test_mesh_check_without_triverts(self):
+        """Tests that mesh consistency check does not build face-vertex arrays absent from mesh."""
+        Mesh = copy(self.__class__._Mesh)
+        Mesh.vertices = self.__class__._Mesh.vertices
+        RFI.MeshRFI(Mesh, projmode='raster')
+        self.assertTrue(Mesh._triverts is None, "Face-vertex arrays unexpectedly built for raster projected area.")
+        
     def test_rfi(self):
         """Tests RFI calculation for example mesh."""
         self.assertEqual(self.__class__._MeshRFI.RFI, 2.178, "Relief index not calculated as expected from test mesh.")
@@ -92,10 +107,9 @@ class Test_MeshRFI(unittest.TestCase):
         imgbuffer = self.__class__._plot
         imgbuffer.seek(0)
         img = Image.open(imgbuffer).getdata()
-        self.assertEqual(self.__class__._MeshRFI._count_pixels(img, (255, 0, 0, 255), (255, 255, 255, 255), (255, 155, 155, 255), (255, 188, 188, 255), (255, 230, 230, 255), (255, 205, 205, 255)), 378436, "Unexpected pixel count from test plot.")
-        self.assertEqual(self.__class__._MeshRFI._count_pixels(img, (255, 0, 0, 255), (255, 0, 0, 255), (255, 255, 255, 255), (255, 255, 255, 255), (255, 155, 155, 255), (255, 188, 188, 255), (255, 230, 230, 255), (255, 205, 205, 255)), 378436, "Duplicate colors in color list unexpectedly affect pixel counting.")
-        self.assertEqual(self.__class__._MeshRFI._count_pixels(img, (255, 0, 0, 255)), 479, "Unexpected pixel count of single color from test plot.")
-        self.assertEqual(self.__class__._MeshRFI._count_pixels(img), 0, "Unexpected non-zero pixel count from test plot with no colors specified to be counted.")
+        self.assertEqual(render.countpixels(img, [(255, 0, 0, 255), (255, 255, 255, 255), (255, 155, 155, 255), (255, 188, 188, 255), (255, 230, 230, 255), (255, 205, 205, 255)]), 378436, "Unexpected pixel count from test plot.")
+        self.assertEqual(render.countpixels(img, [(255, 0, 0, 255)]), 479, "Unexpected pixel count of single color from test plot.")
+        self.assertEqual(render.countpixels(img, []), 0, "Unexpected non-zero pixel count from test plot with no colors specified to be counted.")
 
     def test_non_stringio_object_error(self):
         """Test error when non-image object is supplied."""
@@ -103,21 +117,73 @@ class Test_MeshRFI(unittest.TestCase):
         MeshRFI.imgbuffer = 0
         self.assertRaises(TypeError, MeshRFI._get_2d_area)
         
+    def test_polygon_areas(self):
+        """Tests that polygon areas sum to surface area and agree with DNE polygon areas."""
+        MeshRFI = self.__class__._MeshRFI
+        MeshDNE = DNE.MeshDNE(self.__class__._Mesh, 0, 3, 0.1, 1, 0, 99.9, 1, '')
+        counted = ones(len(MeshRFI.facearea), bool)
+        counted[MeshDNE.high_condition_faces['index']] = False
+        self.assertEqual(MeshRFI.surfarea, round(MeshRFI.facearea.sum(), 3), "Surface area is not sum of polygon areas.")
+        self.assertTrue((MeshRFI.facearea[counted] == MeshDNE.facearea[counted]).all(), "Polygon areas for RFI and DNE unexpectedly differ.")
+    
+    def test_batch_memory(self):
+        """Tests that a batch of rendered projection areas leaves no figures or plotted polygons behind."""
+        Mesh = copy(self.__class__._Mesh)
+        Mesh.faces = self.__class__._Mesh.faces[:200]
+        Mesh.triverts = Mesh.vertices[Mesh.faces]
+        RFI.MeshRFI(Mesh, trusted=True)
+        
+        def live_objects():
+            gc.collect()
+            objects = gc.get_objects()
+            return [sum(isinstance(obj, cls) for obj in objects) for cls in (Figure, Axes, PolyCollection, Polygon)]
+        
+        before = live_objects()
+        for i in range(20):
+            RFI.MeshRFI(Mesh, trusted=True)
+        self.assertListEqual(live_objects(), before, "Figures, axes or polygons unexpectedly accumulate with number of meshes rendered.")
+    
     def test_triangle_area(self):
         """Test triangle area calculation."""
         verts = self.__class__._MeshRFI.Mesh.triverts[0] 
-        self.assertEqual(self.__class__._MeshRFI._triangle_area(verts), 6.556493936703974e-06, "Triangle area value not calculated as expected.")
+        self.assertAlmostEqual(normcore.facearea(verts, [[0, 1, 2]])[0], 6.556493936703974e-06, 14, "Triangle area value not calculated as expected.")
         
     def test_triangle_identical_vertices(self):
         """Test that 0 is returned for triangle area when one or more vertices are identical."""
         verts = self.__class__._MeshRFI.Mesh.triverts[0]
-        self.assertEqual(self.__class__._MeshRFI._triangle_area(array([verts[0], verts[0], verts[0]])), 0.0, "A triangle with three identical vertices unexpectedly returns a non-zero area value.")
-        self.assertEqual(self.__class__._MeshRFI._triangle_area(array([verts[0], verts[0], verts[1]])), 0.0, "A triangle with two identical vertices unexpectedly returns a non-zero area value.")
+        self.assertEqual(normcore.facearea(array([verts[0], verts[0], verts[0]]), [[0, 1, 2]])[0], 0.0, "A triangle with three identical vertices unexpectedly returns a non-zero area value.")
+        self.assertEqual(normcore.facearea(array([verts[0], verts[0], verts[1]]), [[0, 1, 2]])[0], 0.0, "A triangle with two identical vertices unexpectedly returns a non-zero area value.")
         
     def test_triangle_vertex_shuffle(self):
         """Test that triangle area is equal regardless of vertex order."""
         for vert in self.__class__._MeshRFI.Mesh.triverts:
-            self.assertAlmostEqual(self.__class__._MeshRFI._triangle_area(vert), self.__class__._MeshRFI._triangle_area(array([vert[0],vert[2],vert[1]])), 10, "Triangle vertex re-ordering unexpectedly modifies triangle area calculation.")
+            self.assertAlmostEqual(normcore.facearea(vert, [[0, 1, 2]])[0], normcore.facearea(vert, [[0, 2, 1]])[0], 10, "Triangle vertex re-ordering unexpectedly modifies triangle area calculation.")
+
+    def test_exact_projection_area(self):
+        """Tests exact 2D projection area and RFI for example mesh."""
+        MeshRFI = RFI.MeshRFI(self.__class__._Mesh, trusted=True, projmode='exact')
+        self.assertEqual((MeshRFI.projarea, MeshRFI.surfarea, MeshRFI.RFI), (96.338, 213.537, 2.217), "Exact projection area not calculated as expected from test mesh.")
+        self.assertEqual((MeshRFI.imgbuffer, MeshRFI.bluepixie, MeshRFI.redpixie), (None, None, None), "Surface unexpectedly plotted for exact projection area.")
+
+    def test_raster_projection_area(self):
+        """Tests rasterized 2D projection area for example mesh."""
+        MeshRFI = RFI.MeshRFI(self.__class__._Mesh, trusted=True, projmode='raster', resolution=1000)
+        self.assertEqual((MeshRFI.projarea, MeshRFI.bluepixie, MeshRFI.RFI), (96.34, 497592, 2.216), "Rasterized projection area not calculated as expected from test mesh.")
+        self.assertAlmostEqual(MeshRFI.pixelratio, 71.867, 3, "Cells per unit length not recorded as expected from test mesh.")
+        self.assertEqual((MeshRFI.imgbuffer, MeshRFI.linelen, MeshRFI.redpixie), (None, None, None), "Surface unexpectedly plotted for rasterized projection area.")
+
+    def test_exact_zero_area_error(self):
+        """Tests for error for mesh with zero 2D XY area in exact mode."""
+        Mesh = copy(self.__class__._Mesh)
+        Mesh.vertices = array([[0.0,0.0,0.0],[0.0,1.0,0.0],[0.0,2.0,1.0]])
+        Mesh.faces = array([[0, 1, 2]])
+        Mesh.triverts = Mesh.vertices[Mesh.faces]
+        Mesh.edge_table = None
+        self.assertRaises(ValueError, RFI.MeshRFI, Mesh, True, 'exact')
+
+    def test_unknown_projection_mode(self):
+        """Tests for error when projected area mode is not recognized."""
+        self.assertRaises(ValueError, RFI.MeshRFI, self.__class__._Mesh, True, 'vector')
 
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
@@ -0,0 +1,75 @@
+import unittest
+import adjacency
+import cPickle as pickle
+
+from collections import defaultdict
+from numpy import array
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open('./tests/testmeshThege58.pkl', 'rb') as input:
+            cls._Mesh = pickle.load(input)
+
+    def test_vert_tri_csr(self):
+        faces = array([[0, 1, 3], [1, 3, 4], [1, 2, 4], [3, 4, 5]])
+        VertTri = adjacency.VertTriCSR(faces, 7)
+
+        self.assertDictEqual(VertTri.todict(), {0: [0], 1: [0, 1, 2], 2: [2], 3: [0, 1, 3], 4: [1, 2, 3], 5: [3]}, msg = "Vertex to polygon adjacency not built as expected.")
+        self.assertEqual(VertTri.offsets.tolist(), [0, 1, 4, 5, 8, 11, 12, 12], msg = "Vertex to polygon adjacency offsets not built as expected.")
+        self.assertEqual(VertTri.corners[VertTri.offsets[4]:VertTri.offsets[5]].tolist(), [2, 2, 1], msg = "Vertex positions within polygons not recorded as expected.")
+        self.assertEqual((len(VertTri), VertTri[6].tolist(), VertTri[10].tolist(), 6 in VertTri, 5 in VertTri), (6, [], [], False, True), msg = "Unexpected adjacency of vertices not used by polygons.")
+
+    def test_vert_tri_csr_from_mesh(self):
+        vert_tri_dict = defaultdict(list)
+        for findex, face in enumerate(self.__class__._Mesh.faces):
+            for vertex in face:
+                vert_tri_dict[vertex].append(findex)
+
+        VertTri = adjacency.mesh_vert_tri(self.__class__._Mesh)
+        self.assertDictEqual(VertTri.todict(), vert_tri_dict, msg = "Vertex to polygon adjacency not built as expected from reference mesh.")
+        self.assertEqual([vertex for vertex, faces in VertTri.iteritems()], sorted(vert_tri_dict), msg = "Vertex to polygon adjacency not iterated in vertex order.")
+
+    def test_vert_tri_csr_no_polygons(self):
+        VertTri = adjacency.VertTriCSR(array([]), 3)
+        self.assertEqual((len(VertTri), VertTri[0].tolist(), VertTri.todict()), (0, [], {}), msg = "Vertex to polygon adjacency not built as expected from empty mesh.")
+
+    def test_edge_table(self):
+        faces = array([[0, 1, 3], [1, 3, 4], [1, 2, 4], [3, 4, 5]])
+        Edges = adjacency.EdgeTable(faces)
+
+        self.assertEqual(Edges.edgeverts.tolist(), [[1, 0], [3, 0], [3, 1], [4, 1], [4, 3], [2, 1], [4, 2], [5, 3], [5, 4]], msg = "Edges not numbered in order of first use.")
+        self.assertEqual(Edges.face_edges.tolist(), [[0, 1, 2], [2, 3, 4], [5, 3, 6], [4, 7, 8]], msg = "Polygon edges not recorded as expected.")
+        self.assertEqual(Edges.counts.tolist(), [1, 1, 2, 2, 2, 1, 1, 1, 1], msg = "Edge use counts not recorded as expected.")
+        self.assertEqual(Edges.boundary.tolist(), [True, True, False, False, False, True, True, True, True], msg = "Boundary edges not flagged as expected.")
+        self.assertEqual([Edges.faces[Edges.offsets[i]:Edges.offsets[i+1]].tolist() for i in range(len(Edges))], [[0], [0], [0, 1], [1, 2], [1, 3], [2], [2], [3], [3]], msg = "Edge to polygon incidence not built as expected.")
+
+        pairs, shared = Edges.face_pairs()
+        self.assertEqual((pairs.tolist(), shared.tolist()), ([[0, 1], [1, 2], [1, 3]], [2, 3, 4]), msg = "Polygons sharing edges not paired as expected.")
+
+    def test_edge_table_from_mesh(self):
+        Edges = adjacency.mesh_edge_table(self.__class__._Mesh)
+        edges = dict()
+        for face in self.__class__._Mesh.faces:
+            for v1, v2 in ((face[0], face[1]), (face[2], face[0]), (face[1], face[2])):
+                key = (max(v1, v2), min(v1, v2))
+                edges[key] = edges.get(key, 0) + 1
+
+        self.assertEqual(sorted(map(tuple, Edges.edgeverts.tolist())), sorted(edges), msg = "Edges not built as expected from reference mesh.")
+        self.assertEqual(dict(zip(map(tuple, Edges.edgeverts.tolist()), Edges.counts.tolist())), edges, msg = "Edge use counts not built as expected from reference mesh.")
+
+    def test_edge_table_bad_polygons(self):
+        with self.assertRaises(ValueError):
+            adjacency.EdgeTable(array([[0, 1, 2, 3]]))
+        with self.assertRaises(ValueError):
+            adjacency.EdgeTable(array([0, 1, 2]))
+
+    def test_edge_table_no_polygons(self):
+        Edges = adjacency.EdgeTable(array([]))
+        pairs, shared = Edges.face_pairs()
+        self.assertEqual((len(Edges), Edges.offsets.tolist(), pairs.shape, shared.shape), (0, [0], (0, 2), (0,)), msg = "Edge table not built as expected from empty mesh.")
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
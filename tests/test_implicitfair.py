@@ -5,11 +5,14 @@ Created on Jan 10, 2016
 '''
 import unittest
 import implicitfair
+import plython
 
 import cPickle as pickle
 
 from collections import defaultdict
+from math import tan
 from numpy import array, allclose
+from scipy.sparse import csr_matrix
 
 class Test(unittest.TestCase):
 
@@ -39,6 +42,46 @@ class Test(unittest.TestCase):
         
         self.assertTrue(allclose(test_smoothed_vertices, solution_smoothed_vertices), msg = "Reference pyramid mesh not smoothed as expected.")
 
+    def test_laplaciantension(self):
+        varray = array([[0.0, 0.0, 0.0],
+                        [2.0, 0.0, 0.0],
+                        [0.0, 2.0, 0.0],
+                        [2.0, 2.0, 0.0],
+                        [1.0, 1.0, 2.0]])
+        farray = array([[0, 1, 2],
+                        [1, 3, 2],
+                        [0, 1, 4],
+                        [1, 3, 4],
+                        [2, 0, 4],
+                        [3, 2, 4]])
+        
+        L = implicitfair.laplaciantension(varray, farray, None).toarray()
+        
+        # edge 0-1 is opposite vertex 2 in polygon 0 and vertex 4 in polygon 2
+        cot_2 = 1/tan(implicitfair.My_Angle(varray[2]-varray[0], varray[2]-varray[1]))
+        cot_4 = 1/tan(implicitfair.My_Angle(varray[4]-varray[0], varray[4]-varray[1]))
+        
+        self.assertTrue(allclose(L[0,1], cot_2 + cot_4), msg = "Cotangent weight of edge not calculated as expected.")
+        self.assertTrue(allclose(L, L.T), msg = "Cotangent Laplacian not symmetric.")
+        self.assertTrue(allclose(L.sum(axis=1), 0), msg = "Cotangent Laplacian rows do not sum to zero.")
+
+    def test_smooth_memmapped_mesh(self):
+        Mesh = plython.PlythonMesh('./tests/Thege58bin.ply')
+        MapMesh = plython.PlythonMesh('./tests/Thege58bin.ply', memmap=True)
+        smoothed = implicitfair.smooth(Mesh.vertices, Mesh.faces, 3, 0.1, None)
+        mapsmoothed = implicitfair.smooth(MapMesh.vertices, MapMesh.faces, 3, 0.1, None)
+        self.assertFalse(isinstance(mapsmoothed, str), msg = "Memory-mapped float32 mesh unexpectedly not smoothed.")
+        self.assertTrue(allclose(mapsmoothed, smoothed), msg = "Memory-mapped mesh not smoothed as loaded mesh.")
+
+    def test_factorize(self):
+        factor = implicitfair.factorize(csr_matrix(array([[4.0, 1.0, 0.0], [1.0, 3.0, 1.0], [0.0, 1.0, 2.0]])))
+        
+        self.assertTrue(allclose(factor.solve(array([[5.0], [5.0], [3.0]])), array([[1.0], [1.0], [1.0]])), msg = "Sparse factorization does not solve system as expected.")
+
+    def test_factorize_not_positive_definite(self):
+        self.assertTrue(implicitfair.factorize(csr_matrix(array([[1.0, 2.0], [2.0, 1.0]]))) is None, msg = "Factorization of indefinite matrix unexpectedly returned.")
+        self.assertTrue(implicitfair.factorize(csr_matrix(array([[1.0, 1.0], [1.0, 1.0]]))) is None, msg = "Factorization of singular matrix unexpectedly returned.")
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.test_mesh_smooth']
     unittest.main()
\ No newline at end of file
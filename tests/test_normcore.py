@@ -4,9 +4,12 @@ Created on Jan 9, 2016
 @author: Julia M. Winchester
 '''
 import unittest
+import sys
 import normcore
 
-from numpy import array, allclose
+from StringIO import StringIO
+
+from numpy import array, allclose, nan
 
 class Test(unittest.TestCase):
 
@@ -49,6 +52,19 @@ class Test(unittest.TestCase):
         
         self.assertTrue((normcore.normalmap(varray, farray) == solution_norms).all(), msg = "Normal map not generated as expected for reference pyramid mesh.")
     
+    def test_facearea(self):
+        varray = array([[0.0, 0.0, 0.0], [2.0, 0.0, 0.0], [0.0, 2.0, 0.0], [2.0, 2.0, 0.0], [1.0, 1.0, 2.0]])
+        farray = array([[0, 1, 2], [1, 3, 2], [0, 1, 4], [0, 0, 4]])
+        self.assertTrue(allclose(normcore.facearea(varray, farray), array([2.0, 2.0, 5**0.5, 0.0])), msg = "Polygon areas not calculated as expected for reference pyramid mesh.")
+        self.assertEqual(normcore.facearea(varray, array([])).shape, (0,), msg = "Polygon areas unexpectedly returned for empty mesh.")
+    
+    def test_nanrows(self):
+        vects = array([[0.0, 0.0, 1.0], [nan, 0.0, 1.0], [0.0, 1.0, 0.0], [0.0, 0.0, nan]])
+        nnan, nanindex = normcore.nanrows(vects)
+        
+        self.assertEqual((nnan, nanindex.tolist()), (2, [1, 3]), msg = "Vectors with nan components not found as expected.")
+        self.assertEqual(normcore.nanrows(vects[[0, 2]])[0], 0, msg = "Vectors with nan components unexpectedly found.")
+    
     def test_computenormal(self):
         varray = array([[0.0, 0.0, 0.0],
                         [2.0, 0.0, 0.0],
@@ -83,6 +99,21 @@ class Test(unittest.TestCase):
         self.assertTrue(allclose(test_normals[0], solution_normals[0]), msg = "Approximated vertex normals not calculated as expected from reference pyramid mesh.")
         self.assertTrue(allclose(test_normals[1], solution_normals[1]), msg = "Polygon face normals not calculated as expected from reference pyramid mesh.")
     
+    def test_computenormal_nan(self):
+        varray = array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [1.0, 1.0, 0.0], [nan, 2.0, 0.0]])
+        farray = array([[0, 1, 2], [1, 3, 2], [2, 3, 4]])
+        
+        stdout, sys.stdout = sys.stdout, StringIO()
+        try:
+            vnormal, fnormal = normcore.computenormal(varray, farray, None, None)
+            output = sys.stdout.getvalue()
+        finally:
+            sys.stdout = stdout
+        
+        self.assertEqual(output, '', msg = "Output unexpectedly printed for nan normals.")
+        self.assertEqual(normcore.nanrows(fnormal)[1].tolist(), [2], msg = "Polygons with nan normals not found as expected.")
+        self.assertEqual(normcore.nanrows(vnormal)[1].tolist(), [2, 3, 4], msg = "Vertices with nan normals not found as expected.")
+    
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
\ No newline at end of file
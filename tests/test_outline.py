@@ -0,0 +1,66 @@
+import unittest
+import outline
+import adjacency
+import cPickle as pickle
+
+from numpy import array, arange, allclose, where
+from numpy.random import RandomState
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open('./tests/testmeshThege58.pkl', 'rb') as input:
+            cls._Mesh = pickle.load(input)
+
+    def test_square(self):
+        vertices = array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 1.0], [0.0, 1.0, 0.0]])
+        faces = array([[0, 1, 2], [0, 2, 3]])
+        self.assertAlmostEqual(outline.projected_area(vertices, faces), 1.0, 12, msg = "Projected area of square not calculated as expected.")
+
+        start, end, cover = outline.contour_edges(vertices[:,:2], faces)
+        self.assertEqual(sorted(cover.tolist()), [-1.0, 1.0], msg = "Interior or vertical edges of square unexpectedly found on contour.")
+
+    def test_overlapping_polygons(self):
+        vertices = array([[0.0, 0.0, 0.0], [2.0, 0.0, 0.0], [0.0, 2.0, 0.0], [1.0, 0.0, 1.0], [3.0, 0.0, 1.0], [1.0, 2.0, 1.0]])
+        faces = array([[0, 1, 2], [3, 4, 5]])
+        self.assertAlmostEqual(outline.projected_area(vertices, faces), 3.5, 12, msg = "Overlap of projected polygons unexpectedly counted twice.")
+        self.assertEqual(outline.crossings(array([[0.0, 0.0], [0.0, 1.0]]), array([[2.0, 2.0], [2.0, -1.0]])).tolist(), [0.5], msg = "Segment crossing not found as expected.")
+
+    def test_crossings(self):
+        start = RandomState(1).uniform(0.0, 10.0, (200, 2))
+        # a few long segments crossing many grid cells
+        end = start + RandomState(2).uniform(-1.0, 1.0, (200, 2)) * where(arange(200) < 10, 9.0, 1.0)[:,None]
+        flip = start[:,0] > end[:,0]
+        start[flip], end[flip] = end[flip], start[flip].copy()
+        
+        expected = list()
+        for i in range(200):
+            for j in range(i+1, 200):
+                p, r, q, s = start[i], end[i] - start[i], start[j], end[j] - start[j]
+                rxs = r[0]*s[1] - r[1]*s[0]
+                t = ((q[0] - p[0])*s[1] - (q[1] - p[1])*s[0]) / rxs
+                u = ((q[0] - p[0])*r[1] - (q[1] - p[1])*r[0]) / rxs
+                if 0 < t < 1 and 0 < u < 1:
+                    expected.append(p[0] + t*r[0])
+        self.assertGreater(len(expected), 50, msg = "Test segments unexpectedly cross too rarely.")
+        self.assertTrue(allclose(sorted(outline.crossings(start, end)), sorted(expected), rtol=1e-12), msg = "Segment crossings not found as expected from all segment pairs.")
+        self.assertEqual(len(outline.crossings(start[:1], end[:1])), 0, msg = "Crossings unexpectedly found for a single segment.")
+
+    def test_folded_surface(self):
+        vertices = array([[0.0, 0.0, 0.0], [0.0, 1.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0], [0.5, 0.0, 1.0], [0.5, 1.0, 1.0], [1.5, 0.0, 2.0], [1.5, 1.0, 2.0]])
+        faces = array([[0, 2, 1], [1, 2, 3], [2, 4, 3], [3, 4, 5], [4, 6, 5], [5, 6, 7]])
+        self.assertAlmostEqual(outline.projected_area(vertices, faces), 1.5, 12, msg = "Projected area of folded surface not calculated as expected.")
+
+    def test_no_polygons(self):
+        self.assertEqual(outline.projected_area(array([[0.0, 0.0, 0.0]]), array([])), 0.0, msg = "Projected area of empty mesh unexpectedly non-zero.")
+
+    def test_mesh_area(self):
+        Mesh = self.__class__._Mesh
+        area = outline.projected_area(Mesh.vertices, Mesh.faces)
+        self.assertEqual(area, outline.projected_area(Mesh.vertices, Mesh.faces, adjacency.mesh_edge_table(Mesh)), msg = "Projected area unexpectedly changed by supplied edge table.")
+        self.assertAlmostEqual(area, 96.338, 3, msg = "Projected area not calculated as expected from test mesh.")
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
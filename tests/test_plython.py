@@ -6,8 +6,10 @@ Created on Dec 12, 2015
 import unittest
 import plython
 import cPickle as pickle
-from numpy import allclose
+from numpy import allclose, array, concatenate, dtype, frombuffer, memmap, sort, unique, zeros
 from copy import copy
+from contextlib import closing
+import gzip
 import os
 
 class Test_PlythonMesh(unittest.TestCase):
@@ -46,7 +48,215 @@ class Test_PlythonMesh(unittest.TestCase):
         self.assertTrue(allclose(self.__class__._Mesh.vertices, BinMesh.vertices), msg = 'Unexpected differences between mesh vertex data produced from ASCII and binary .PLY files.')
         self.assertTrue(allclose(self.__class__._Mesh.triverts, BinMesh.triverts), msg = 'Unexpected differences between mesh polygon and vertex data produced from ASCII and binary .PLY files.')
         self.assertTrue((self.__class__._Mesh.faces == BinMesh.faces).all(), msg = 'Unexpected differences between mesh polygon data produced from ASCII and binary .PLY files.')
-        
+
+    def test_binary_big_endian_ply(self):
+        BinMesh = plython.PlythonMesh('./tests/Thege58bin.ply')
+        with open('./tests/Thege58bin.ply', 'rb') as meshfile:
+            header, payload = meshfile.read().split('end_header\n', 1)
+        vertbytes = BinMesh.nvert*12
+        vertdata = frombuffer(payload, '<f4', BinMesh.nvert*3).astype('>f4')
+        facedata = frombuffer(payload, dtype([('count', 'u1'), ('indices', '<i4', (3,))]), BinMesh.nface, vertbytes).astype([('count', 'u1'), ('indices', '>i4', (3,))])
+        with open('./tests/temp.ply', 'wb') as meshfile:
+            meshfile.write(header.replace('binary_little_endian', 'binary_big_endian') + 'end_header\n' + vertdata.tostring() + facedata.tostring())
+        BigMesh = plython.PlythonMesh('./tests/temp.ply')
+        os.remove('./tests/temp.ply')
+        self.assertTrue((BigMesh.vertices == BinMesh.vertices).all(), msg = 'Unexpected differences between mesh vertex data produced from little and big endian .PLY files.')
+        self.assertTrue((BigMesh.faces == BinMesh.faces).all(), msg = 'Unexpected differences between mesh polygon data produced from little and big endian .PLY files.')
+        self.assertTrue((BigMesh.triverts == BinMesh.triverts).all(), msg = 'Unexpected differences between mesh polygon and vertex data produced from little and big endian .PLY files.')
+
+    def test_memmap_binary_ply(self):
+        BinMesh = plython.PlythonMesh('./tests/Thege58bin.ply')
+        MapMesh = plython.PlythonMesh('./tests/Thege58bin.ply', memmap=True)
+        self.assertTrue(all(isinstance(x, memmap) for x in (MapMesh.vertices, MapMesh.faces)), msg = 'Memory-mapped PlythonMesh vertex and polygon data are not numpy.memmap views.')
+        self.assertEqual((MapMesh.nvert, MapMesh.nface), (BinMesh.nvert, BinMesh.nface), msg = 'Unexpected vertex or polygon number from memory-mapped PlythonMesh.')
+        self.assertTrue((MapMesh.vertices == BinMesh.vertices).all(), msg = 'Unexpected differences between memory-mapped and loaded mesh vertex data.')
+        self.assertTrue((MapMesh.faces == BinMesh.faces).all(), msg = 'Unexpected differences between memory-mapped and loaded mesh polygon data.')
+
+    def test_memmap_face_range(self):
+        vertdata = array([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0)], [('x', '<f4'), ('y', '<f4'), ('z', '<f4')])
+        facedata = array([(3, (0, 1, 3))], [('n', 'u1'), ('v', '<i4', (3,))])
+        with open('./tests/temp.ply', 'wb') as meshfile:
+            meshfile.write('ply\nformat binary_little_endian 1.0\nelement vertex 3\nproperty float x\nproperty float y\nproperty float z\n'
+                           'element face 1\nproperty list uchar int vertex_indices\nend_header\n' + vertdata.tostring() + facedata.tostring())
+        try:
+            self.assertRaises(ValueError, plython.PlythonMesh, './tests/temp.ply', True)
+        finally:
+            os.remove('./tests/temp.ply')
+
+    def test_memmap_ascii_ply(self):
+        Mesh = plython.PlythonMesh('./tests/Thege58.ply', memmap=True)
+        self.assertTrue((Mesh.vertices == self.__class__._Mesh.vertices).all(), msg = 'Unexpected vertices from ASCII .PLY file opened with memmap.')
+        self.assertTrue((Mesh.triverts == self.__class__._Mesh.triverts).all(), msg = 'Unexpected vertex-polygon map from ASCII .PLY file opened with memmap.')
+
+    def _write_scanner_ply(self, Mesh, datamode):
+        """Writes mesh to temp.ply with extra camera element, double coordinates, normals, colors, quality, and uint32 indices."""
+        header = ("ply\nformat %s 1.0\ncomment scanner output\nelement camera 1\nproperty float view_px\nproperty float view_py\n"
+                  "element vertex %s\nproperty double x\nproperty double y\nproperty double z\nproperty float nx\nproperty float ny\nproperty float nz\n"
+                  "property uchar red\nproperty uchar green\nproperty uchar blue\nproperty float quality\n"
+                  "element face %s\nproperty list uchar uint vertex_indices\nproperty int flags\nend_header\n" % (datamode, Mesh.nvert, Mesh.nface))
+        vertdata = zeros(Mesh.nvert, [('x', '<f8'), ('y', '<f8'), ('z', '<f8'), ('nx', '<f4'), ('ny', '<f4'), ('nz', '<f4'),
+                                      ('red', 'u1'), ('green', 'u1'), ('blue', 'u1'), ('quality', '<f4')])
+        vertdata['x'], vertdata['y'], vertdata['z'] = Mesh.vertices.T
+        vertdata['nx'], vertdata['red'], vertdata['quality'] = 0.5, 200, 7.25
+        facedata = zeros(Mesh.nface, [('count', 'u1'), ('indices', '<u4', (3,)), ('flags', '<i4')])
+        facedata['count'], facedata['indices'], facedata['flags'] = 3, Mesh.faces, -1
+        with open('./tests/temp.ply', 'wb') as meshfile:
+            meshfile.write(header)
+            if datamode == 'ascii':
+                meshfile.write('0.0 1.0\n')
+                meshfile.write(''.join('%r %r %r %r %r %r %d %d %d %r\n' % tuple(vert) for vert in vertdata.tolist()))
+                meshfile.write(''.join('%d %d %d %d %d\n' % (face[0], face[1][0], face[1][1], face[1][2], face[2]) for face in facedata.tolist()))
+            else:
+                meshfile.write(array([(0.0, 1.0)], [('view_px', '<f4'), ('view_py', '<f4')]).tostring() + vertdata.tostring() + facedata.tostring())
+
+    def test_scanner_property_layouts(self):
+        BinMesh = plython.PlythonMesh('./tests/Thege58bin.ply')
+        for datamode in ('ascii', 'binary_little_endian'):
+            self._write_scanner_ply(BinMesh, datamode)
+            for memmapped in (False, True):
+                Mesh = plython.PlythonMesh('./tests/temp.ply', memmap=memmapped)
+                self.assertEqual((Mesh.nvert, Mesh.nface), (BinMesh.nvert, BinMesh.nface), msg = 'Unexpected vertex or polygon number from %s .PLY file with extra properties.' % datamode)
+                self.assertTrue((Mesh.vertices == BinMesh.vertices).all(), msg = 'Unexpected vertices from %s .PLY file with extra properties.' % datamode)
+                self.assertTrue((Mesh.faces == BinMesh.faces).all(), msg = 'Unexpected polygons from %s .PLY file with extra properties.' % datamode)
+            del Mesh
+        os.remove('./tests/temp.ply')
+
+    def test_read_chunks(self):
+        BinMesh = plython.PlythonMesh('./tests/Thege58bin.ply')
+        for filepath in ('./tests/Thege58.ply', './tests/Thege58bin.ply', './tests/temp.ply'):
+            if filepath == './tests/temp.ply':
+                self._write_scanner_ply(BinMesh, 'ascii')
+            LoadedMesh = plython.PlythonMesh(filepath)
+            Mesh = plython.PlythonMesh()
+            with open(filepath, 'rb') as meshfile:
+                blocks = list(Mesh.ReadChunks(meshfile, 1000))
+            self.assertEqual((Mesh.nvert, Mesh.nface), (5135, 10040), 'Unexpected vertex or polygon number from PlythonMesh ReadChunks.')
+            self.assertEqual([(name, start, len(block)) for name, start, block in blocks][5:8], [('vertex', 5000, 135), ('face', 0, 1000), ('face', 1000, 1000)], 'Unexpected blocks from PlythonMesh ReadChunks.')
+            self.assertTrue((concatenate([block for name, start, block in blocks if name == 'vertex']) == LoadedMesh.vertices).all(), msg = 'Unexpected vertex blocks from PlythonMesh ReadChunks.')
+            self.assertTrue((concatenate([block for name, start, block in blocks if name == 'face']) == LoadedMesh.faces).all(), msg = 'Unexpected polygon blocks from PlythonMesh ReadChunks.')
+        os.remove('./tests/temp.ply')
+    
+    def test_gzip_ply(self):
+        for filepath in ('./tests/Thege58.ply', './tests/Thege58bin.ply'):
+            with open(filepath, 'rb') as meshfile:
+                meshstring = meshfile.read()
+            Mesh = plython.PlythonMesh(filepath)
+            with closing(gzip.open('./tests/temp.ply.gz', 'wb')) as meshfile:
+                meshfile.write(meshstring)
+            GzMesh = plython.PlythonMesh('./tests/temp.ply.gz', memmap=True)
+            self.assertEqual(plython.probe('./tests/temp.ply.gz'), plython.probe(filepath), 'Unexpected header probe of .PLY.GZ file.')
+            self.assertTrue((GzMesh.vertices == Mesh.vertices).all(), msg = 'Unexpected vertices from .PLY.GZ file.')
+            self.assertTrue((GzMesh.faces == Mesh.faces).all(), msg = 'Unexpected polygons from .PLY.GZ file.')
+            os.rename('./tests/temp.ply.gz', './tests/TEMP.PLY.GZ')
+            UpperMesh = plython.PlythonMesh('./tests/TEMP.PLY.GZ')
+            os.rename('./tests/TEMP.PLY.GZ', './tests/temp.ply.gz')
+            self.assertTrue((UpperMesh.faces == Mesh.faces).all(), msg = 'Unexpected polygons from upper case .PLY.GZ file name.')
+            with closing(gzip.open('./tests/temp.ply.gz', 'wb')) as meshfile:
+                meshfile.write(meshstring[:-100])
+            self.assertRaises(EOFError, plython.PlythonMesh, './tests/temp.ply.gz')
+        os.remove('./tests/temp.ply.gz')
+    
+    def test_off_file(self):
+        with open('./tests/Thege58.ply', 'rb') as meshfile:
+            meshlines = meshfile.read().splitlines(True)[9:]
+        Mesh = self.__class__._AsciiMesh
+        offheaders = (('OFF\n%s %s 0\n' % (Mesh.nvert, Mesh.nface), '', ''), ('# scanner output\nCOFF\n\n%s %s 0 # counts\n' % (Mesh.nvert, Mesh.nface), ' 255 0 0 255', ' 0.5 0.5 0.5'))
+        for header, vertexcolor, facecolor in offheaders:
+            with open('./tests/temp.off', 'wb') as meshfile:
+                meshfile.write(header + ''.join(line.rstrip() + vertexcolor + '\n' for line in meshlines[:Mesh.nvert]))
+                meshfile.write(''.join(line.rstrip() + facecolor + '\n' for line in meshlines[Mesh.nvert:]))
+            OffMesh = plython.PlythonMesh('./tests/temp.off')
+            self.assertEqual((OffMesh.nvert, OffMesh.nface), (Mesh.nvert, Mesh.nface), 'Unexpected vertex or polygon number from .OFF file.')
+            self.assertTrue((OffMesh.vertices == Mesh.vertices).all(), msg = 'Unexpected vertices from .OFF file.')
+            self.assertTrue((OffMesh.faces == Mesh.faces).all(), msg = 'Unexpected polygons from .OFF file.')
+        with open('./tests/temp.off', 'wb') as meshfile:
+            meshfile.write(offheaders[0][0] + ''.join(meshlines[:Mesh.nvert]) + '4 0 1 2 3\n' + ''.join(meshlines[Mesh.nvert+1:]))
+        self.assertRaises(ValueError, plython.PlythonMesh, './tests/temp.off')
+        os.remove('./tests/temp.off')
+    
+    def test_stl_file(self):
+        BinMesh = plython.PlythonMesh('./tests/Thege58bin.ply')
+        stldata = zeros(BinMesh.nface, [('normal', '<f4', (3,)), ('triverts', '<f4', (3, 3)), ('attributes', '<u2')])
+        stldata['triverts'] = BinMesh.triverts
+        with open('./tests/temp.stl', 'wb') as meshfile:
+            meshfile.write('binary stl'.ljust(80) + array([BinMesh.nface], '<u4').tostring() + stldata.tostring())
+        StlMesh = plython.PlythonMesh('./tests/temp.stl')
+        os.remove('./tests/temp.stl')
+        usedverts = unique(BinMesh.faces.ravel(), return_index=True)[1]
+        self.assertEqual((StlMesh.nvert, StlMesh.nface), (len(usedverts), BinMesh.nface), 'Unexpected vertex or polygon number from .STL file.')
+        self.assertTrue((StlMesh.triverts == BinMesh.triverts).all(), msg = 'Unexpected vertex-polygon map from .STL file.')
+        self.assertTrue((StlMesh.vertices == BinMesh.vertices[BinMesh.faces.ravel()[sort(usedverts)]]).all(), msg = 'Vertices from .STL file not in order of first use by polygons.')
+    
+    def test_mesh_extension(self):
+        self.assertEqual([plython.mesh_extension(filename) for filename in ('a.ply', 'A.PLY', 'a.ply.gz', 'a.off', 'a.stl', 'a.obj', 'ply')], ['.ply', '.ply', '.ply.gz', '.off', '.stl', '', ''], 'Unexpected mesh file extensions.')
+    
+    def test_unsupported_list_property_error(self):
+        with open('./tests/Thege58.ply', 'rb') as meshfile:
+            meshstring = meshfile.read()
+        with open('./tests/temp.ply', 'wb') as meshfile:
+            meshfile.write(meshstring.replace('element vertex', 'element tristrips 1\nproperty list int int vertex_indices\nelement vertex', 1))
+        self.assertRaises(ValueError, plython.PlythonMesh, './tests/temp.ply')
+        os.remove('./tests/temp.ply')
+
+    def test_ascii_truncated_error(self):
+        with open('./tests/Thege58.ply', 'rb') as meshfile:
+            meshlines = meshfile.read().splitlines(True)
+        for ntruncated, message in ((9+100, 'vertices'), (9+5135+100, 'polygon vertex indices')):
+            with open('./tests/temp.ply', 'wb') as meshfile:
+                meshfile.write(''.join(meshlines[:ntruncated]))
+            with self.assertRaises(EOFError) as context:
+                plython.PlythonMesh('./tests/temp.ply')
+            self.assertTrue(message in context.exception.args[0], msg = 'Unexpected EOFError message for truncated ASCII .PLY file.')
+        os.remove('./tests/temp.ply')
+
+    def test_ascii_truncated_line_error(self):
+        with open('./tests/Thege58.ply', 'rb') as meshfile:
+            meshlines = meshfile.read().splitlines(True)
+        for ntruncated, message in ((9+100, 'vertices'), (9+5135+100, 'polygon vertex indices')):
+            meshstring = ''.join(meshlines[:ntruncated]) + meshlines[ntruncated][:-5]
+            with open('./tests/temp.ply', 'wb') as meshfile:
+                meshfile.write(meshstring)
+            with closing(gzip.open('./tests/temp.ply.gz', 'wb')) as meshfile:
+                meshfile.write(meshstring)
+            for filepath in ('./tests/temp.ply', './tests/temp.ply.gz'):
+                with self.assertRaises(EOFError) as context:
+                    plython.PlythonMesh(filepath)
+                self.assertTrue(message in context.exception.args[0], msg = 'Unexpected EOFError message for ASCII .PLY file truncated within a line.')
+        os.remove('./tests/temp.ply')
+        os.remove('./tests/temp.ply.gz')
+
+    def test_binary_truncated_error(self):
+        with open('./tests/Thege58bin.ply', 'rb') as meshfile:
+            meshstring = meshfile.read()
+        datastart = plython.probe('./tests/Thege58bin.ply')['offset']
+        for nbytes, message in ((100*12 + 5, 'vertices'), (5135*12 + 100*13 + 5, 'polygon vertex indices')):
+            with open('./tests/temp.ply', 'wb') as meshfile:
+                meshfile.write(meshstring[:datastart+nbytes])
+            for memmap in (False, True):
+                with self.assertRaises(EOFError) as context:
+                    plython.PlythonMesh('./tests/temp.ply', memmap)
+                self.assertTrue(message in context.exception.args[0], msg = 'Unexpected EOFError message for truncated binary .PLY file.')
+        os.remove('./tests/temp.ply')
+
+    def test_ascii_non_triangular_error(self):
+        with open('./tests/Thege58.ply', 'rb') as meshfile:
+            meshlines = meshfile.read().splitlines(True)
+        meshlines[9+5135] = '4 0 1 2 3\n'
+        with open('./tests/temp.ply', 'wb') as meshfile:
+            meshfile.write(''.join(meshlines))
+        self.assertRaises(ValueError, plython.PlythonMesh, './tests/temp.ply')
+        os.remove('./tests/temp.ply')
+
+    def test_probe(self):
+        for filepath, datamode in (('./tests/Thege58.ply', 'ascii'), ('./tests/Thege58bin.ply', 'binary_little_endian')):
+            layout = plython.probe(filepath)
+            self.assertEqual((layout['format'], layout['nvert'], layout['nface']), (datamode, 5135, 10040), 'Unexpected format or element numbers from .PLY header probe.')
+            self.assertEqual([(name, count) for name, count, properties in layout['elements']], [('vertex', 5135), ('face', 10040)], 'Unexpected elements from .PLY header probe.')
+            self.assertEqual([name for name, proptype in layout['elements'][0][2]], ['x', 'y', 'z'], 'Unexpected vertex properties from .PLY header probe.')
+            self.assertEqual(layout['elements'][1][2][0][0], 'vertex_indices', 'Unexpected face properties from .PLY header probe.')
+            with open(filepath, 'rb') as meshfile:
+                self.assertTrue(meshfile.read(layout['offset']).endswith('end_header\n'), msg = 'Unexpected mesh data offset from .PLY header probe.')
+    
     def test_save_array(self):
         self.__class__._Mesh.SaveArray('./tests/temp.ply')
         Mesh = plython.PlythonMesh('./tests/temp.ply')
@@ -57,15 +267,75 @@ class Test_PlythonMesh(unittest.TestCase):
         self.assertTrue((Mesh.triverts == self.__class__._Mesh.triverts).all(), msg = 'Unexpected vertex-polygon map from .PLY file written by SaveArray.')
         os.remove('./tests/temp.ply')
         
+    def test_save_array_binary(self):
+        for vertices in (self.__class__._Mesh.vertices, self.__class__._Mesh.vertices.astype('float32')):
+            Mesh = copy(self.__class__._Mesh)
+            Mesh.vertices = vertices
+            Mesh.SaveArray('./tests/temp.ply', binary=True)
+            SavedMesh = plython.PlythonMesh('./tests/temp.ply')
+            self.assertEqual((SavedMesh.nvert, SavedMesh.nface), (5135, 10040), "Unexpected vertex or face number from binary .PLY file written by SaveArray.")
+            self.assertTrue((SavedMesh.vertices == vertices).all(), msg = 'Unexpected vertices from binary .PLY file written by SaveArray.')
+            self.assertTrue((SavedMesh.faces == Mesh.faces).all(), msg = 'Unexpected polygons from binary .PLY file written by SaveArray.')
+        os.remove('./tests/temp.ply')
+    
+    def test_save_array_ascii_precision(self):
+        Mesh = copy(self.__class__._Mesh)
+        Mesh.vertices = Mesh.vertices.copy()
+        Mesh.vertices[:4] = [[0.1, -0.0, 1e-300], [1.0/3.0, 123456789.123456789, -2.5e17], [1e-05, 7.0, 0.30000000000000004], [2.0**-40, -1.5, 1e+22]]
+        Mesh.SaveArray('./tests/temp.ply')
+        SavedMesh = plython.PlythonMesh('./tests/temp.ply')
+        self.assertTrue((SavedMesh.vertices == Mesh.vertices).all(), msg = 'Vertex values changed by ASCII .PLY file round trip.')
+        self.assertTrue((SavedMesh.faces == Mesh.faces).all(), msg = 'Polygons changed by ASCII .PLY file round trip.')
+        os.remove('./tests/temp.ply')
+        
+    def test_save_array_ascii_format(self):
+        Mesh = plython.PlythonMesh()
+        Mesh.faces = array([[0, 1, 2]])
+        for vertices in (array([[0.1, 1.0/3.0, -2.5e17], [1e-05, 7.0, 0.30000000000000004], [0.0, 1.0, 0.0]]), array([[0.1, 1.0/3.0, 2.0], [1e-05, 7.0, 0.3], [0.0, 1.0, 0.0]], 'float32')):
+            Mesh.vertices = vertices
+            Mesh.nvert, Mesh.nface = 3, 1
+            Mesh.SaveArray('./tests/temp.ply')
+            with open('./tests/temp.ply', 'rb') as meshfile:
+                meshdata = meshfile.read().split('end_header\n')[1]
+            self.assertEqual(meshdata, ''.join(' '.join(str(value) for value in xyz) + '\n' for xyz in vertices) + '3 0 1 2\n', msg = 'ASCII .PLY vertex values not formatted as numpy scalar strings for %s vertices.' % vertices.dtype)
+        os.remove('./tests/temp.ply')
+    
     def test_save_fail_no_mesh(self):
         EmptyMesh = self.__class__._NullMesh
         self.assertRaises(ValueError, EmptyMesh.SaveArray, './tests/temp.ply')
     
     def test_save_fail_mesh_inconsistent(self):
         Mesh = copy(self.__class__._AsciiMesh)
-        Mesh.vertices[0] = 123.9187
+        Mesh.triverts = Mesh.triverts.copy()
+        Mesh.triverts[0] = 123.9187
         self.assertRaises(ValueError, Mesh.SaveArray, './tests/temp.ply')
     
+    def test_inconsistent_faces(self):
+        Mesh = copy(self.__class__._AsciiMesh)
+        triverts = Mesh.triverts.copy()
+        triverts[[5, 17, 9000], 1, 2] += 1.0
+        self.assertEqual(plython.inconsistent_faces(Mesh.vertices, Mesh.faces, triverts).tolist(), [5, 17, 9000], 'Unexpected inconsistent polygon indices.')
+        Mesh.triverts = triverts
+        with self.assertRaises(ValueError) as context:
+            Mesh.check_mesh_consistency()
+        self.assertTrue('[5, 17, 9000]' in context.exception.args[0], msg = 'Inconsistent polygon indices not reported by check_mesh_consistency.')
+        Mesh.check_mesh_consistency(trusted=True)
+        self.assertRaises(ValueError, plython.inconsistent_faces, Mesh.vertices, Mesh.faces, triverts[:-1])
+    
+    def test_triverts_cache(self):
+        Mesh = copy(self.__class__._AsciiMesh)
+        self.assertTrue(Mesh.triverts is Mesh.triverts, msg = 'PlythonMesh triverts rebuilt on each access instead of cached.')
+        Mesh.vertices = Mesh.vertices * 2.0
+        self.assertTrue((Mesh.triverts == Mesh.vertices[Mesh.faces]).all(), msg = 'PlythonMesh triverts not rebuilt after assigning vertices.')
+        Mesh.faces = Mesh.faces[::-1]
+        self.assertTrue((Mesh.triverts == Mesh.vertices[Mesh.faces]).all(), msg = 'PlythonMesh triverts not rebuilt after assigning faces.')
+        self.assertTrue((self.__class__._AsciiMesh.triverts == self.__class__._Mesh.triverts).all(), msg = 'Assigning vertices of copied PlythonMesh changed triverts of original.')
+    
+    def test_pickled_mesh(self):
+        Mesh = pickle.loads(pickle.dumps(self.__class__._AsciiMesh, 2))
+        self.assertTrue((Mesh.triverts == self.__class__._Mesh.triverts).all(), msg = 'Unexpected vertex-polygon map from pickled PlythonMesh.')
+        self.assertTrue(self.__class__._Mesh.mesh[0] is self.__class__._Mesh.vertices, msg = 'Unexpected mesh data from PlythonMesh pickled with materialized triverts.')
+    
     def test_vertices_method(self):
         Mesh = self.__class__._AsciiMesh
         self.assertTrue((Mesh.vertices == Mesh.Vertices()).all(), msg='PlythonMesh.Vertices method returning vertex data different from mesh data.')
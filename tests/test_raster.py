@@ -0,0 +1,50 @@
+import unittest
+import raster
+import outline
+import cPickle as pickle
+
+from numpy import array, concatenate
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open('./tests/testmeshThege58.pkl', 'rb') as input:
+            cls._Mesh = pickle.load(input)
+
+    def test_square(self):
+        vertices = array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 1.0], [0.0, 1.0, 0.0]])
+        faces = array([[0, 1, 2], [0, 2, 3]])
+        area, ncell, cellsize = raster.projected_area(vertices, faces, 10)
+        self.assertEqual((ncell, cellsize), (100, 0.1), msg = "Square not rasterized as expected.")
+        self.assertAlmostEqual(area, 1.0, 12, msg = "Rasterized area of square not calculated as expected.")
+
+    def test_triangle_cells(self):
+        vertices = array([[0.0, 0.0, 0.0], [4.0, 0.0, 0.0], [0.0, 4.0, 0.0]])
+        tiles = list(raster.tiles(vertices, array([[0, 1, 2]]), 4))
+        self.assertEqual(len(tiles), 1, msg = "Small grid unexpectedly split into tiles.")
+        self.assertEqual(tiles[0][1].astype(int).tolist(), [[1, 1, 1, 1], [1, 1, 1, 0], [1, 1, 0, 0], [1, 0, 0, 0]], msg = "Cells covered by triangle not filled as expected.")
+
+    def test_tiles(self):
+        Mesh = self.__class__._Mesh
+        whole = list(raster.tiles(Mesh.vertices, Mesh.faces, 300))
+        tiled = list(raster.tiles(Mesh.vertices, Mesh.faces, 300, 1000))
+        self.assertEqual(len(whole), 1, msg = "Grid within cell budget unexpectedly split into tiles.")
+        self.assertTrue(all(tile.size <= 1000 for start, tile in tiled), msg = "Tile unexpectedly exceeds cell budget.")
+        self.assertEqual([start for start, tile in tiled], range(0, len(whole[0][1]), len(tiled[0][1])), msg = "Tiles do not start at expected rows.")
+        self.assertTrue((concatenate([tile for start, tile in tiled]) == whole[0][1]).all(), msg = "Tiled grid differs from grid built at once.")
+
+    def test_mesh_area(self):
+        Mesh = self.__class__._Mesh
+        area = raster.projected_area(Mesh.vertices, Mesh.faces, 2000)[0]
+        self.assertAlmostEqual(area, outline.projected_area(Mesh.vertices, Mesh.faces), 2, msg = "Rasterized area of test mesh unexpectedly far from exact projected area.")
+
+    def test_zero_area_error(self):
+        with self.assertRaises(ValueError):
+            raster.projected_area(array([[1.0, 1.0, 0.0], [1.0, 1.0, 1.0], [1.0, 1.0, 2.0]]), array([[0, 1, 2]]))
+        with self.assertRaises(ValueError):
+            raster.projected_area(array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]), array([[0, 1, 2]]), 0)
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import render
+import cPickle as pickle
+
+from StringIO import StringIO
+from numpy import array, uint8
+
+import matplotlib.pyplot as plt
+
+try:
+    import Image
+except ImportError:
+    from PIL import Image
+
+class Test(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open('./tests/testmeshThege58plot.pkl', 'rb') as input:
+            cls._plot = pickle.load(input)
+
+    def _image(self):
+        return Image.open(StringIO(self.__class__._plot.getvalue()))
+
+    def test_pixel_values(self):
+        image = Image.fromarray(array([[[255, 0, 0, 255], [0, 0, 255, 255]], [[255, 255, 255, 255], [0, 0, 255, 255]]], uint8), 'RGBA')
+        pixels = render.pixelvalues(image)
+        self.assertEqual(pixels.tolist(), render.packcolors([(255, 0, 0, 255), (0, 0, 255, 255), (255, 255, 255, 255), (0, 0, 255, 255)]).tolist(), msg = "Pixel values not packed as expected.")
+        self.assertEqual(render.pixelvalues(image.getdata()).tolist(), pixels.tolist(), msg = "Pixel values from pixel data differ from pixel values from image.")
+        self.assertEqual(render.pixelvalues(image.convert('RGB')).tolist(), pixels.tolist(), msg = "Pixel values from RGB image not packed as RGBA.")
+
+    def test_color_counts(self):
+        image = self._image()
+        pixels = render.pixelvalues(image)
+        colors = [(255, 0, 0, 255), (255, 255, 255, 255), (0, 0, 255, 255), (1, 2, 3, 4), (255, 0, 0, 255)]
+        pixellist = list(image.getdata())
+
+        self.assertEqual(render.colorcounts(pixels, colors).tolist(), [pixellist.count(color) for color in colors], msg = "Pixel colors not counted as expected from test plot.")
+        self.assertEqual(render.colorcounts(pixels, []).tolist(), [], msg = "Pixels unexpectedly counted with no colors given.")
+        self.assertEqual(render.countpixels(image.getdata(), colors[:3]), sum(pixellist.count(color) for color in colors[:3]), msg = "Pixels not counted as expected from test plot pixel data.")
+
+    def test_render_context(self):
+        vertices = array([[0.0, 0.0, 0.0], [4.0, 0.0, 1.0], [0.0, 3.0, 2.0]])
+        Context = render.rendercontext()
+        nfigure = len(plt.get_fignums())
+        
+        images = [Context.plot(vertices, vertices[array([[0, 1, 2]])]) for i in range(3)]
+        self.assertIs(render.rendercontext(), Context, msg = "Render context not shared between plots.")
+        self.assertEqual(len(plt.get_fignums()), nfigure, msg = "Plots unexpectedly left open pyplot figures.")
+        self.assertEqual(Context.figure.axes, [], msg = "Plotted polygons unexpectedly kept after plot was saved.")
+        self.assertEqual(set((linelength, imgbuffer.getvalue()) for linelength, imgbuffer in images), set([(4.0, images[0][1].getvalue())]), msg = "Repeated plots of reused render context differ.")
+        self.assertGreater(render.countpixels(Image.open(images[0][1]), render.REFERENCE_COLORS), 0, msg = "Reference line missing from plot.")
+
+    def test_area_from_render(self):
+        self.assertAlmostEqual(render.areafromrender(15.0, StringIO(self.__class__._plot.getvalue())), 101564 * (15.0**2 / 480**2), 10, msg = "Projected area not calculated as expected from test plot.")
+
+if __name__ == "__main__":
+    #import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -5,8 +5,10 @@ Created on Jan 10, 2016
 '''
 import unittest
 import topomesh
+import normcore
 
 from copy import deepcopy
+from numpy import allclose
 
 class Test(unittest.TestCase):
     @classmethod
@@ -28,7 +30,7 @@ class Test(unittest.TestCase):
         self.assertRaises(ValueError, self.__class__._EmptyMesh.check_for_mesh)
     
     def test_no_mesh_generate_DNE(self):
-        self.assertRaises(ValueError, self.__class__._EmptyMesh.GenerateDNE, 0, 3, 0.1, 1, 1, 99.9, 1)
+        self.assertRaises(ValueError, self.__class__._EmptyMesh.GenerateDNE, 0, 3, 0.1, 1, 1, 99.9, 1, '')
     
     def test_no_mesh_generate_RFI(self):
         self.assertRaises(ValueError, self.__class__._EmptyMesh.GenerateRFI)
@@ -50,26 +52,65 @@ class Test(unittest.TestCase):
     def test_check_for_mesh_no_error(self):
         self.assertTrue(self.__class__._TopoMesh.check_for_mesh() is None)
 
+    def test_vert_tri_dict_cache(self):
+        TopoMesh = deepcopy(self.__class__._TopoMesh)
+        VertTri = TopoMesh.vert_tri_dict
+        
+        self.assertTrue(TopoMesh.get_vert_tri_dict() is VertTri, msg = "Vertex to polygon adjacency rebuilt instead of cached.")
+        TopoMesh.vertices = TopoMesh.vertices * 2.0
+        self.assertTrue(TopoMesh.vert_tri_dict is VertTri, msg = "Vertex to polygon adjacency discarded when vertices assigned.")
+        TopoMesh.faces = TopoMesh.faces[:10]
+        self.assertEqual(len(TopoMesh.vert_tri_dict.indices), 30, msg = "Vertex to polygon adjacency not rebuilt when faces assigned.")
+        self.assertTrue(self.__class__._EmptyMesh.vert_tri_dict is None, msg = "Vertex to polygon adjacency not None for empty mesh.")
+    
+    def test_facearea_cache(self):
+        TopoMesh = deepcopy(self.__class__._TopoMesh)
+        FaceArea = TopoMesh.facearea
+        
+        self.assertTrue(allclose(FaceArea, normcore.facearea(TopoMesh.vertices, TopoMesh.faces)), msg = "Cached polygon areas not calculated as expected.")
+        TopoMesh.GenerateDNE(0, 3, 0.1, 1, 1, 99.9, 1, '')
+        TopoMesh.GenerateRFI(projmode='raster')
+        self.assertTrue(TopoMesh.facearea is FaceArea, msg = "Polygon areas rebuilt instead of cached for DNE and RFI.")
+        self.assertTrue(allclose(FaceArea, normcore.facearea(TopoMesh.vertices, TopoMesh.faces)), msg = "Cached polygon areas modified by DNE calculation.")
+        TopoMesh.vertices = TopoMesh.vertices * 2.0
+        self.assertTrue(allclose(TopoMesh.facearea, FaceArea * 4.0), msg = "Polygon areas not rebuilt when vertices assigned.")
+        TopoMesh.faces = TopoMesh.faces[:10]
+        self.assertEqual(len(TopoMesh.facearea), 10, msg = "Polygon areas not rebuilt when faces assigned.")
+        self.assertTrue(self.__class__._EmptyMesh.facearea is None, msg = "Polygon areas not None for empty mesh.")
+    
+    def test_triverts_not_built(self):
+        TopoMesh = deepcopy(self.__class__._TopoMesh)
+        
+        TopoMesh.GenerateDNE(0, 3, 0.1, 1, 1, 99.9, 1, '')
+        TopoMesh.GenerateOPCR(5)
+        self.assertTrue(TopoMesh._triverts is None, msg = "Face-vertex arrays unexpectedly built for DNE and OPCR.")
+    
     def test_mesh_generate_DNE(self):
         TopoMesh = deepcopy(self.__class__._TopoMesh)
         
-        TopoMesh.GenerateDNE(0, 3, 0.1, 1, 1, 99.9, 1)
+        TopoMesh.GenerateDNE(0, 3, 0.1, 1, 1, 99.9, 1, '')
         
         self.assertEqual(TopoMesh.DNE, 247.938)
-        self.assertListEqual(TopoMesh.conditionfaces, [[0, 57378265.013361663], [4, 890184874.13861871], 
-                                                       [73, 1343571530.4271412], [5930, 11908732518877564.0], 
-                                                       [8778, 4936522.7463389486]])
-        self.assertListEqual(TopoMesh.outlierfaces, [[2475, 0.51255744024860683, 0.014741217694888389], 
-                                                     [2519, 0.38355601590466476, 0.017083805975653673], 
-                                                     [2549, 0.4939614798581129, 0.020016113375423021], 
-                                                     [2606, 0.7033905146290047, 0.014266472900058344], 
-                                                     [2645, 0.48016566118746151, 0.013878160242070335], 
-                                                     [2785, 0.47610433202634916, 0.010602689149740415], 
-                                                     [5126, 0.5120896168145993, 0.01564295561914459], 
-                                                     [5127, 0.56703207743985229, 0.019506596248359646], 
-                                                     [5146, 0.7127229465900683, 0.02282972677513475], 
-                                                     [8146, 0.406920260553499, 0.015469911584343965], 
-                                                     [8207, 0.39196464438448075, 0.021731371329794746]])
+        self.assertListEqual(TopoMesh.conditionfaces['index'].tolist(), [0, 4, 73, 5930, 8778])
+        self.assertTrue(allclose(TopoMesh.conditionfaces['cond'][[0, 1, 2, 4]], [57378265.013361663, 890184874.13861871, 
+                                                                                 1343571530.4271412, 4936522.7463389486], rtol=1e-6))
+        # polygon 5930 has collinear vertices, so its condition number is only bounded by rounding: 
+        # numpy.linalg.cond() of its G matrix gives 11908732518877564.0, and det(G) from edge cross products 1.3e29
+        self.assertGreater(TopoMesh.conditionfaces['cond'][3], 11908732518877564.0)
+        outlierfaces = [(2475, 0.51255744024860683, 0.014741217694888389), 
+                        (2519, 0.38355601590466476, 0.017083805975653673), 
+                        (2549, 0.4939614798581129, 0.020016113375423021), 
+                        (2606, 0.7033905146290047, 0.014266472900058344), 
+                        (2645, 0.48016566118746151, 0.013878160242070335), 
+                        (2785, 0.47610433202634916, 0.010602689149740415), 
+                        (5126, 0.5120896168145993, 0.01564295561914459), 
+                        (5127, 0.56703207743985229, 0.019506596248359646), 
+                        (5146, 0.7127229465900683, 0.02282972677513475), 
+                        (8146, 0.406920260553499, 0.015469911584343965), 
+                        (8207, 0.39196464438448075, 0.021731371329794746)]
+        self.assertListEqual(TopoMesh.outlierfaces['index'].tolist(), [face[0] for face in outlierfaces])
+        self.assertTrue(allclose(TopoMesh.outlierfaces['energy'], [face[1] for face in outlierfaces], rtol=1e-12))
+        self.assertTrue(allclose(TopoMesh.outlierfaces['area'], [face[2] for face in outlierfaces], rtol=1e-12))
     
     def test_mesh_generate_RFI(self):
         TopoMesh = deepcopy(self.__class__._TopoMesh)
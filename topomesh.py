@@ -4,13 +4,14 @@ Created on Jan 10, 2016
 @author: Julia M. Winchester
 '''
 import plython
+import adjacency
+import normcore
 import DNE
 import OPC
 import RFI
+import raster
 import implicitfair
 
-from collections import defaultdict
-
 class TopoMesh(plython.PlythonMesh):
     """A class for creating and interacting with triangulated polygon meshes and topographic variables.
     
@@ -20,7 +21,9 @@ class TopoMesh(plython.PlythonMesh):
     ProcessSurface method. 
     
     Args:
-        filepath (str): Path to a .ply polygon mesh file
+        filepath (str): Path to a .ply, .ply.gz, .off or binary .stl polygon mesh file
+        memmap (bool): If true, memory-map binary .ply vertex and face data 
+            (see plython.PlythonMesh.CreateArray).
         
     Attributes:
         mesh (list): Triangulated polygon mesh data. Contains three ndarrays:
@@ -31,26 +34,40 @@ class TopoMesh(plython.PlythonMesh):
         vertices (ndarray): Vertex XYZ points for mesh.
         faces (ndarray): Polygons with component vertex indices for mesh.
         triverts (ndarray): Polygons with component vertex XYZ points for mesh.
+        vert_tri_dict (VertTriCSR): Associates vertex index keys with related 
+            face index values, see adjacency.VertTriCSR. 
+        edge_table (EdgeTable): Unique mesh edges and the polygons using them, 
+            see adjacency.EdgeTable.
         DNE (float): Total Dirichlet normal energy of mesh. 
         DNEscalars (ndarray): Scalars for visualizing DNE.
-        conditionfaces (list): List of polygon face indices with high matrix condition numbers.
+        DNEsweep (list): DNE of mesh at each requested outlier removal setting.
+        conditionfaces (ndarray): Polygon face indices with high matrix condition numbers, 
+            with condition numbers.
         boundaryfaces (list): List of polygon face indices forming mesh edges.
-        outlierfaces (list): List of polygon face indices removed as outliers, with DNE values and face areas.
+        nanvertices (ndarray): Vertex indices with nan normals during DNE calculation.
+        outlierfaces (ndarray): Polygon face indices removed as outliers, with DNE values and face areas.
         RFI (float): Relief index of mesh (surface area/projected area).
         surfarea (float): 3D surface area of mesh. 
+        facearea (ndarray): 3D areas of mesh polygons (see normcore.facearea), built when 
+            first used and cached until vertices or faces is assigned.
         projarea (float): 2D surface area of mesh projected on XY plane. 
         OPCR (float): Orientation patch count rotated for mesh. 
         OPClist (list): Orientation patch counts at 8 rotations for mesh.
         OPCscalars: Scalars for visualizing OPC. 
     
     """
-    def __init__(self, filepath=""):
-        super(TopoMesh,self).__init__(filepath)
+    def __init__(self, filepath="", memmap=False):
+        self._vert_tri = None
+        self._edge_table = None
+        self._facearea = None
+        super(TopoMesh,self).__init__(filepath, memmap)
         
         self.DNE = None
+        self.DNEsweep = None
         self.DNEscalars = None
         self.conditionfaces = None
         self.boundaryfaces = None
+        self.nanvertices = None
         self.outlierfaces = None
         
         self.RFI = None
@@ -65,7 +82,7 @@ class TopoMesh(plython.PlythonMesh):
         self.OPClist = None
         self.OPCscalars = None
         
-    def GenerateDNE(self, dosmooth, smoothit, smoothstep, docondition, dooutlier, outlierperc, outliertype, filename):
+    def GenerateDNE(self, dosmooth, smoothit, smoothstep, docondition, dooutlier, outlierperc, outliertype, filename, outliersweep=()):
         """Calculates Dirichlet normal energy (surface bending) from mesh data.
         
         For details on args, see DNE.MeshDNE class. 
@@ -78,6 +95,8 @@ class TopoMesh(plython.PlythonMesh):
             doOutlier (bool): If true, do outlier removal. 
             OutlierPerc (float): Outlier percentile. 
             OutlierType (bool): If true, outliers as energy*area. If false, outliers as energy. 
+            outliersweep (list): (OutlierPerc, OutlierType) pairs for additional DNE values
+                with outlier removal, from the same polygon energies (see DNE.MeshDNE.outlier_sweep).
             
         """
         self.check_for_mesh(self.GenerateDNE)
@@ -87,13 +106,22 @@ class TopoMesh(plython.PlythonMesh):
         self.DNEscalars = surfcurv.equantity
         self.conditionfaces = surfcurv.high_condition_faces
         self.boundaryfaces = surfcurv.boundary_faces
+        self.nanvertices = surfcurv.nan_vertices
         self.outlierfaces = surfcurv.outlier_faces
+        self.DNEsweep = surfcurv.outlier_sweep(outliersweep)
           
-    def GenerateRFI(self):
-        """Calculates relief index (surface relief) from mesh data."""
+    def GenerateRFI(self, trusted=False, projmode='render', resolution=raster.RESOLUTION):
+        """Calculates relief index (surface relief) from mesh data.
+        
+        Args:
+            trusted (bool): If true, skip mesh consistency check (see RFI.MeshRFI).
+            projmode (str): Projected area measurement, 'render', 'raster' or 'exact' (see RFI.MeshRFI).
+            resolution (int): Grid cells along longer XY side of mesh in 'raster' mode (see RFI.MeshRFI).
+            
+        """
         self.check_for_mesh(self.GenerateRFI)
         
-        surfrelf = RFI.MeshRFI(self)
+        surfrelf = RFI.MeshRFI(self, trusted, projmode, resolution)
         self.RFI = surfrelf.RFI
         self.surfarea = surfrelf.surfarea
         self.projarea = surfrelf.projarea
@@ -119,25 +147,47 @@ class TopoMesh(plython.PlythonMesh):
         self.OPCscalars = surfcomp.colormap_list[0]
         
     def implicit_fair_mesh(self, iterations, step):
-        self.get_vert_tri_dict()
         faired_vertices = implicitfair.smooth(self.vertices, self.faces, iterations, step, self.vert_tri_dict)
         self.vertices = faired_vertices
-        self.mesh[0] = faired_vertices
-        
-        for i in range(len(self.triverts)):
-            self.triverts[i] = self.vertices[self.faces[i]]
-            
-        self.mesh[1] = self.triverts
+    
+    @property
+    def vert_tri_dict(self):
+        """VertTriCSR: Vertex to polygon adjacency, built when first used and cached until faces is assigned."""
+        if getattr(self, '_vert_tri', None) is None and self.faces is not None:
+            self._vert_tri = adjacency.VertTriCSR(self.faces, self.nvert)
+        return getattr(self, '_vert_tri', None)
+    
+    @property
+    def edge_table(self):
+        """EdgeTable: Mesh edges and edge to polygon incidence, built when first used and cached until faces is assigned."""
+        if getattr(self, '_edge_table', None) is None and self.faces is not None:
+            self._edge_table = adjacency.EdgeTable(self.faces)
+        return getattr(self, '_edge_table', None)
+    
+    @property
+    def facearea(self):
+        """ndarray: Polygon areas, built when first used and cached until vertices or faces is assigned."""
+        if getattr(self, '_facearea', None) is None and self.vertices is not None and self.faces is not None:
+            self._facearea = normcore.facearea(self.vertices, self.faces)
+        return getattr(self, '_facearea', None)
+    
+    def _vertices_changed(self):
+        """Discards triverts and polygon areas cached from vertices when vertices is assigned."""
+        super(TopoMesh, self)._vertices_changed()
+        self._facearea = None
+    
+    def _faces_changed(self):
+        """Discards triverts, adjacency, edges and polygon areas cached from faces when faces is assigned."""
+        super(TopoMesh, self)._faces_changed()
+        self._vert_tri = None
+        self._edge_table = None
+        self._facearea = None
     
     def get_vert_tri_dict(self):
-        """Generates dictionary associating vertex index keys with related polygon index values.""" 
-        self.vert_tri_dict = defaultdict(list)
-        
-        for findex, face in enumerate(self.faces):
-            for vertex in face:
-                self.vert_tri_dict[vertex].append(findex)
+        """Returns adjacency associating vertex index keys with related polygon index values.""" 
+        return self.vert_tri_dict
     
     def check_for_mesh(self, function="function"):
-        if self.mesh == None:
+        if self.vertices is None:
             raise ValueError('A mesh has not been imported, %s cannot proceed.' % function)
         
\ No newline at end of file